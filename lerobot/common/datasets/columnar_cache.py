@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Memory-mapped cache of the numeric columns of a LeRobotDataset.
+
+Reading a few low-dimensional values through `hf_dataset[idx]` converts Arrow rows to python objects and back
+to tensors on every access. Here each numeric column is written once to a contiguous .npy file which is then
+memory mapped, in the same spirit as `OnlineBuffer`. Reads are plain NumPy indexing and all the DataLoader
+workers share the same pages through the OS page cache.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import datasets
+import numpy as np
+import pyarrow as pa
+import torch
+
+CACHE_INFO_FILE = "info.json"
+
+
+def get_files_signature(files: list[Path]) -> str:
+    """Hash of the names, sizes and modification times of `files`, used to detect stale caches."""
+    hasher = hashlib.sha256()
+    for fpath in sorted(files):
+        stat = fpath.stat()
+        hasher.update(f"{fpath.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return hasher.hexdigest()
+
+
+def arrow_column_to_numpy(column: pa.ChunkedArray | pa.Array) -> np.ndarray:
+    """Converts a column of scalars or of (nested) fixed-length lists to a single NumPy array."""
+    array = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    shape = [len(array)]
+    while (
+        pa.types.is_list(array.type)
+        or pa.types.is_large_list(array.type)
+        or pa.types.is_fixed_size_list(array.type)
+    ):
+        values = array.flatten()
+        num_rows = np.prod(shape)
+        if num_rows > 0 and len(values) % num_rows != 0:
+            raise ValueError(f"Column of type {column.type} doesn't have a fixed shape.")
+        shape.append(len(values) // num_rows if num_rows > 0 else 0)
+        array = values
+    return array.to_numpy(zero_copy_only=False).reshape(shape)
+
+
+class ColumnarCache:
+    """Numeric columns of a dataset stored as memory-mapped .npy files in `cache_dir`.
+
+    Use `ColumnarCache.load_or_build` to get a cache that is up to date with the dataset: it is rebuilt when the
+    signature of the source files or the number of frames changed since it was written.
+    """
+
+    def __init__(self, cache_dir: Path, keys: list[str]):
+        self.cache_dir = Path(cache_dir)
+        self.keys = list(keys)
+        self._open()
+
+    def _open(self) -> None:
+        self._columns = {key: np.load(self.cache_dir / f"{key}.npy", mmap_mode="r") for key in self.keys}
+
+    @classmethod
+    def load_or_build(
+        cls, hf_dataset: datasets.Dataset, keys: list[str], cache_dir: Path, signature: str
+    ) -> "ColumnarCache":
+        cache_dir = Path(cache_dir)
+        info_path = cache_dir / CACHE_INFO_FILE
+        expected_info = {"signature": signature, "num_frames": len(hf_dataset), "keys": sorted(keys)}
+        if info_path.is_file():
+            with open(info_path) as f:
+                if json.load(f) == expected_info:
+                    return cls(cache_dir, keys)
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        info_path.unlink(missing_ok=True)
+        table = hf_dataset.with_format("arrow", columns=keys)[:]
+        for key in keys:
+            # Write to a temporary file first so that an interrupted build never leaves a truncated column.
+            tmp_path = cache_dir / f"{key}.tmp.npy"
+            np.save(tmp_path, np.ascontiguousarray(arrow_column_to_numpy(table.column(key))))
+            os.replace(tmp_path, cache_dir / f"{key}.npy")
+
+        with open(info_path, "w") as f:
+            json.dump(expected_info, f, indent=4)
+
+        return cls(cache_dir, keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._columns
+
+    def __len__(self) -> int:
+        return len(self._columns[self.keys[0]]) if self.keys else 0
+
+    def get(self, key: str, indices: int | list[int] | np.ndarray) -> torch.Tensor:
+        """Returns the values of column `key` at `indices` as a tensor (the values are copied out of the map)."""
+        return torch.from_numpy(np.array(self._columns[key][indices]))
+
+    def __getstate__(self) -> dict:
+        # Pickling a memmap copies its whole content, re-open the files instead (e.g. in spawned workers).
+        return {"cache_dir": self.cache_dir, "keys": self.keys}
+
+    def __setstate__(self, state: dict) -> None:
+        self.cache_dir = state["cache_dir"]
+        self.keys = state["keys"]
+        self._open()
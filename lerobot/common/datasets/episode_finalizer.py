@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class AsyncEpisodeFinalizer:
+    """
+    Runs the end of `LeRobotDataset.save_episode` (writing the parquet file, computing the stats, encoding the
+    videos and updating the metadata) in a background thread, so that the next episode can be recorded right
+    away.
+
+    Episodes are finalized one at a time, in the order they were saved, and at most `max_pending_episodes` of
+    them can wait to be finalized: `submit` blocks until one is done otherwise. Once an episode failed to be
+    finalized, the following ones are not (their indices would follow a missing episode) and the error is
+    raised by the next call to `submit` or `wait_until_done`.
+
+    The episodes and frames being finalized are counted in `num_pending_episodes` and `num_pending_frames`
+    until the metadata of their episode is saved within `saving`. Both are protected by `lock`.
+    """
+
+    def __init__(self, max_pending_episodes: int = 2):
+        if max_pending_episodes <= 0:
+            raise ValueError(f"At least one pending episode is needed, got {max_pending_episodes=}.")
+
+        self.max_pending_episodes = max_pending_episodes
+        self.lock = threading.Lock()
+        self.num_pending_episodes = 0
+        self.num_pending_frames = 0
+        self._slots = threading.Semaphore(max_pending_episodes)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="episode_finalizer")
+        self._futures: list[Future] = []
+        self._error = None
+        self._stopped = False
+
+    def submit(self, finalize_fn: Callable[[], None], num_frames: int) -> None:
+        self._raise_error()
+        self._slots.acquire()
+        with self.lock:
+            self.num_pending_episodes += 1
+            self.num_pending_frames += num_frames
+        future = self._executor.submit(self._run, finalize_fn)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures = [f for f in self._futures if not f.done()] + [future]
+
+    def _run(self, finalize_fn: Callable[[], None]) -> None:
+        if self._error is not None:
+            return
+        try:
+            finalize_fn()
+        except Exception as e:
+            self._error = e
+
+    @contextmanager
+    def saving(self, num_frames: int):
+        """Context in which the metadata of a pending episode of `num_frames` frames is saved."""
+        with self.lock:
+            yield
+            self.num_pending_episodes -= 1
+            self.num_pending_frames -= num_frames
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("An episode could not be finalized, the following ones were not saved.") from (
+                self._error
+            )
+
+    def wait_until_done(self) -> None:
+        for future in self._futures:
+            future.result()
+        self._futures = []
+        self._raise_error()
+
+    def stop(self) -> None:
+        if self._stopped:
+            return
+        self._executor.shutdown(wait=True)
+        self._stopped = True
+        self._futures = []
+        self._raise_error()
@@ -95,6 +95,10 @@ def make_dataset(cfg: TrainPipelineConfig) -> LeRobotDataset | MultiLeRobotDatas
             image_transforms=image_transforms,
             revision=cfg.dataset.revision,
             video_backend=cfg.dataset.video_backend,
+            video_decoder_pool_size=cfg.dataset.video_decoder_pool_size,
+            use_columnar_cache=cfg.dataset.use_columnar_cache,
+            use_frame_cache=cfg.dataset.use_frame_cache,
+            return_uint8_frames=cfg.dataset.return_uint8_frames,
         )
     else:
         raise NotImplementedError("The MultiLeRobotDataset isn't supported for now.")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""On-disk cache of decoded video frames.
+
+When training for many steps on a small dataset, the same frames get decoded thousands of times. The frames of
+each (episode, camera) pair can instead be decoded once, optionally downscaled, and stored as a uint8 .npy file
+that is memory mapped at read time. The cache is built with `lerobot/scripts/build_frame_cache.py` and used by
+`LeRobotDataset` with `use_frame_cache=True`.
+
+The cache is entirely dropped when the dataset's `meta/info.json` changes, and an entry is ignored when its
+video file changed (size or modification time) since it was cached.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn.functional as F  # noqa: N812
+
+FRAME_CACHE_INDEX = "index.json"
+
+
+def get_file_signature(fpath: Path) -> str:
+    stat = Path(fpath).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def get_info_signature(info_path: Path) -> str:
+    return hashlib.sha256(Path(info_path).read_bytes()).hexdigest()
+
+
+def resize_to_fit(frames: torch.Tensor, size: tuple[int, int]) -> torch.Tensor:
+    """Downscales uint8 frames (b,c,h,w) so that they fit in `size` (height, width) while keeping their aspect
+    ratio, the same way `resize_with_pad` does in SmolVLA (minus the padding). Frames that already fit are left
+    untouched."""
+    height, width = size
+    cur_height, cur_width = frames.shape[2:]
+    ratio = max(cur_width / width, cur_height / height)
+    if ratio <= 1:
+        return frames
+    resized = F.interpolate(
+        frames.float(),
+        size=(int(cur_height / ratio), int(cur_width / ratio)),
+        mode="bilinear",
+        align_corners=False,
+    )
+    return resized.round().clamp(0, 255).to(torch.uint8)
+
+
+class FrameCache:
+    """Decoded frames of a dataset's videos, stored in `cache_dir` as one uint8 (num_frames, c, h, w) array per
+    episode and video key.
+
+    Args:
+        cache_dir: Directory holding the cached arrays and their index.
+        info_signature: Signature of the dataset's info.json (see `get_info_signature`). Cached entries written
+            for another signature are discarded.
+        max_bytes: Size budget of the cache. When adding an entry would exceed it, the oldest cached episodes
+            are evicted (all their video keys at once). None means no limit.
+    """
+
+    def __init__(self, cache_dir: Path, info_signature: str, max_bytes: int | None = None):
+        self.cache_dir = Path(cache_dir)
+        self.info_signature = info_signature
+        self.max_bytes = max_bytes
+        self._load_index()
+
+    def _load_index(self) -> None:
+        self._frames = {}
+        self._timestamps = {}
+        self._checked = {}
+
+        index_path = self.cache_dir / FRAME_CACHE_INDEX
+        index = {}
+        if index_path.is_file():
+            with open(index_path) as f:
+                index = json.load(f)
+
+        if index.get("info_signature") == self.info_signature:
+            self.resize = tuple(index["resize"]) if index["resize"] is not None else None
+            self.entries = index["entries"]
+        else:
+            self.resize = None
+            self.entries = {}
+            if index_path.is_file():
+                self.clear()
+
+    def _write_index(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        index = {"info_signature": self.info_signature, "resize": self.resize, "entries": self.entries}
+        with open(self.cache_dir / FRAME_CACHE_INDEX, "w") as f:
+            json.dump(index, f, indent=4)
+
+    @staticmethod
+    def _entry_key(ep_idx: int, vid_key: str) -> str:
+        return f"{ep_idx}/{vid_key}"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry["nbytes"] for entry in self.entries.values())
+
+    def contains(self, ep_idx: int, vid_key: str, video_path: Path) -> bool:
+        """Whether the frames of `video_path` are cached and up to date. The check is done once per process."""
+        key = self._entry_key(ep_idx, vid_key)
+        if key not in self._checked:
+            entry = self.entries.get(key)
+            self._checked[key] = (
+                entry is not None
+                and Path(video_path).is_file()
+                and entry["video_signature"] == get_file_signature(video_path)
+            )
+        return self._checked[key]
+
+    def get(self, ep_idx: int, vid_key: str, timestamps: list[float], tolerance_s: float) -> torch.Tensor:
+        """Returns the cached uint8 frames (b,c,h,w) closest to the requested timestamps."""
+        key = self._entry_key(ep_idx, vid_key)
+        if key not in self._frames:
+            self._frames[key] = np.load(self.cache_dir / self.entries[key]["file"], mmap_mode="r")
+            self._timestamps[key] = np.asarray(self.entries[key]["timestamps"])
+
+        query_ts = np.asarray(timestamps)
+        dist = np.abs(query_ts[:, None] - self._timestamps[key][None, :])
+        argmin = dist.argmin(axis=1)
+        min_ = dist[np.arange(len(query_ts)), argmin]
+        is_within_tol = min_ < tolerance_s
+        assert is_within_tol.all(), (
+            f"One or several query timestamps unexpectedly violate the tolerance ({min_[~is_within_tol]} > {tolerance_s=})."
+            f"\nqueried timestamps: {query_ts}"
+            f"\ncached timestamps of episode {ep_idx} ({vid_key}): {self._timestamps[key]}"
+        )
+        return torch.from_numpy(np.array(self._frames[key][argmin]))
+
+    def put(
+        self,
+        ep_idx: int,
+        vid_key: str,
+        video_path: Path,
+        timestamps: list[float],
+        frames: np.ndarray | torch.Tensor,
+        protected_episodes: set[int] | None = None,
+    ) -> bool:
+        """Caches the uint8 frames (b,c,h,w) decoded from `video_path` at `timestamps`, evicting the oldest
+        episodes if needed to stay within the size budget. Episodes in `protected_episodes` (as well as
+        `ep_idx`) are never evicted. Returns False, without caching anything, if the frames don't fit.
+        """
+        frames = np.asarray(frames)
+        if frames.dtype != np.uint8:
+            raise TypeError(f"Frames should be stored as uint8, got {frames.dtype}.")
+
+        key = self._entry_key(ep_idx, vid_key)
+        if self.max_bytes is not None:
+            # The current entry of `key` (if any) is only replaced once the new frames fit in the budget
+            old_nbytes = self.entries[key]["nbytes"] if key in self.entries else 0
+            protected_episodes = {ep_idx} | (protected_episodes or set())
+            if not self._evict(self.max_bytes - frames.nbytes + old_nbytes, protected_episodes):
+                return False
+        self.remove(key)
+
+        fname = f"episode_{ep_idx:06d}_{vid_key}.npy"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        np.save(self.cache_dir / fname, frames)
+        self.entries[key] = {
+            "file": fname,
+            "video_signature": get_file_signature(video_path),
+            "timestamps": [float(ts) for ts in timestamps],
+            "nbytes": frames.nbytes,
+            "created": time.time(),
+        }
+        self._write_index()
+        return True
+
+    def set_resize(self, resize: tuple[int, int] | None) -> None:
+        """Sets the size the cached frames are downscaled to. Entries cached with another size are dropped."""
+        resize = tuple(resize) if resize is not None else None
+        if resize != self.resize:
+            self.clear()
+            self.resize = resize
+            self._write_index()
+
+    def remove(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+        self._frames.pop(key, None)
+        self._timestamps.pop(key, None)
+        self._checked.pop(key, None)
+
+    def _evict(self, target_bytes: int, protected_episodes: set[int]) -> bool:
+        """Evicts whole episodes, oldest first, until the cache takes at most `target_bytes`. Returns False
+        (without evicting anything) if that is not possible without evicting `protected_episodes`."""
+        episodes_created = {}
+        episodes_nbytes = {}
+        for key, entry in self.entries.items():
+            ep_idx = int(key.split("/")[0])
+            episodes_created[ep_idx] = min(entry["created"], episodes_created.get(ep_idx, float("inf")))
+            episodes_nbytes[ep_idx] = episodes_nbytes.get(ep_idx, 0) + entry["nbytes"]
+
+        protected_nbytes = sum(episodes_nbytes.get(ep_idx, 0) for ep_idx in protected_episodes)
+        if protected_nbytes > target_bytes:
+            return False
+
+        for ep_idx in sorted(episodes_created, key=episodes_created.get):
+            if self.nbytes <= target_bytes:
+                break
+            if ep_idx not in protected_episodes:
+                for key in [key for key in self.entries if int(key.split("/")[0]) == ep_idx]:
+                    self.remove(key)
+        return True
+
+    def clear(self) -> None:
+        for key in list(self.entries):
+            self.remove(key)
+        for fpath in self.cache_dir.glob("episode_*.npy"):
+            fpath.unlink()
+        self._write_index()
+
+    def __getstate__(self) -> dict:
+        # Memory maps are re-opened lazily in each process.
+        state = self.__dict__.copy()
+        state["_frames"] = {}
+        return state
@@ -13,10 +13,14 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import contextlib
 import multiprocessing
 import queue
 import threading
+import time
+from multiprocessing import queues, resource_tracker, shared_memory
 from pathlib import Path
+from typing import NamedTuple
 
 import numpy as np
 import PIL.Image
@@ -33,12 +37,20 @@ def safe_stop_image_writer(func):
             if image_writer is not None:
                 print("Waiting for image writer to terminate...")
                 image_writer.stop()
+            if getattr(dataset, "video_encoders", None) is not None:
+                print("Waiting for video encoders to terminate...")
+                dataset.stop_video_encoders()
+            if getattr(dataset, "episode_finalizer", None) is not None:
+                print("Waiting for pending episodes to be saved...")
+                dataset.stop_episode_finalizer()
             raise e
 
     return wrapper
 
 
-def image_array_to_pil_image(image_array: np.ndarray, range_check: bool = True) -> PIL.Image.Image:
+def image_array_to_uint8_hwc(image_array: np.ndarray, range_check: bool = True) -> np.ndarray:
+    """Converts a channel first or channel last image, either uint8 or float in [0, 1], to a uint8 (h, w, c)
+    array."""
     # TODO(aliberts): handle 1 channel and 4 for depth images
     if image_array.ndim != 3:
         raise ValueError(f"The array has {image_array.ndim} dimensions, but 3 is expected for an image.")
@@ -65,7 +77,11 @@ def image_array_to_pil_image(image_array: np.ndarray, range_check: bool = True)
 
         image_array = (image_array * 255).astype(np.uint8)
 
-    return PIL.Image.fromarray(image_array)
+    return image_array
+
+
+def image_array_to_pil_image(image_array: np.ndarray, range_check: bool = True) -> PIL.Image.Image:
+    return PIL.Image.fromarray(image_array_to_uint8_hwc(image_array, range_check))
 
 
 def write_image(image: np.ndarray | PIL.Image.Image, fpath: Path):
@@ -81,26 +97,104 @@ def write_image(image: np.ndarray | PIL.Image.Image, fpath: Path):
         print(f"Error writing image {fpath}: {e}")
 
 
-def worker_thread_loop(queue: queue.Queue):
+class SharedFrame(NamedTuple):
+    """Reference to a frame stored in a slot of a `SharedMemorySlab`, sent to the worker processes instead of the
+    frame itself."""
+
+    slab_name: str
+    slot: int
+    shape: tuple
+    dtype: str
+
+
+class SharedMemorySlab:
+    """Preallocated slots in shared memory for `num_slots` frames of the same shape and dtype.
+
+    The slots are only allocated and freed by the process which created the slab: the worker processes read the
+    frames in place, and send back the slot once they are done with it.
+    """
+
+    def __init__(self, shape: tuple, dtype: np.dtype, num_slots: int):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.num_slots = num_slots
+        frame_nbytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=max(num_slots * frame_nbytes, 1))
+        self.frames = np.ndarray((num_slots, *self.shape), dtype=self.dtype, buffer=self.shm.buf)
+        self.free_slots = list(range(num_slots))
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, slot: int, image: np.ndarray) -> SharedFrame:
+        self.frames[slot] = image
+        return SharedFrame(self.name, slot, self.shape, self.dtype.str)
+
+    def close(self) -> None:
+        del self.frames
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedFrameReader:
+    """Reads the frames of the slabs of a writer in a worker process, and releases their slot once they are
+    written."""
+
+    def __init__(self, released_slots: queues.Queue):
+        self.released_slots = released_slots
+        self.shms = {}
+        self.lock = threading.Lock()
+
+    def get(self, frame: SharedFrame) -> np.ndarray:
+        with self.lock:
+            if frame.slab_name not in self.shms:
+                self.shms[frame.slab_name] = shared_memory.SharedMemory(name=frame.slab_name)
+            shm = self.shms[frame.slab_name]
+        dtype = np.dtype(frame.dtype)
+        offset = frame.slot * int(np.prod(frame.shape)) * dtype.itemsize
+        return np.ndarray(frame.shape, dtype=dtype, buffer=shm.buf, offset=offset)
+
+    def write_image(self, frame: SharedFrame, fpath: Path):
+        try:
+            write_image(self.get(frame), fpath)
+        except Exception as e:
+            print(f"Error writing image {fpath}: {e}")
+        finally:
+            self.released_slots.put((frame.slab_name, frame.slot))
+
+    def close(self) -> None:
+        for shm in self.shms.values():
+            with contextlib.suppress(BufferError):
+                shm.close()
+
+
+def worker_thread_loop(queue: queue.Queue, frame_reader: SharedFrameReader | None = None):
     while True:
         item = queue.get()
         if item is None:
             queue.task_done()
             break
         image_array, fpath = item
-        write_image(image_array, fpath)
+        if isinstance(image_array, SharedFrame):
+            frame_reader.write_image(image_array, fpath)
+        else:
+            write_image(image_array, fpath)
         queue.task_done()
 
 
-def worker_process(queue: queue.Queue, num_threads: int):
+def worker_process(queue: queue.Queue, num_threads: int, released_slots: queues.Queue | None = None):
+    frame_reader = SharedFrameReader(released_slots) if released_slots is not None else None
     threads = []
     for _ in range(num_threads):
-        t = threading.Thread(target=worker_thread_loop, args=(queue,))
+        t = threading.Thread(target=worker_thread_loop, args=(queue, frame_reader))
         t.daemon = True
         t.start()
         threads.append(t)
     for t in threads:
         t.join()
+    if frame_reader is not None:
+        frame_reader.close()
 
 
 class AsyncImageWriter:
@@ -116,18 +210,30 @@ class AsyncImageWriter:
     The optimal number of processes and threads depends on your computer capabilities.
     We advise to use 4 threads per camera with 0 processes. If the fps is not stable, try to increase or lower
     the number of threads. If it is still not stable, try to use 1 subprocess, or more.
+
+    With subprocesses, the images are copied into a `SharedMemorySlab` of `num_slots` slots per image shape, and
+    only a reference to their slot is pickled through the queue. `save_image` blocks when all the slots of a slab
+    are waiting to be written, which is counted in `num_full_slab_waits` and `full_slab_wait_s`.
     """
 
-    def __init__(self, num_processes: int = 0, num_threads: int = 1):
+    def __init__(self, num_processes: int = 0, num_threads: int = 1, num_slots: int = 32):
         self.num_processes = num_processes
         self.num_threads = num_threads
+        self.num_slots = num_slots
         self.queue = None
         self.threads = []
         self.processes = []
+        self.slabs: dict[str, SharedMemorySlab] = {}
+        self.released_slots = None
+        # Number of images which waited for a slot to be released, and total time waited
+        self.num_full_slab_waits = 0
+        self.full_slab_wait_s = 0.0
         self._stopped = False
 
         if num_threads <= 0 and num_processes <= 0:
             raise ValueError("Number of threads and processes must be greater than zero.")
+        if num_slots <= 0:
+            raise ValueError(f"The shared memory slabs need at least one slot, got {num_slots=}.")
 
         if self.num_processes == 0:
             # Use threading
@@ -140,8 +246,14 @@ class AsyncImageWriter:
         else:
             # Use multiprocessing
             self.queue = multiprocessing.JoinableQueue()
+            self.released_slots = multiprocessing.Queue()
+            # The workers need to share the resource tracker of this process, which would otherwise only be started
+            # by the first slab: theirs would unlink the slabs they opened when they exit.
+            resource_tracker.ensure_running()
             for _ in range(self.num_processes):
-                p = multiprocessing.Process(target=worker_process, args=(self.queue, self.num_threads))
+                p = multiprocessing.Process(
+                    target=worker_process, args=(self.queue, self.num_threads, self.released_slots)
+                )
                 p.daemon = True
                 p.start()
                 self.processes.append(p)
@@ -150,8 +262,47 @@ class AsyncImageWriter:
         if isinstance(image, torch.Tensor):
             # Convert tensor to numpy array to minimize main process time
             image = image.cpu().numpy()
+        if self.num_processes > 0:
+            if isinstance(image, PIL.Image.Image):
+                image = np.asarray(image)
+            # Other objects are pickled, and fail to be written by the worker like with threads
+            if isinstance(image, np.ndarray) and image.dtype.kind in "biuf":
+                image = self._copy_to_slab(image)
         self.queue.put((image, fpath))
 
+    def _copy_to_slab(self, image: np.ndarray) -> SharedFrame:
+        if self._stopped:
+            raise RuntimeError("The image writer is stopped.")
+        slab = next(
+            (s for s in self.slabs.values() if s.shape == image.shape and s.dtype == image.dtype), None
+        )
+        if slab is None:
+            slab = SharedMemorySlab(image.shape, image.dtype, self.num_slots)
+            self.slabs[slab.name] = slab
+
+        self._recycle_slots()
+        if not slab.free_slots:
+            start = time.perf_counter()
+            while not slab.free_slots:
+                self._recycle_slots(timeout=1.0)
+            self.num_full_slab_waits += 1
+            self.full_slab_wait_s += time.perf_counter() - start
+        return slab.write(slab.free_slots.pop(), image)
+
+    def _recycle_slots(self, timeout: float | None = None) -> None:
+        """Gives back their slot to the slabs of the images written by the workers. With a `timeout`, waits for
+        at least one of them."""
+        try:
+            if timeout is not None:
+                slab_name, slot = self.released_slots.get(timeout=timeout)
+                self.slabs[slab_name].free_slots.append(slot)
+            while True:
+                slab_name, slot = self.released_slots.get_nowait()
+                self.slabs[slab_name].free_slots.append(slot)
+        except queue.Empty:
+            if timeout is not None and not any(p.is_alive() for p in self.processes):
+                raise RuntimeError("The image writer processes exited unexpectedly.") from None
+
     def wait_until_done(self):
         self.queue.join()
 
@@ -174,5 +325,9 @@ class AsyncImageWriter:
                     p.terminate()
             self.queue.close()
             self.queue.join_thread()
+            self.released_slots.close()
+            for slab in self.slabs.values():
+                slab.close()
+            self.slabs = {}
 
         self._stopped = True
@@ -14,8 +14,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import contextlib
+import hashlib
+import json
 import logging
+import os
 import shutil
+from collections import defaultdict
+from functools import partial
 from pathlib import Path
 from typing import Callable
 
@@ -23,15 +28,21 @@ import datasets
 import numpy as np
 import packaging.version
 import PIL.Image
+import pyarrow as pa
+import pyarrow.parquet as pq
 import torch
 import torch.utils
 from datasets import concatenate_datasets, load_dataset
+from datasets.table import InMemoryTable
 from huggingface_hub import HfApi, snapshot_download
 from huggingface_hub.constants import REPOCARD_NAME
 from huggingface_hub.errors import RevisionNotFoundError
 
 from lerobot.common.constants import HF_LEROBOT_HOME
+from lerobot.common.datasets.columnar_cache import ColumnarCache, get_files_signature
 from lerobot.common.datasets.compute_stats import aggregate_stats, compute_episode_stats
+from lerobot.common.datasets.episode_finalizer import AsyncEpisodeFinalizer
+from lerobot.common.datasets.frame_cache import FrameCache, get_info_signature
 from lerobot.common.datasets.image_writer import AsyncImageWriter, write_image
 from lerobot.common.datasets.utils import (
     DEFAULT_FEATURES,
@@ -46,26 +57,30 @@ from lerobot.common.datasets.utils import (
     check_version_compatibility,
     create_empty_dataset_info,
     create_lerobot_dataset_card,
-    embed_images,
     get_delta_indices,
     get_episode_data_index,
     get_hf_features_from_features,
     get_safe_version,
     hf_transform_to_torch,
+    image_files_to_arrow,
     is_valid_version,
     load_episodes,
     load_episodes_stats,
     load_info,
     load_stats,
     load_tasks,
+    numpy_to_arrow,
     validate_episode_buffer,
     validate_frame,
     write_episode,
     write_episode_stats,
     write_info,
     write_json,
+    write_manifest_entry,
 )
+from lerobot.common.datasets.video_encoder import StreamingVideoEncoder
 from lerobot.common.datasets.video_utils import (
+    VideoDecoderPool,
     VideoFrame,
     decode_video_frames,
     encode_video_frames,
@@ -141,6 +156,12 @@ class LeRobotDatasetMetadata:
         fpath = self.video_path.format(episode_chunk=ep_chunk, video_key=vid_key, episode_index=ep_index)
         return Path(fpath)
 
+    def get_episode_file_paths(self, ep_index: int) -> list[Path]:
+        """Data and video files of an episode, relative to the root."""
+        fpaths = [self.get_data_file_path(ep_index)]
+        fpaths += [self.get_video_file_path(ep_index, vid_key) for vid_key in self.video_keys]
+        return fpaths
+
     def get_episode_chunk(self, ep_index: int) -> int:
         return ep_index // self.chunks_size
 
@@ -342,6 +363,10 @@ class LeRobotDataset(torch.utils.data.Dataset):
         force_cache_sync: bool = False,
         download_videos: bool = True,
         video_backend: str | None = None,
+        video_decoder_pool_size: int = 16,
+        use_columnar_cache: bool = False,
+        use_frame_cache: bool = False,
+        return_uint8_frames: bool = False,
     ):
         """
         2 modes are available for instantiating this class, depending on 2 different use cases:
@@ -443,6 +468,18 @@ class LeRobotDataset(torch.utils.data.Dataset):
                 True.
             video_backend (str | None, optional): Video backend to use for decoding videos. Defaults to torchcodec when available int the platform; otherwise, defaults to 'pyav'.
                 You can also use the 'pyav' decoder used by Torchvision, which used to be the default option, or 'video_reader' which is another decoder of Torchvision.
+            video_decoder_pool_size (int, optional): Maximum number of video decoders kept open per process
+                (i.e. per DataLoader worker) so that consecutive samples from the same episode don't reopen the
+                video files. Set to 0 to open a new decoder for every sample. Defaults to 16.
+            use_columnar_cache (bool, optional): Flag to serve the numeric features (states, actions,
+                timestamps, indices...) from memory-mapped .npy files written under 'root/cache/' on first load,
+                instead of converting Arrow rows on every access. Defaults to False.
+            use_frame_cache (bool, optional): Flag to read video frames from the decoded-frame cache built
+                with 'lerobot/scripts/build_frame_cache.py' instead of decoding them, for the episodes it holds.
+                Note that cached frames may have been downscaled. Defaults to False.
+            return_uint8_frames (bool, optional): Flag to return video frames as uint8 (c,h,w) tensors instead of
+                float32 in [0,1], which divides by 4 the bytes sent from the data loader workers and copied to the
+                device. The policy's `Normalize` converts them to float on device. Defaults to False.
         """
         super().__init__()
         self.repo_id = repo_id
@@ -453,10 +490,16 @@ class LeRobotDataset(torch.utils.data.Dataset):
         self.tolerance_s = tolerance_s
         self.revision = revision if revision else CODEBASE_VERSION
         self.video_backend = video_backend if video_backend else get_safe_default_codec()
+        self.video_decoder_pool = (
+            VideoDecoderPool(video_decoder_pool_size) if video_decoder_pool_size else None
+        )
+        self.return_uint8_frames = return_uint8_frames
         self.delta_indices = None
 
         # Unused attributes
         self.image_writer = None
+        self.video_encoders = None
+        self.episode_finalizer = None
         self.episode_buffer = None
 
         self.root.mkdir(exist_ok=True, parents=True)
@@ -481,6 +524,15 @@ class LeRobotDataset(torch.utils.data.Dataset):
             self.hf_dataset = self.load_hf_dataset()
 
         self.episode_data_index = get_episode_data_index(self.meta.episodes, self.episodes)
+        self.columnar_cache = self.load_columnar_cache() if use_columnar_cache else None
+        self.frame_cache = None
+        if use_frame_cache and len(self.meta.video_keys) > 0:
+            self.frame_cache = FrameCache(self.frame_cache_dir, get_info_signature(self.root / INFO_PATH))
+            if len(self.frame_cache.entries) == 0:
+                logging.warning(
+                    f"The frame cache of {self.repo_id} is empty, frames will be decoded from the videos. "
+                    "Build it with 'lerobot/scripts/build_frame_cache.py'."
+                )
 
         # Check timestamps
         timestamps = torch.stack(self.hf_dataset["timestamp"]).numpy()
@@ -505,7 +557,8 @@ class LeRobotDataset(torch.utils.data.Dataset):
         upload_large_folder: bool = False,
         **card_kwargs,
     ) -> None:
-        ignore_patterns = ["images/"]
+        self._wait_episode_finalizer()
+        ignore_patterns = ["images/", "cache/"]
         if not push_videos:
             ignore_patterns.append("videos/")
 
@@ -604,6 +657,20 @@ class LeRobotDataset(torch.utils.data.Dataset):
         hf_dataset.set_transform(hf_transform_to_torch)
         return hf_dataset
 
+    def load_columnar_cache(self) -> ColumnarCache:
+        """Loads the memory-mapped cache of the numeric features in hf_dataset, (re)building it if it is missing
+        or out of date with the parquet files."""
+        keys = [key for key, ft in self.features.items() if ft["dtype"] not in ["image", "video", "string"]]
+        if self.episodes is None:
+            data_files = list((self.root / "data").rglob("*.parquet"))
+            selection = "all"
+        else:
+            data_files = [self.root / self.meta.get_data_file_path(ep_idx) for ep_idx in self.episodes]
+            selection = hashlib.sha256(json.dumps(self.episodes).encode()).hexdigest()[:16]
+
+        cache_dir = self.root / "cache" / "columns" / selection
+        return ColumnarCache.load_or_build(self.hf_dataset, keys, cache_dir, get_files_signature(data_files))
+
     def create_hf_dataset(self) -> datasets.Dataset:
         features = get_hf_features_from_features(self.features)
         ft_dict = {col: [] for col in features}
@@ -618,10 +685,46 @@ class LeRobotDataset(torch.utils.data.Dataset):
         """Frames per second used during data collection."""
         return self.meta.fps
 
+    @property
+    def hf_dataset(self) -> datasets.Dataset:
+        """The frames of the selected episodes. Episodes saved with `save_episode` are only appended to it the
+        first time it is accessed afterwards, to avoid growing a chain of concatenated tables while recording."""
+        if self._new_episode_tables:
+            new_episodes = datasets.Dataset(
+                InMemoryTable(pa.concat_tables(self._new_episode_tables)),
+                info=datasets.DatasetInfo(features=self._hf_dataset.features),
+                split=datasets.Split.TRAIN,
+            )
+            self._hf_dataset = concatenate_datasets([self._hf_dataset, new_episodes])
+            self._hf_dataset.set_transform(hf_transform_to_torch)
+            self._new_episode_tables = []
+        return self._hf_dataset
+
+    @hf_dataset.setter
+    def hf_dataset(self, hf_dataset: datasets.Dataset) -> None:
+        self._hf_dataset = hf_dataset
+        self._new_episode_tables = []
+
+    @property
+    def columnar_cache(self) -> ColumnarCache | None:
+        """The memory-mapped cache of the numeric features when `use_columnar_cache` is set. Saving an episode
+        invalidates it, and it is only reloaded the first time it is accessed afterwards, so that recording
+        doesn't rebuild it for every episode."""
+        if self.use_columnar_cache and self._columnar_cache is None:
+            self._columnar_cache = self.load_columnar_cache()
+        return self._columnar_cache
+
+    @columnar_cache.setter
+    def columnar_cache(self, columnar_cache: ColumnarCache | None) -> None:
+        self._columnar_cache = columnar_cache
+        self.use_columnar_cache = columnar_cache is not None
+
     @property
     def num_frames(self) -> int:
         """Number of frames in selected episodes."""
-        return len(self.hf_dataset) if self.hf_dataset is not None else self.meta.total_frames
+        if self._hf_dataset is None:
+            return self.meta.total_frames
+        return len(self._hf_dataset) + sum(len(table) for table in self._new_episode_tables)
 
     @property
     def num_episodes(self) -> int:
@@ -635,24 +738,27 @@ class LeRobotDataset(torch.utils.data.Dataset):
     @property
     def hf_features(self) -> datasets.Features:
         """Features of the hf_dataset."""
-        if self.hf_dataset is not None:
-            return self.hf_dataset.features
+        if self._hf_dataset is not None:
+            return self._hf_dataset.features
         else:
             return get_hf_features_from_features(self.features)
 
-    def _get_query_indices(self, idx: int, ep_idx: int) -> tuple[dict[str, list[int | bool]]]:
-        ep_start = self.episode_data_index["from"][ep_idx]
-        ep_end = self.episode_data_index["to"][ep_idx]
-        query_indices = {
-            key: [max(ep_start.item(), min(ep_end.item() - 1, idx + delta)) for delta in delta_idx]
-            for key, delta_idx in self.delta_indices.items()
-        }
-        padding = {  # Pad values outside of current episode range
-            f"{key}_is_pad": torch.BoolTensor(
-                [(idx + delta < ep_start.item()) | (idx + delta >= ep_end.item()) for delta in delta_idx]
+    def _get_query_indices(
+        self, indices: np.ndarray, ep_indices: np.ndarray
+    ) -> tuple[dict[str, np.ndarray], dict[str, torch.Tensor]]:
+        """Resolves the delta indices of a batch of items, given their indices and episode indices. Returns
+        arrays of shape (batch_size, num_deltas) for each key."""
+        ep_start = self.episode_data_index["from"].numpy()[ep_indices, None]
+        ep_end = self.episode_data_index["to"].numpy()[ep_indices, None]
+        query_indices = {}
+        padding = {}
+        for key, delta_idx in self.delta_indices.items():
+            target_indices = indices[:, None] + np.asarray(delta_idx)
+            query_indices[key] = np.clip(target_indices, ep_start, ep_end - 1)
+            # Pad values outside of current episode range
+            padding[f"{key}_is_pad"] = torch.from_numpy(
+                (target_indices < ep_start) | (target_indices >= ep_end)
             )
-            for key, delta_idx in self.delta_indices.items()
-        }
         return query_indices, padding
 
     def _get_query_timestamps(
@@ -670,27 +776,92 @@ class LeRobotDataset(torch.utils.data.Dataset):
 
         return query_timestamps
 
-    def _query_hf_dataset(self, query_indices: dict[str, list[int]]) -> dict:
-        return {
-            key: torch.stack(self.hf_dataset.select(q_idx)[key])
-            for key, q_idx in query_indices.items()
-            if key not in self.meta.video_keys
-        }
+    def _query_hf_dataset(self, query_indices: dict[str, np.ndarray]) -> dict[str, torch.Tensor]:
+        """Gathers the rows of all the keys in `query_indices` with a single take. The timestamps of the
+        requested frames are returned in place of the values for video keys."""
+        columns = [key for key in query_indices if key not in self.meta.video_keys]
+        if len(columns) < len(query_indices) and "timestamp" not in columns:
+            columns.append("timestamp")
+
+        unique_indices = np.unique(np.concatenate([q_idx.ravel() for q_idx in query_indices.values()]))
+        values = {}
+        if self.columnar_cache is not None:
+            values = {
+                col: self.columnar_cache.get(col, unique_indices)
+                for col in columns
+                if col in self.columnar_cache
+            }
+        other_columns = [col for col in columns if col not in values]
+        if len(other_columns) > 0:
+            rows = self.hf_dataset.select_columns(other_columns)[unique_indices.tolist()]
+            values.update({column: torch.stack(rows[column]) for column in other_columns})
+
+        query_result = {}
+        for key, q_idx in query_indices.items():
+            column = "timestamp" if key in self.meta.video_keys else key
+            query_result[key] = values[column][torch.from_numpy(np.searchsorted(unique_indices, q_idx))]
+        return query_result
+
+    @property
+    def frame_cache_dir(self) -> Path:
+        return self.root / "cache" / "frames"
+
+    def _get_video_frames(self, ep_idx: int, vid_key: str, timestamps: list[float]) -> torch.Tensor:
+        video_path = self.root / self.meta.get_video_file_path(ep_idx, vid_key)
+        if self.frame_cache is not None and self.frame_cache.contains(ep_idx, vid_key, video_path):
+            frames = self.frame_cache.get(ep_idx, vid_key, timestamps, self.tolerance_s)
+            return frames if self.return_uint8_frames else frames.type(torch.float32) / 255
+
+        return decode_video_frames(
+            video_path,
+            timestamps,
+            self.tolerance_s,
+            self.video_backend,
+            self.video_decoder_pool,
+            return_uint8=self.return_uint8_frames,
+        )
 
     def _query_videos(self, query_timestamps: dict[str, list[float]], ep_idx: int) -> dict[str, torch.Tensor]:
         """Note: When using data workers (e.g. DataLoader with num_workers>0), do not call this function
         in the main process (e.g. by using a second Dataloader with num_workers=0). It will result in a
         Segmentation Fault. This probably happens because a memory reference to the video loader is created in
         the main process and a subprocess fails to access it.
+        Decoders held by `self.video_decoder_pool` are not affected: the pool starts over empty in each worker.
         """
         item = {}
         for vid_key, query_ts in query_timestamps.items():
-            video_path = self.root / self.meta.get_video_file_path(ep_idx, vid_key)
-            frames = decode_video_frames(video_path, query_ts, self.tolerance_s, self.video_backend)
+            frames = self._get_video_frames(ep_idx, vid_key, query_ts)
             item[vid_key] = frames.squeeze(0)
 
         return item
 
+    def _query_videos_batch(
+        self, queries: list[tuple[int, dict[str, list[float]]]]
+    ) -> list[dict[str, torch.Tensor]]:
+        """Same as `_query_videos` for several (episode index, query timestamps) pairs at once. All the
+        timestamps requested from the same video file are decoded with a single call, in increasing order.
+        """
+        requested = defaultdict(set)
+        for ep_idx, query_timestamps in queries:
+            for vid_key, query_ts in query_timestamps.items():
+                requested[(ep_idx, vid_key)].update(query_ts)
+
+        decoded = {}
+        for (ep_idx, vid_key), timestamps in requested.items():
+            timestamps = sorted(timestamps)
+            frames = self._get_video_frames(ep_idx, vid_key, timestamps)
+            decoded[(ep_idx, vid_key)] = dict(zip(timestamps, frames, strict=True))
+
+        items = []
+        for ep_idx, query_timestamps in queries:
+            item = {}
+            for vid_key, query_ts in query_timestamps.items():
+                frames = decoded[(ep_idx, vid_key)]
+                item[vid_key] = torch.stack([frames[ts] for ts in query_ts]).squeeze(0)
+            items.append(item)
+
+        return items
+
     def _add_padding_keys(self, item: dict, padding: dict[str, list[bool]]) -> dict:
         for key, val in padding.items():
             item[key] = torch.BoolTensor(val)
@@ -699,24 +870,77 @@ class LeRobotDataset(torch.utils.data.Dataset):
     def __len__(self):
         return self.num_frames
 
-    def __getitem__(self, idx) -> dict:
-        item = self.hf_dataset[idx]
-        ep_idx = item["episode_index"].item()
-
-        query_indices = None
+    def _query_items(self, indices: list[int]) -> list[tuple[dict, dict[str, list[float]] | None]]:
+        """Returns the non-visual data of the items at `indices` along with the timestamps of the frames to
+        decode for each video key (None when the dataset has no video)."""
+        if self.columnar_cache is None:
+            rows = self.hf_dataset[indices]
+        else:
+            other_columns = [col for col in self.hf_dataset.column_names if col not in self.columnar_cache]
+            rows = self.hf_dataset.select_columns(other_columns)[indices] if len(other_columns) > 0 else {}
+            rows = {
+                **rows,
+                **{key: list(self.columnar_cache.get(key, indices)) for key in self.columnar_cache.keys},
+            }
+        items = [{key: values[i] for key, values in rows.items()} for i in range(len(indices))]
+
+        query_result = {}
         if self.delta_indices is not None:
-            query_indices, padding = self._get_query_indices(idx, ep_idx)
+            ep_indices = torch.stack(rows["episode_index"]).numpy()
+            query_indices, padding = self._get_query_indices(np.asarray(indices), ep_indices)
             query_result = self._query_hf_dataset(query_indices)
-            item = {**item, **padding}
-            for key, val in query_result.items():
-                item[key] = val
+            for i, item in enumerate(items):
+                for key, val in padding.items():
+                    item[key] = val[i]
+                for key, val in query_result.items():
+                    if key not in self.meta.video_keys:
+                        item[key] = val[i]
+
+        queried = []
+        for i, item in enumerate(items):
+            query_timestamps = None
+            if len(self.meta.video_keys) > 0:
+                query_timestamps = {
+                    key: query_result[key][i].tolist() if key in query_result else [item["timestamp"].item()]
+                    for key in self.meta.video_keys
+                }
+            queried.append((item, query_timestamps))
+
+        return queried
+
+    def __getitem__(self, idx) -> dict:
+        item, query_timestamps = self._query_items([idx])[0]
 
         if len(self.meta.video_keys) > 0:
-            current_ts = item["timestamp"].item()
-            query_timestamps = self._get_query_timestamps(current_ts, query_indices)
-            video_frames = self._query_videos(query_timestamps, ep_idx)
+            video_frames = self._query_videos(query_timestamps, item["episode_index"].item())
             item = {**video_frames, **item}
 
+        return self._finalize_item(item)
+
+    def __getitems__(self, indices: list[int]) -> list[dict]:
+        """Returns the items at `indices`. This is called by the DataLoader with all the indices of a batch
+        instead of calling `__getitem__` once per index.
+
+        With the torchcodec backend, the frames requested from the same video file by the whole batch are
+        decoded with a single sorted call instead of one seek per item. Combined with
+        `EpisodeGroupedBatchSampler`, which draws each batch from as few episodes as possible, this makes video
+        decoding nearly sequential. The torchvision backends keep decoding item per item since they hold in
+        memory every frame between the first and last requested timestamps.
+        """
+        queried = self._query_items(indices)
+        items = [item for item, _ in queried]
+
+        if len(self.meta.video_keys) > 0:
+            queries = [(item["episode_index"].item(), query_ts) for item, query_ts in queried]
+            if self.video_backend == "torchcodec":
+                videos_frames = self._query_videos_batch(queries)
+            else:
+                videos_frames = [self._query_videos(query_ts, ep_idx) for ep_idx, query_ts in queries]
+            items = [{**frames, **item} for frames, item in zip(videos_frames, items, strict=True)]
+
+        return [self._finalize_item(item) for item in items]
+
+    def _finalize_item(self, item: dict) -> dict:
         if self.image_transforms is not None:
             image_keys = self.meta.camera_keys
             for cam in image_keys:
@@ -740,7 +964,7 @@ class LeRobotDataset(torch.utils.data.Dataset):
         )
 
     def create_episode_buffer(self, episode_index: int | None = None) -> dict:
-        current_ep_idx = self.meta.total_episodes if episode_index is None else episode_index
+        current_ep_idx = self._get_total_episodes_and_frames()[0] if episode_index is None else episode_index
         ep_buffer = {}
         # size and task are special cases that are not in self.features
         ep_buffer["size"] = 0
@@ -766,8 +990,9 @@ class LeRobotDataset(torch.utils.data.Dataset):
     def add_frame(self, frame: dict, task: str, timestamp: float | None = None) -> None:
         """
         This function only adds the frame to the episode_buffer. Apart from images — which are written in a
-        temporary directory — nothing is written to disk. To save those frames, the 'save_episode()' method
-        then needs to be called.
+        temporary directory, or sent to the video encoders when streaming encoding is on (see
+        `start_video_encoders`) — nothing is written to disk. To save those frames, the 'save_episode()'
+        method then needs to be called.
         """
         # Convert torch to numpy if needed
         for name in frame:
@@ -794,7 +1019,14 @@ class LeRobotDataset(torch.utils.data.Dataset):
                     f"An element of the frame is not in the features. '{key}' not in '{self.features.keys()}'."
                 )
 
-            if self.features[key]["dtype"] in ["image", "video"]:
+            if self.video_encoders is not None and key in self.video_encoders:
+                if frame_index == 0:
+                    video_path = self.root / self.meta.get_video_file_path(
+                        self.episode_buffer["episode_index"], key
+                    )
+                    self.video_encoders[key].start_episode(video_path)
+                self.video_encoders[key].add_frame(frame[key])
+            elif self.features[key]["dtype"] in ["image", "video"]:
                 img_path = self._get_image_file_path(
                     episode_index=self.episode_buffer["episode_index"], image_key=key, frame_index=frame_index
                 )
@@ -809,7 +1041,8 @@ class LeRobotDataset(torch.utils.data.Dataset):
 
     def save_episode(self, episode_data: dict | None = None) -> None:
         """
-        This will save to disk the current episode in self.episode_buffer.
+        This will save to disk the current episode in self.episode_buffer. When an episode finalizer is started
+        (see `start_episode_finalizer`), the episode is only queued to be saved in the background.
 
         Args:
             episode_data (dict | None, optional): Dict containing the episode data to save. If None, this will
@@ -819,17 +1052,48 @@ class LeRobotDataset(torch.utils.data.Dataset):
         if not episode_data:
             episode_buffer = self.episode_buffer
 
-        validate_episode_buffer(episode_buffer, self.meta.total_episodes, self.features)
+        total_episodes, total_frames = self._get_total_episodes_and_frames()
+        validate_episode_buffer(episode_buffer, total_episodes, self.features)
 
         # size and task are special cases that won't be added to hf_dataset
         episode_length = episode_buffer.pop("size")
         tasks = episode_buffer.pop("task")
-        episode_tasks = list(set(tasks))
         episode_index = episode_buffer["episode_index"]
 
-        episode_buffer["index"] = np.arange(self.meta.total_frames, self.meta.total_frames + episode_length)
+        episode_buffer["index"] = np.arange(total_frames, total_frames + episode_length)
         episode_buffer["episode_index"] = np.full((episode_length,), episode_index)
 
+        for key, ft in self.features.items():
+            # index, episode_index, task_index are already processed above, and image and video
+            # are processed separately by storing image path and frame info as meta data
+            if key in ["index", "episode_index", "task_index"] or ft["dtype"] in ["image", "video"]:
+                continue
+            episode_buffer[key] = np.stack(episode_buffer[key])
+
+        # Videos encoded while recording are finished here, their stats are computed by the encoders.
+        streamed_stats = self._finish_video_encoders()
+
+        # Waited for here rather than by the finalizer, where it would also wait for the images of the next
+        # episode as they are being recorded.
+        self._wait_image_writer()
+
+        if self.episode_finalizer is None:
+            self._finalize_episode(episode_buffer, tasks, streamed_stats)
+        else:
+            self.episode_finalizer.submit(
+                partial(self._finalize_episode, episode_buffer, tasks, streamed_stats), episode_length
+            )
+
+        if not episode_data:  # Reset the buffer
+            self.episode_buffer = self.create_episode_buffer()
+
+    def _finalize_episode(self, episode_buffer: dict, tasks: list[str], streamed_stats: dict) -> None:
+        """Writes the data, stats and videos of an episode and adds it to the metadata. When an episode
+        finalizer is started, this runs in its background thread."""
+        episode_index = int(episode_buffer["episode_index"][0])
+        episode_length = len(episode_buffer["index"])
+        episode_tasks = list(set(tasks))
+
         # Add new tasks to the tasks dictionary
         for task in episode_tasks:
             task_index = self.meta.get_task_index(task)
@@ -839,24 +1103,27 @@ class LeRobotDataset(torch.utils.data.Dataset):
         # Given tasks in natural language, find their corresponding task indices
         episode_buffer["task_index"] = np.array([self.meta.get_task_index(task) for task in tasks])
 
-        for key, ft in self.features.items():
-            # index, episode_index, task_index are already processed above, and image and video
-            # are processed separately by storing image path and frame info as meta data
-            if key in ["index", "episode_index", "task_index"] or ft["dtype"] in ["image", "video"]:
-                continue
-            episode_buffer[key] = np.stack(episode_buffer[key])
-
-        self._wait_image_writer()
         self._save_episode_table(episode_buffer, episode_index)
-        ep_stats = compute_episode_stats(episode_buffer, self.features)
+        ep_stats = compute_episode_stats(
+            {key: data for key, data in episode_buffer.items() if key not in streamed_stats}, self.features
+        )
+        ep_stats.update(streamed_stats)
 
         if len(self.meta.video_keys) > 0:
             video_paths = self.encode_episode_videos(episode_index)
             for key in self.meta.video_keys:
                 episode_buffer[key] = video_paths[key]
 
+        # The files of the episode are recorded in the manifest before the episode is added to the metadata, so
+        # that every saved episode can be checked with `lerobot/scripts/verify_dataset.py`.
+        write_manifest_entry(episode_index, self.meta.get_episode_file_paths(episode_index), self.root)
+
         # `meta.save_episode` be executed after encoding the videos
-        self.meta.save_episode(episode_index, episode_length, episode_tasks, ep_stats)
+        if self.episode_finalizer is None:
+            self.meta.save_episode(episode_index, episode_length, episode_tasks, ep_stats)
+        else:
+            with self.episode_finalizer.saving(episode_length):
+                self.meta.save_episode(episode_index, episode_length, episode_tasks, ep_stats)
 
         ep_data_index = get_episode_data_index(self.meta.episodes, [episode_index])
         ep_data_index_np = {k: t.numpy() for k, t in ep_data_index.items()}
@@ -868,43 +1135,67 @@ class LeRobotDataset(torch.utils.data.Dataset):
             self.tolerance_s,
         )
 
-        video_files = list(self.root.rglob("*.mp4"))
-        assert len(video_files) == self.num_episodes * len(self.meta.video_keys)
-
-        parquet_files = list(self.root.rglob("*.parquet"))
-        assert len(parquet_files) == self.num_episodes
-
         # delete images
-        img_dir = self.root / "images"
-        if img_dir.is_dir():
-            shutil.rmtree(self.root / "images")
-
-        if not episode_data:  # Reset the buffer
-            self.episode_buffer = self.create_episode_buffer()
+        if self.episode_finalizer is None:
+            img_dir = self.root / "images"
+            if img_dir.is_dir():
+                shutil.rmtree(self.root / "images")
+        else:
+            # The next episode is already being recorded, only the images of this one are deleted.
+            self._delete_episode_images(episode_index)
 
     def _save_episode_table(self, episode_buffer: dict, episode_index: int) -> None:
-        episode_dict = {key: episode_buffer[key] for key in self.hf_features}
-        ep_dataset = datasets.Dataset.from_dict(episode_dict, features=self.hf_features, split="train")
-        ep_dataset = embed_images(ep_dataset)
-        self.hf_dataset = concatenate_datasets([self.hf_dataset, ep_dataset])
-        self.hf_dataset.set_transform(hf_transform_to_torch)
+        schema = self.hf_features.arrow_schema
+        columns = []
+        for key in schema.names:
+            if self.features[key]["dtype"] == "image":
+                columns.append(image_files_to_arrow(episode_buffer[key]))
+            else:
+                columns.append(numpy_to_arrow(episode_buffer[key], schema.field(key).type))
+        ep_table = pa.Table.from_arrays(columns, schema=schema)
+
         ep_data_path = self.root / self.meta.get_data_file_path(ep_index=episode_index)
         ep_data_path.parent.mkdir(parents=True, exist_ok=True)
-        ep_dataset.to_parquet(ep_data_path)
+        # Write to a temporary file first so that an interrupted write never leaves a truncated episode.
+        tmp_path = ep_data_path.with_suffix(".tmp")
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            writer.write_table(ep_table)
+        os.replace(tmp_path, ep_data_path)
+
+        self._new_episode_tables.append(ep_table)
+        # Rebuilt on next access, see `columnar_cache`
+        self._columnar_cache = None
 
     def clear_episode_buffer(self) -> None:
         episode_index = self.episode_buffer["episode_index"]
+        if self.video_encoders is not None:
+            for encoder in self.video_encoders.values():
+                encoder.cancel_episode()
+
         if self.image_writer is not None:
-            for cam_key in self.meta.camera_keys:
-                img_dir = self._get_image_file_path(
-                    episode_index=episode_index, image_key=cam_key, frame_index=0
-                ).parent
-                if img_dir.is_dir():
-                    shutil.rmtree(img_dir)
+            self._delete_episode_images(episode_index)
 
         # Reset the buffer
         self.episode_buffer = self.create_episode_buffer()
 
+    def _delete_episode_images(self, episode_index: int) -> None:
+        for cam_key in self.meta.camera_keys:
+            img_dir = self._get_image_file_path(
+                episode_index=episode_index, image_key=cam_key, frame_index=0
+            ).parent
+            if img_dir.is_dir():
+                shutil.rmtree(img_dir)
+
+    def _get_total_episodes_and_frames(self) -> tuple[int, int]:
+        """Number of episodes and frames in the dataset, including the ones being finalized in the background."""
+        if self.episode_finalizer is None:
+            return self.meta.total_episodes, self.meta.total_frames
+        with self.episode_finalizer.lock:
+            return (
+                self.meta.total_episodes + self.episode_finalizer.num_pending_episodes,
+                self.meta.total_frames + self.episode_finalizer.num_pending_frames,
+            )
+
     def start_image_writer(self, num_processes: int = 0, num_threads: int = 4) -> None:
         if isinstance(self.image_writer, AsyncImageWriter):
             logging.warning(
@@ -930,6 +1221,67 @@ class LeRobotDataset(torch.utils.data.Dataset):
         if self.image_writer is not None:
             self.image_writer.wait_until_done()
 
+    def start_episode_finalizer(self, max_pending_episodes: int = 2) -> None:
+        """
+        Finalizes the saved episodes in a background thread (see `AsyncEpisodeFinalizer`): `save_episode`
+        returns as soon as the episode is queued, and only blocks when `max_pending_episodes` episodes are
+        already waiting to be finalized.
+        """
+        if self.episode_finalizer is not None:
+            logging.warning("The episode finalizer is already started, replacing it.")
+            self.stop_episode_finalizer()
+
+        self.episode_finalizer = AsyncEpisodeFinalizer(max_pending_episodes)
+
+    def stop_episode_finalizer(self) -> None:
+        """
+        Waits for the pending episodes to be finalized and stops the background thread. This needs to be called
+        before using the dataset (e.g. pushing it to the hub) once recording is done.
+        """
+        if self.episode_finalizer is not None:
+            episode_finalizer, self.episode_finalizer = self.episode_finalizer, None
+            episode_finalizer.stop()
+
+    def _wait_episode_finalizer(self) -> None:
+        """Wait for the pending episodes to be finalized."""
+        if self.episode_finalizer is not None:
+            self.episode_finalizer.wait_until_done()
+
+    def start_video_encoders(self, num_slots: int = 32) -> None:
+        """
+        Encodes the frames of each video key while they are recorded, instead of writing them as png and
+        encoding them in `save_episode`. Each video key gets its own encoder process, fed through a ring buffer
+        of `num_slots` frames in shared memory (see `StreamingVideoEncoder`).
+        """
+        if self.video_encoders is not None:
+            logging.warning("Video encoders are already started, replacing them.")
+            self.stop_video_encoders()
+        if self.episode_buffer is not None and self.episode_buffer["size"] > 0:
+            raise RuntimeError("Video encoders can't be started in the middle of an episode.")
+
+        self.video_encoders = {}
+        for key in self.meta.video_keys:
+            ft = self.features[key]
+            names = ft["names"] if ft["names"] is not None else ["height", "width", "channels"]
+            height, width = ft["shape"][names.index("height")], ft["shape"][names.index("width")]
+            self.video_encoders[key] = StreamingVideoEncoder(self.fps, height, width, num_slots=num_slots)
+
+    def stop_video_encoders(self) -> None:
+        """
+        Stops the encoder processes, discarding the video of the episode being recorded if any. Like
+        `stop_image_writer`, this needs to be called for the LeRobotDataset object to be picklable.
+        """
+        if self.video_encoders is not None:
+            for encoder in self.video_encoders.values():
+                encoder.stop()
+            self.video_encoders = None
+
+    def _finish_video_encoders(self) -> dict:
+        """Finishes the videos encoded while recording and returns their stats."""
+        if self.video_encoders is None:
+            return {}
+        return {key: encoder.finish_episode() for key, encoder in self.video_encoders.items()}
+
     def encode_videos(self) -> None:
         """
         Use ffmpeg to convert frames stored as png into mp4 videos.
@@ -972,8 +1324,13 @@ class LeRobotDataset(torch.utils.data.Dataset):
         image_writer_processes: int = 0,
         image_writer_threads: int = 0,
         video_backend: str | None = None,
+        streaming_encoding: bool = False,
     ) -> "LeRobotDataset":
-        """Create a LeRobot Dataset from scratch in order to record data."""
+        """Create a LeRobot Dataset from scratch in order to record data.
+
+        With `streaming_encoding=True`, videos are encoded while the frames are added instead of being written
+        as png and encoded in `save_episode` (see `start_video_encoders`).
+        """
         obj = cls.__new__(cls)
         obj.meta = LeRobotDatasetMetadata.create(
             repo_id=repo_id,
@@ -988,6 +1345,8 @@ class LeRobotDataset(torch.utils.data.Dataset):
         obj.revision = None
         obj.tolerance_s = tolerance_s
         obj.image_writer = None
+        obj.video_encoders = None
+        obj.episode_finalizer = None
 
         if image_writer_processes or image_writer_threads:
             obj.start_image_writer(image_writer_processes, image_writer_threads)
@@ -995,6 +1354,9 @@ class LeRobotDataset(torch.utils.data.Dataset):
         # TODO(aliberts, rcadene, alexander-soare): Merge this with OnlineBuffer/DataBuffer
         obj.episode_buffer = obj.create_episode_buffer()
 
+        if streaming_encoding:
+            obj.start_video_encoders()
+
         obj.episodes = None
         obj.hf_dataset = obj.create_hf_dataset()
         obj.image_transforms = None
@@ -1002,6 +1364,11 @@ class LeRobotDataset(torch.utils.data.Dataset):
         obj.delta_indices = None
         obj.episode_data_index = None
         obj.video_backend = video_backend if video_backend is not None else get_safe_default_codec()
+        # Videos are (re-)encoded while recording, decoders are not kept open.
+        obj.video_decoder_pool = None
+        obj.return_uint8_frames = False
+        obj.columnar_cache = None
+        obj.frame_cache = None
         return obj
 
 
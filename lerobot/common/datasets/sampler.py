@@ -18,6 +18,25 @@ from typing import Iterator, Union
 import torch
 
 
+def get_episodes_indices(
+    episode_data_index: dict,
+    episode_indices_to_use: Union[list, None] = None,
+    drop_n_first_frames: int = 0,
+    drop_n_last_frames: int = 0,
+) -> list[list[int]]:
+    """Returns the list of frame indices of each episode to use, with the first and last frames dropped."""
+    episodes_indices = []
+    for episode_idx, (start_index, end_index) in enumerate(
+        zip(episode_data_index["from"], episode_data_index["to"], strict=True)
+    ):
+        if episode_indices_to_use is None or episode_idx in episode_indices_to_use:
+            episodes_indices.append(
+                list(range(start_index.item() + drop_n_first_frames, end_index.item() - drop_n_last_frames))
+            )
+
+    return episodes_indices
+
+
 class EpisodeAwareSampler:
     def __init__(
         self,
@@ -37,16 +56,11 @@ class EpisodeAwareSampler:
             drop_n_last_frames: Number of frames to drop from the end of each episode.
             shuffle: Whether to shuffle the indices.
         """
-        indices = []
-        for episode_idx, (start_index, end_index) in enumerate(
-            zip(episode_data_index["from"], episode_data_index["to"], strict=True)
-        ):
-            if episode_indices_to_use is None or episode_idx in episode_indices_to_use:
-                indices.extend(
-                    range(start_index.item() + drop_n_first_frames, end_index.item() - drop_n_last_frames)
-                )
-
-        self.indices = indices
+        episodes_indices = get_episodes_indices(
+            episode_data_index, episode_indices_to_use, drop_n_first_frames, drop_n_last_frames
+        )
+
+        self.indices = [idx for episode_indices in episodes_indices for idx in episode_indices]
         self.shuffle = shuffle
 
     def __iter__(self) -> Iterator[int]:
@@ -59,3 +73,73 @@ class EpisodeAwareSampler:
 
     def __len__(self) -> int:
         return len(self.indices)
+
+
+class EpisodeGroupedBatchSampler:
+    def __init__(
+        self,
+        episode_data_index: dict,
+        batch_size: int,
+        episode_indices_to_use: Union[list, None] = None,
+        drop_n_first_frames: int = 0,
+        drop_n_last_frames: int = 0,
+        shuffle: bool = False,
+        drop_last: bool = False,
+    ):
+        """Batch sampler yielding batches made of frames from as few episodes as possible.
+
+        Frames are laid out episode after episode (in random order when shuffling, both the episodes and the
+        frames within each episode) before being cut into batches, so that a batch spans one or two episodes
+        when `batch_size` is smaller than the episodes. Coupled with `LeRobotDataset.__getitems__`, each video
+        file is then decoded once per batch instead of once per frame. Note that batches are less diverse than
+        with `EpisodeAwareSampler`.
+
+        Args:
+            episode_data_index: Dictionary with keys 'from' and 'to' containing the start and end indices of each episode.
+            batch_size: Number of frames per batch.
+            episode_indices_to_use: List of episode indices to use. If None, all episodes are used.
+                                    Assumes that episodes are indexed from 0 to N-1.
+            drop_n_first_frames: Number of frames to drop from the start of each episode.
+            drop_n_last_frames: Number of frames to drop from the end of each episode.
+            shuffle: Whether to shuffle the episodes, the frames within each episode and the batches.
+            drop_last: Whether to drop the last batch if it is smaller than `batch_size`.
+        """
+        if batch_size < 1:
+            raise ValueError(f"`batch_size` should be a positive integer, got {batch_size}.")
+
+        self.episodes_indices = [
+            episode_indices
+            for episode_indices in get_episodes_indices(
+                episode_data_index, episode_indices_to_use, drop_n_first_frames, drop_n_last_frames
+            )
+            if len(episode_indices) > 0
+        ]
+        self.num_frames = sum(len(episode_indices) for episode_indices in self.episodes_indices)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+
+    def __iter__(self) -> Iterator[list[int]]:
+        if self.shuffle:
+            indices = [
+                self.episodes_indices[ep][i]
+                for ep in torch.randperm(len(self.episodes_indices)).tolist()
+                for i in torch.randperm(len(self.episodes_indices[ep])).tolist()
+            ]
+        else:
+            indices = [idx for episode_indices in self.episodes_indices for idx in episode_indices]
+
+        batches = [indices[i : i + self.batch_size] for i in range(0, len(indices), self.batch_size)]
+        if self.drop_last and len(batches) > 0 and len(batches[-1]) < self.batch_size:
+            batches.pop()
+
+        if self.shuffle:
+            for i in torch.randperm(len(batches)).tolist():
+                yield batches[i]
+        else:
+            yield from batches
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return self.num_frames // self.batch_size
+        return (self.num_frames + self.batch_size - 1) // self.batch_size
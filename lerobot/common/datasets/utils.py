@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import contextlib
+import hashlib
 import importlib.resources
 import json
 import logging
@@ -28,6 +29,7 @@ import datasets
 import jsonlines
 import numpy as np
 import packaging.version
+import pyarrow as pa
 import torch
 from datasets.table import embed_table_storage
 from huggingface_hub import DatasetCard, DatasetCardData, HfApi
@@ -51,6 +53,7 @@ EPISODES_PATH = "meta/episodes.jsonl"
 STATS_PATH = "meta/stats.json"
 EPISODES_STATS_PATH = "meta/episodes_stats.jsonl"
 TASKS_PATH = "meta/tasks.jsonl"
+MANIFEST_PATH = "meta/manifest.jsonl"
 
 DEFAULT_VIDEO_PATH = "videos/chunk-{episode_chunk:03d}/{video_key}/episode_{episode_index:06d}.mp4"
 DEFAULT_PARQUET_PATH = "data/chunk-{episode_chunk:03d}/episode_{episode_index:06d}.parquet"
@@ -133,6 +136,33 @@ def serialize_dict(stats: dict[str, torch.Tensor | np.ndarray | dict]) -> dict:
     return unflatten_dict(serialized_dict)
 
 
+def numpy_to_arrow(array: np.ndarray, pa_type: pa.DataType) -> pa.Array:
+    """Converts a batch of values (one per row) to an Arrow array of type `pa_type`. Nested lists, including the
+    storage of `ArrayXD` extension types, are built from the flattened values without converting them to python
+    objects (except for strings)."""
+    array = np.asarray(array)
+    if isinstance(pa_type, pa.ExtensionType):
+        return pa.ExtensionArray.from_storage(pa_type, numpy_to_arrow(array, pa_type.storage_type))
+    if pa.types.is_fixed_size_list(pa_type) or pa.types.is_list(pa_type):
+        values = numpy_to_arrow(array.reshape(-1, *array.shape[2:]), pa_type.value_type)
+        if pa.types.is_fixed_size_list(pa_type):
+            return pa.FixedSizeListArray.from_arrays(values, pa_type.list_size)
+        offsets = np.arange(len(array) + 1, dtype=np.int32) * array.shape[1]
+        return pa.ListArray.from_arrays(pa.array(offsets), values)
+    if pa.types.is_string(pa_type) or pa.types.is_large_string(pa_type):
+        return pa.array(array.reshape(len(array)).tolist(), type=pa_type)
+    return pa.array(np.ascontiguousarray(array).reshape(len(array)), type=pa_type)
+
+
+def image_files_to_arrow(image_paths: list[str | Path]) -> pa.StructArray:
+    """Embeds image files in an Arrow array of `datasets.Image` type, like `embed_images` does."""
+    images = []
+    for fpath in image_paths:
+        with open(fpath, "rb") as f:
+            images.append({"bytes": f.read(), "path": Path(fpath).name})
+    return pa.array(images, type=datasets.Image().pa_type)
+
+
 def embed_images(dataset: datasets.Dataset) -> datasets.Dataset:
     # Embed image bytes into the table before saving to parquet
     format = dataset.format
@@ -237,6 +267,33 @@ def load_episodes_stats(local_dir: Path) -> dict:
     }
 
 
+def get_file_checksum(fpath: Path, chunk_size: int = 2**20) -> str:
+    hasher = hashlib.sha256()
+    with open(fpath, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def write_manifest_entry(episode_index: int, files: list[str | Path], local_dir: Path):
+    """Appends the size and checksum of the files of an episode to the manifest."""
+    files_dict = {}
+    for fpath in files:
+        files_dict[str(fpath)] = {
+            "size": (local_dir / fpath).stat().st_size,
+            "sha256": get_file_checksum(local_dir / fpath),
+        }
+    append_jsonlines({"episode_index": episode_index, "files": files_dict}, local_dir / MANIFEST_PATH)
+
+
+def load_manifest(local_dir: Path) -> dict:
+    """Files of each episode in the manifest, or an empty dict if the dataset has no manifest. When an episode
+    appears several times, its last entry is kept."""
+    if not (local_dir / MANIFEST_PATH).is_file():
+        return {}
+    return {item["episode_index"]: item["files"] for item in load_jsonlines(local_dir / MANIFEST_PATH)}
+
+
 def backward_compatible_episodes_stats(
     stats: dict[str, dict[str, np.ndarray]], episodes: list[int]
 ) -> dict[str, dict[str, np.ndarray]]:
@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Streaming video encoding for recording.
+
+By default, recorded frames are written as PNG files by the `AsyncImageWriter` and encoded into an mp4 once the
+episode is saved, which means decoding every PNG again and blocking the recording between episodes. A
+`StreamingVideoEncoder` instead owns a subprocess that encodes the frames of a camera as they are recorded. The
+frames are passed through a shared-memory ring buffer so that only a slot index goes through the queue, and the
+video is complete as soon as the encoder is flushed at the end of the episode.
+"""
+
+import contextlib
+import logging
+import multiprocessing
+import queue
+import traceback
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import av
+import numpy as np
+import PIL.Image
+import torch
+
+from lerobot.common.datasets.compute_stats import auto_downsample_height_width
+from lerobot.common.datasets.image_writer import image_array_to_uint8_hwc
+from lerobot.common.datasets.video_utils import get_video_encoder_options
+
+
+class RunningImageStats:
+    """Per-channel min, max, mean and std of uint8 (h, w, c) frames, updated one frame at a time.
+
+    Frames are downsampled the same way as in `compute_episode_stats`, and the stats are returned in the same
+    format (normalized to [0, 1], with (c, 1, 1) arrays). Unlike `compute_episode_stats`, which samples a subset
+    of the frames once the episode is over, every frame contributes to the stats.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.sum = None
+        self.sum_sq = None
+        self.num_pixels = 0
+
+    def update(self, frame: np.ndarray) -> None:
+        pixels = auto_downsample_height_width(frame.transpose(2, 0, 1)).reshape(frame.shape[-1], -1)
+        values = pixels.astype(np.float64)
+        if self.count == 0:
+            self.min = pixels.min(axis=1)
+            self.max = pixels.max(axis=1)
+            self.sum = values.sum(axis=1)
+            self.sum_sq = np.square(values).sum(axis=1)
+        else:
+            self.min = np.minimum(self.min, pixels.min(axis=1))
+            self.max = np.maximum(self.max, pixels.max(axis=1))
+            self.sum += values.sum(axis=1)
+            self.sum_sq += np.square(values).sum(axis=1)
+        self.num_pixels += pixels.shape[1]
+        self.count += 1
+
+    def get(self) -> dict[str, np.ndarray]:
+        if self.count == 0:
+            raise ValueError("No frame was added, stats can't be computed.")
+        mean = self.sum / self.num_pixels
+        std = np.sqrt(np.maximum(self.sum_sq / self.num_pixels - np.square(mean), 0.0))
+        stats = {"min": self.min, "max": self.max, "mean": mean, "std": std}
+        stats = {k: (v / 255.0).reshape(-1, 1, 1) for k, v in stats.items()}
+        stats["count"] = np.array([self.count])
+        return stats
+
+
+class _EpisodeVideo:
+    """Video of the current episode, opened in the encoder process."""
+
+    def __init__(
+        self, video_path: str, fps: int, frame_shape: tuple, vcodec: str, pix_fmt: str, video_options: dict
+    ):
+        self.video_path = Path(video_path)
+        self.video_path.parent.mkdir(parents=True, exist_ok=True)
+        self.output = av.open(str(self.video_path), "w")
+        self.output_stream = self.output.add_stream(vcodec, fps, options=video_options)
+        self.output_stream.pix_fmt = pix_fmt
+        self.output_stream.height, self.output_stream.width = frame_shape[:2]
+        self.stats = RunningImageStats()
+
+    def encode(self, frame: np.ndarray) -> None:
+        packet = self.output_stream.encode(av.VideoFrame.from_ndarray(frame, format="rgb24"))
+        if packet:
+            self.output.mux(packet)
+        self.stats.update(frame)
+
+    def close(self) -> None:
+        # Flush the encoder
+        packet = self.output_stream.encode()
+        if packet:
+            self.output.mux(packet)
+        self.output.close()
+
+    def discard(self) -> None:
+        try:
+            self.output.close()
+        finally:
+            self.video_path.unlink(missing_ok=True)
+
+
+def encoder_process(
+    shm: shared_memory.SharedMemory,
+    num_slots: int,
+    frame_shape: tuple,
+    free_slots: multiprocessing.Semaphore,
+    commands: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    fps: int,
+    vcodec: str,
+    pix_fmt: str,
+    video_options: dict,
+):
+    ring = np.ndarray((num_slots, *frame_shape), dtype=np.uint8, buffer=shm.buf)
+    logging.getLogger("libav").setLevel(av.logging.ERROR)
+    video = None
+    error = None
+    while True:
+        command = commands.get()
+        if command is None:
+            break
+
+        name, arg = command
+        if name == "frame":
+            # Once an error occurred, the remaining frames of the episode are dropped until it is finished.
+            if video is not None and error is None:
+                try:
+                    video.encode(ring[arg])
+                except Exception:
+                    error = traceback.format_exc()
+            free_slots.release()
+
+        elif name == "start":
+            try:
+                video = _EpisodeVideo(arg, fps, frame_shape, vcodec, pix_fmt, video_options)
+                error = None
+            except Exception:
+                video, error = None, traceback.format_exc()
+
+        elif name == "finish":
+            stats = None
+            if video is not None and error is None:
+                try:
+                    video.close()
+                    stats = video.stats.get()
+                except Exception:
+                    error = traceback.format_exc()
+            if error is not None and video is not None:
+                video.discard()
+            results.put((stats, error))
+            video, error = None, None
+
+        elif name == "cancel":
+            if video is not None:
+                with contextlib.suppress(Exception):
+                    video.discard()
+            results.put((None, None))
+            video, error = None, None
+
+    del ring
+    shm.close()
+
+
+class StreamingVideoEncoder:
+    """
+    Encodes the frames of one camera into an mp4, one episode at a time, in a dedicated process.
+
+    Frames are copied into a ring buffer of `num_slots` frames in shared memory, and their slot index is sent to
+    the encoder process, which frees the slot once the frame is encoded. `add_frame` only blocks when the
+    encoder lags `num_slots` frames behind.
+
+    The codec arguments are the same as for `encode_video_frames`.
+    """
+
+    def __init__(
+        self,
+        fps: int,
+        height: int,
+        width: int,
+        vcodec: str = "libsvtav1",
+        pix_fmt: str = "yuv420p",
+        g: int | None = 2,
+        crf: int | None = 30,
+        fast_decode: int = 0,
+        num_slots: int = 32,
+    ):
+        if num_slots <= 0:
+            raise ValueError(f"The ring buffer needs at least one slot, got {num_slots=}.")
+
+        pix_fmt, video_options = get_video_encoder_options(vcodec, pix_fmt, g, crf, fast_decode)
+        self.frame_shape = (height, width, 3)
+        self.num_slots = num_slots
+        self.video_path = None
+        self.num_frames = 0
+        self._next_slot = 0
+        self._stopped = False
+
+        self.shm = shared_memory.SharedMemory(create=True, size=num_slots * height * width * 3)
+        self.ring = np.ndarray((num_slots, *self.frame_shape), dtype=np.uint8, buffer=self.shm.buf)
+        self.free_slots = multiprocessing.Semaphore(num_slots)
+        self.commands = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        self.process = multiprocessing.Process(
+            target=encoder_process,
+            args=(
+                self.shm,
+                num_slots,
+                self.frame_shape,
+                self.free_slots,
+                self.commands,
+                self.results,
+                fps,
+                vcodec,
+                pix_fmt,
+                video_options,
+            ),
+        )
+        self.process.daemon = True
+        self.process.start()
+
+    def start_episode(self, video_path: Path | str) -> None:
+        if self.video_path is not None:
+            raise RuntimeError(f"The video '{self.video_path}' is still being encoded.")
+        self.commands.put(("start", str(video_path)))
+        self.video_path = Path(video_path)
+        self.num_frames = 0
+
+    def add_frame(self, image: torch.Tensor | np.ndarray | PIL.Image.Image) -> None:
+        if self.video_path is None:
+            raise RuntimeError("`start_episode` needs to be called before adding frames.")
+
+        if isinstance(image, torch.Tensor):
+            image = image.cpu().numpy()
+        frame = image_array_to_uint8_hwc(np.asarray(image))
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"Frame of shape {frame.shape} doesn't match the encoder's {self.frame_shape}.")
+
+        self.free_slots.acquire()
+        slot = self._next_slot
+        self.ring[slot] = frame
+        self.commands.put(("frame", slot))
+        self._next_slot = (slot + 1) % self.num_slots
+        self.num_frames += 1
+
+    def finish_episode(self) -> dict[str, np.ndarray]:
+        """Flushes the encoder and closes the video. Returns the stats of the encoded frames, in the format of
+        `compute_episode_stats`."""
+        if self.video_path is None:
+            raise RuntimeError("No video is being encoded.")
+        self.commands.put(("finish", None))
+        stats, error = self._wait_result()
+        video_path, self.video_path = self.video_path, None
+        if error is not None:
+            raise RuntimeError(f"Encoding of '{video_path}' failed:\n{error}")
+        return stats
+
+    def cancel_episode(self) -> None:
+        """Stops encoding the current episode and deletes its video."""
+        if self.video_path is None:
+            return
+        self.commands.put(("cancel", None))
+        self._wait_result()
+        self.video_path = None
+
+    def _wait_result(self) -> tuple:
+        while True:
+            try:
+                return self.results.get(timeout=1.0)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    raise RuntimeError(
+                        f"The encoder process exited unexpectedly (exit code {self.process.exitcode})."
+                    ) from None
+
+    def stop(self) -> None:
+        if self._stopped:
+            return
+
+        if self.process.is_alive():
+            self.cancel_episode()
+            self.commands.put(None)
+            self.process.join()
+        self.commands.close()
+        self.commands.join_thread()
+        self.results.close()
+
+        del self.ring
+        self.shm.close()
+        self.shm.unlink()
+        self._stopped = True
@@ -16,7 +16,10 @@
 import glob
 import importlib
 import logging
+import os
+import threading
 import warnings
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, ClassVar
@@ -39,11 +42,105 @@ def get_safe_default_codec():
         return "pyav"
 
 
+def open_video_decoder(video_path: Path | str, backend: str) -> Any:
+    """Opens a cpu decoder for `video_path` with the given backend ("torchcodec", "pyav" or "video_reader")."""
+    if backend == "torchcodec":
+        if importlib.util.find_spec("torchcodec"):
+            from torchcodec.decoders import VideoDecoder
+        else:
+            raise ImportError("torchcodec is required but not available.")
+        return VideoDecoder(str(video_path), device="cpu", seek_mode="approximate")
+    elif backend in ["pyav", "video_reader"]:
+        torchvision.set_video_backend(backend)
+        return torchvision.io.VideoReader(str(video_path), "video")
+    else:
+        raise ValueError(f"Unsupported video backend: {backend}")
+
+
+def close_video_decoder(decoder: Any) -> None:
+    # Only the pyav reader holds an explicit container, torchcodec decoders are released when collected.
+    container = getattr(decoder, "container", None)
+    if container is not None:
+        container.close()
+
+
+class VideoDecoderPool:
+    """Per-process LRU pool of open video decoders, keyed by (video path, backend).
+
+    Opening and probing an mp4 container dominates the cost of decoding the few frames needed by a single
+    sample. Keeping the decoders open lets consecutive samples from the same episode reuse them. When the pool
+    holds more than `capacity` decoders, the least recently used one is closed.
+
+    The pool is safe to hold in a dataset handed to DataLoader workers: open decoders are dropped when the pool
+    is pickled (spawn/forkserver start methods), and a pool inherited through `fork` notices it runs in a new
+    process and starts over empty instead of reusing the parent's decoders.
+    """
+
+    def __init__(self, capacity: int = 16):
+        if capacity < 1:
+            raise ValueError(f"The pool capacity should be at least 1, got {capacity}.")
+        self.capacity = capacity
+        self._reset()
+
+    def _reset(self) -> None:
+        self._decoders: OrderedDict[tuple[str, str], Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _ensure_owned_by_current_process(self) -> None:
+        if self._pid != os.getpid():
+            # Decoders created before a fork share their underlying file state with the parent process, so
+            # they are forgotten rather than closed.
+            self._reset()
+
+    def get(self, video_path: Path | str, backend: str) -> Any:
+        """Returns an open decoder for `video_path`, opening it (and evicting the oldest one) if needed."""
+        self._ensure_owned_by_current_process()
+        key = (str(video_path), backend)
+        with self._lock:
+            decoder = self._decoders.get(key)
+            if decoder is not None:
+                self._decoders.move_to_end(key)
+                return decoder
+
+            decoder = open_video_decoder(video_path, backend)
+            self._decoders[key] = decoder
+            while len(self._decoders) > self.capacity:
+                _, evicted = self._decoders.popitem(last=False)
+                close_video_decoder(evicted)
+
+        return decoder
+
+    def clear(self) -> None:
+        """Closes every decoder held by the pool."""
+        self._ensure_owned_by_current_process()
+        with self._lock:
+            for decoder in self._decoders.values():
+                close_video_decoder(decoder)
+            self._decoders.clear()
+
+    def __contains__(self, key: tuple[Path | str, str]) -> bool:
+        video_path, backend = key
+        return self._pid == os.getpid() and (str(video_path), backend) in self._decoders
+
+    def __len__(self) -> int:
+        return len(self._decoders) if self._pid == os.getpid() else 0
+
+    def __getstate__(self) -> dict:
+        return {"capacity": self.capacity}
+
+    def __setstate__(self, state: dict) -> None:
+        self.capacity = state["capacity"]
+        self._reset()
+
+
 def decode_video_frames(
     video_path: Path | str,
     timestamps: list[float],
     tolerance_s: float,
     backend: str | None = None,
+    decoder_pool: VideoDecoderPool | None = None,
+    return_uint8: bool = False,
 ) -> torch.Tensor:
     """
     Decodes video frames using the specified backend.
@@ -53,6 +150,9 @@ def decode_video_frames(
         timestamps (list[float]): List of timestamps to extract frames.
         tolerance_s (float): Allowed deviation in seconds for frame retrieval.
         backend (str, optional): Backend to use for decoding. Defaults to "torchcodec" when available in the platform; otherwise, defaults to "pyav"..
+        decoder_pool (VideoDecoderPool, optional): Pool of already opened decoders to reuse. When None, a
+            new decoder is opened (and closed) for this call only.
+        return_uint8 (bool, optional): Return the frames as decoded, in uint8, instead of float32 in [0,1].
 
     Returns:
         torch.Tensor: Decoded frames.
@@ -62,9 +162,13 @@ def decode_video_frames(
     if backend is None:
         backend = get_safe_default_codec()
     if backend == "torchcodec":
-        return decode_video_frames_torchcodec(video_path, timestamps, tolerance_s)
+        return decode_video_frames_torchcodec(
+            video_path, timestamps, tolerance_s, decoder_pool=decoder_pool, return_uint8=return_uint8
+        )
     elif backend in ["pyav", "video_reader"]:
-        return decode_video_frames_torchvision(video_path, timestamps, tolerance_s, backend)
+        return decode_video_frames_torchvision(
+            video_path, timestamps, tolerance_s, backend, decoder_pool=decoder_pool, return_uint8=return_uint8
+        )
     else:
         raise ValueError(f"Unsupported video backend: {backend}")
 
@@ -75,6 +179,8 @@ def decode_video_frames_torchvision(
     tolerance_s: float,
     backend: str = "pyav",
     log_loaded_timestamps: bool = False,
+    decoder_pool: VideoDecoderPool | None = None,
+    return_uint8: bool = False,
 ) -> torch.Tensor:
     """Loads frames associated to the requested timestamps of a video
 
@@ -105,7 +211,10 @@ def decode_video_frames_torchvision(
 
     # set a video stream reader
     # TODO(rcadene): also load audio stream at the same time
-    reader = torchvision.io.VideoReader(video_path, "video")
+    if decoder_pool is not None:
+        reader = decoder_pool.get(video_path, backend)
+    else:
+        reader = torchvision.io.VideoReader(video_path, "video")
 
     # set the first and last requested timestamps
     # Note: previous timestamps are usually loaded, since we need to access the previous key frame
@@ -129,7 +238,7 @@ def decode_video_frames_torchvision(
         if current_ts >= last_ts:
             break
 
-    if backend == "pyav":
+    if backend == "pyav" and decoder_pool is None:
         reader.container.close()
 
     reader = None
@@ -161,7 +270,8 @@ def decode_video_frames_torchvision(
         logging.info(f"{closest_ts=}")
 
     # convert to the pytorch format which is float32 in [0,1] range (and channel first)
-    closest_frames = closest_frames.type(torch.float32) / 255
+    if not return_uint8:
+        closest_frames = closest_frames.type(torch.float32) / 255
 
     assert len(timestamps) == len(closest_frames)
     return closest_frames
@@ -173,11 +283,15 @@ def decode_video_frames_torchcodec(
     tolerance_s: float,
     device: str = "cpu",
     log_loaded_timestamps: bool = False,
+    decoder_pool: VideoDecoderPool | None = None,
+    return_uint8: bool = False,
 ) -> torch.Tensor:
     """Loads frames associated with the requested timestamps of a video using torchcodec.
 
     Note: Setting device="cuda" outside the main process, e.g. in data loader workers, will lead to CUDA initialization errors.
 
+    Note: `decoder_pool` only holds cpu decoders, it is ignored for any other device.
+
     Note: Video benefits from inter-frame compression. Instead of storing every frame individually,
     the encoder stores a reference frame (or a key frame) and subsequent frames as differences relative to
     that key frame. As a consequence, to access a requested frame, we need to load the preceding key frame,
@@ -191,7 +305,10 @@ def decode_video_frames_torchcodec(
         raise ImportError("torchcodec is required but not available.")
 
     # initialize video decoder
-    decoder = VideoDecoder(video_path, device=device, seek_mode="approximate")
+    if decoder_pool is not None and device == "cpu":
+        decoder = decoder_pool.get(video_path, "torchcodec")
+    else:
+        decoder = VideoDecoder(video_path, device=device, seek_mode="approximate")
     loaded_frames = []
     loaded_ts = []
     # get metadata for frame information
@@ -236,12 +353,49 @@ def decode_video_frames_torchcodec(
         logging.info(f"{closest_ts=}")
 
     # convert to float32 in [0,1] range (channel first)
-    closest_frames = closest_frames.type(torch.float32) / 255
+    if not return_uint8:
+        closest_frames = closest_frames.type(torch.float32) / 255
 
     assert len(timestamps) == len(closest_frames)
     return closest_frames
 
 
+def get_video_encoder_options(
+    vcodec: str = "libsvtav1",
+    pix_fmt: str = "yuv420p",
+    g: int | None = 2,
+    crf: int | None = 30,
+    fast_decode: int = 0,
+) -> tuple[str, dict[str, str]]:
+    """Checks the codec and pixel format, and returns the pixel format to use along with the codec options."""
+    # Check encoder availability
+    if vcodec not in ["h264", "hevc", "libsvtav1"]:
+        raise ValueError(f"Unsupported video codec: {vcodec}. Supported codecs are: h264, hevc, libsvtav1.")
+
+    # Encoders/pixel formats incompatibility check
+    if (vcodec == "libsvtav1" or vcodec == "hevc") and pix_fmt == "yuv444p":
+        logging.warning(
+            f"Incompatible pixel format 'yuv444p' for codec {vcodec}, auto-selecting format 'yuv420p'"
+        )
+        pix_fmt = "yuv420p"
+
+    # Define video codec options
+    video_options = {}
+
+    if g is not None:
+        video_options["g"] = str(g)
+
+    if crf is not None:
+        video_options["crf"] = str(crf)
+
+    if fast_decode:
+        key = "svtav1-params" if vcodec == "libsvtav1" else "tune"
+        value = f"fast-decode={fast_decode}" if vcodec == "libsvtav1" else "fastdecode"
+        video_options[key] = value
+
+    return pix_fmt, video_options
+
+
 def encode_video_frames(
     imgs_dir: Path | str,
     video_path: Path | str,
@@ -255,22 +409,13 @@ def encode_video_frames(
     overwrite: bool = False,
 ) -> None:
     """More info on ffmpeg arguments tuning on `benchmark/video/README.md`"""
-    # Check encoder availability
-    if vcodec not in ["h264", "hevc", "libsvtav1"]:
-        raise ValueError(f"Unsupported video codec: {vcodec}. Supported codecs are: h264, hevc, libsvtav1.")
+    pix_fmt, video_options = get_video_encoder_options(vcodec, pix_fmt, g, crf, fast_decode)
 
     video_path = Path(video_path)
     imgs_dir = Path(imgs_dir)
 
     video_path.parent.mkdir(parents=True, exist_ok=overwrite)
 
-    # Encoders/pixel formats incompatibility check
-    if (vcodec == "libsvtav1" or vcodec == "hevc") and pix_fmt == "yuv444p":
-        logging.warning(
-            f"Incompatible pixel format 'yuv444p' for codec {vcodec}, auto-selecting format 'yuv420p'"
-        )
-        pix_fmt = "yuv420p"
-
     # Get input frames
     template = "frame_" + ("[0-9]" * 6) + ".png"
     input_list = sorted(
@@ -283,20 +428,6 @@ def encode_video_frames(
     dummy_image = Image.open(input_list[0])
     width, height = dummy_image.size
 
-    # Define video codec options
-    video_options = {}
-
-    if g is not None:
-        video_options["g"] = str(g)
-
-    if crf is not None:
-        video_options["crf"] = str(crf)
-
-    if fast_decode:
-        key = "svtav1-params" if vcodec == "libsvtav1" else "tune"
-        value = f"fast-decode={fast_decode}" if vcodec == "libsvtav1" else "fastdecode"
-        video_options[key] = value
-
     # Set logging level
     if log_level is not None:
         # "While less efficient, it is generally preferable to modify logging with Python’s logging"
@@ -247,6 +247,7 @@ class DynamixelMotorsBus(MotorsBus):
         return _split_into_byte_chunks(value, length)
 
     def broadcast_ping(self, num_retry: int = 0, raise_on_error: bool = False) -> dict[int, int] | None:
+        self._receive_pending_sync_read()
         for n_try in range(1 + num_retry):
             data_list, comm = self.packet_handler.broadcastPing(self.port_handler)
             if self._is_comm_success(comm):
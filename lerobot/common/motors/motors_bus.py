@@ -21,13 +21,16 @@
 
 import abc
 import logging
+import time
 from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import Enum
 from functools import cached_property
 from pprint import pformat
+from threading import Event, Lock, RLock, Thread
 from typing import Protocol, TypeAlias
 
+import numpy as np
 import serial
 from deepdiff import DeepDiff
 from tqdm import tqdm
@@ -99,6 +102,21 @@ class Motor:
     norm_mode: MotorNormMode
 
 
+@dataclass
+class CalibrationArrays:
+    """Calibration and normalization mode of the motors of a bus, as arrays indexed like `MotorsBus.motors`."""
+
+    calibrated: np.ndarray
+    range_min: np.ndarray
+    range_max: np.ndarray
+    # Whether the normalized values are inverted (only when the bus applies the drive mode)
+    inverted: np.ndarray
+    # Largest position of the encoder
+    max_res: np.ndarray
+    is_range_m100_100: np.ndarray
+    is_range_0_100: np.ndarray
+
+
 class JointOutOfRangeError(Exception):
     def __init__(self, message="Joint is out of range"):
         self.message = message
@@ -268,7 +286,6 @@ class MotorsBus(abc.ABC):
     ):
         self.port = port
         self.motors = motors
-        self.calibration = calibration if calibration else {}
 
         self.port_handler: PortHandler
         self.packet_handler: PacketHandler
@@ -280,8 +297,67 @@ class MotorsBus(abc.ABC):
         self._id_to_model_dict = {m.id: m.model for m in self.motors.values()}
         self._id_to_name_dict = {m.id: motor for motor, m in self.motors.items()}
         self._model_nb_to_model_dict = {v: k for k, v in self.model_number_table.items()}
+        self._id_to_index_dict = {m.id: i for i, m in enumerate(self.motors.values())}
+        self._motor_indices_cache: dict[tuple[int, ...], np.ndarray] = {}
+
+        # Sync readers and writers (with the last written values) per (address, length, motor ids)
+        self._sync_readers: dict[tuple[int, int, tuple[int, ...]], GroupSyncRead] = {}
+        self._sync_writers: dict[tuple[int, int, tuple[int, ...]], tuple[GroupSyncWrite, dict[int, int]]] = {}
+        # Sync read whose request was sent by `_pipelined_sync_read` but whose response isn't received yet, and
+        # values received for it, along with the time the request was sent, see `_receive_pending_sync_read`
+        self._pending_sync_read: tuple[tuple[int, int, tuple[int, ...]], float] | None = None
+        self._prefetched_sync_read: tuple[tuple[int, int, tuple[int, ...]], dict[int, int], float] | None = (
+            None
+        )
+        # Prefetched values older than this are discarded, and read again by `_pipelined_sync_read`
+        self.pipelined_read_max_age_s = 0.1
+
+        # Background I/O thread, see `start_io_thread`
+        self.io_thread: Thread | None = None
+        self.io_stop_event: Event | None = None
+        # Error which stopped the I/O thread, re-raised by the methods using it
+        self._io_error: DeviceNotConnectedError | None = None
+        # Consecutive errors of the I/O thread since its last successful iteration, and the last of them
+        self._io_num_failures = 0
+        self._io_last_failure: Exception | None = None
+        self.io_lock = RLock()
+        self._goal_lock = Lock()
+        self._goal_mailbox: dict[str, Value] | None = None
+        self._io_motors: list[str] = []
+        self._io_data_index: dict[str, int] = {}
+        # Double buffers of the values read by the I/O thread, the front one being `_io_seq % 2`
+        self._io_values: list[np.ndarray] = []
+        self._io_timestamps: list[np.ndarray] = []
+        self._io_seq = 0
 
         self._validate_motors()
+        self.calibration = calibration if calibration else {}
+
+    @property
+    def calibration(self) -> dict[str, MotorCalibration]:
+        return self._calibration
+
+    @calibration.setter
+    def calibration(self, calibration: dict[str, MotorCalibration]) -> None:
+        self._calibration = calibration
+        self._calibration_arrays = self._get_calibration_arrays(calibration)
+
+    def _get_calibration_arrays(self, calibration: dict[str, MotorCalibration]) -> CalibrationArrays:
+        calibrations = [calibration.get(motor) for motor in self.motors]
+        norm_modes = [m.norm_mode for m in self.motors.values()]
+        return CalibrationArrays(
+            calibrated=np.array([cal is not None for cal in calibrations], dtype=bool),
+            range_min=np.array([cal.range_min if cal else 0 for cal in calibrations], dtype=np.int64),
+            range_max=np.array([cal.range_max if cal else 0 for cal in calibrations], dtype=np.int64),
+            inverted=np.array(
+                [bool(cal and self.apply_drive_mode and cal.drive_mode) for cal in calibrations], dtype=bool
+            ),
+            max_res=np.array(
+                [self.model_resolution_table[m.model] - 1 for m in self.motors.values()], dtype=np.int64
+            ),
+            is_range_m100_100=np.array([mode is MotorNormMode.RANGE_M100_100 for mode in norm_modes]),
+            is_range_0_100=np.array([mode is MotorNormMode.RANGE_0_100 for mode in norm_modes]),
+        )
 
     def __len__(self):
         return len(self.motors)
@@ -466,6 +542,10 @@ class MotorsBus(abc.ABC):
                 f"{self.__class__.__name__}('{self.port}') is not connected. Try running `{self.__class__.__name__}.connect()` first."
             )
 
+        if self.io_thread is not None:
+            self.stop_io_thread()
+
+        self._pending_sync_read, self._prefetched_sync_read = None, None
         if disable_torque:
             self.port_handler.clearPort()
             self.port_handler.is_using = False
@@ -629,6 +709,7 @@ class MotorsBus(abc.ABC):
         Raises:
             RuntimeError: The SDK failed to apply the change.
         """
+        self._receive_pending_sync_read()
         present_bus_baudrate = self.port_handler.getBaudRate()
         if present_bus_baudrate != baudrate:
             logger.info(f"Setting bus baud rate to {baudrate}. Previously {present_bus_baudrate}.")
@@ -772,64 +853,79 @@ class MotorsBus(abc.ABC):
 
         return mins, maxes
 
-    def _normalize(self, ids_values: dict[int, int]) -> dict[int, float]:
+    def _get_motor_indices(self, motor_ids: tuple[int, ...]) -> np.ndarray:
+        """Indices of the motors in `self.motors`, cached per tuple of ids."""
+        indices = self._motor_indices_cache.get(motor_ids)
+        if indices is None:
+            indices = np.array([self._id_to_index_dict[id_] for id_ in motor_ids], dtype=np.intp)
+            self._motor_indices_cache[motor_ids] = indices
+        return indices
+
+    def _check_calibration(self, indices: np.ndarray) -> CalibrationArrays:
         if not self.calibration:
             raise RuntimeError(f"{self} has no calibration registered.")
 
-        normalized_values = {}
-        for id_, val in ids_values.items():
-            motor = self._id_to_name(id_)
-            min_ = self.calibration[motor].range_min
-            max_ = self.calibration[motor].range_max
-            drive_mode = self.apply_drive_mode and self.calibration[motor].drive_mode
-            if max_ == min_:
-                raise ValueError(f"Invalid calibration for motor '{motor}': min and max are equal.")
-
-            bounded_val = min(max_, max(min_, val))
-            if self.motors[motor].norm_mode is MotorNormMode.RANGE_M100_100:
-                norm = (((bounded_val - min_) / (max_ - min_)) * 200) - 100
-                normalized_values[id_] = -norm if drive_mode else norm
-            elif self.motors[motor].norm_mode is MotorNormMode.RANGE_0_100:
-                norm = ((bounded_val - min_) / (max_ - min_)) * 100
-                normalized_values[id_] = 100 - norm if drive_mode else norm
-            elif self.motors[motor].norm_mode is MotorNormMode.DEGREES:
-                mid = (min_ + max_) / 2
-                max_res = self.model_resolution_table[self._id_to_model(id_)] - 1
-                normalized_values[id_] = (val - mid) * 360 / max_res
-            else:
-                raise NotImplementedError
+        cal = self._calibration_arrays
+        names = list(self.motors)
+        missing = ~cal.calibrated[indices]
+        if missing.any():
+            raise KeyError(names[indices[missing.argmax()]])
+        invalid = cal.range_min[indices] == cal.range_max[indices]
+        if invalid.any():
+            motor = names[indices[invalid.argmax()]]
+            raise ValueError(f"Invalid calibration for motor '{motor}': min and max are equal.")
+        return cal
 
-        return normalized_values
+    def _normalize(self, ids_values: dict[int, int]) -> dict[int, float]:
+        indices = self._get_motor_indices(tuple(ids_values))
+        values = np.fromiter(ids_values.values(), dtype=np.int64, count=len(ids_values))
+        return dict(zip(ids_values, self._normalize_array(indices, values).tolist(), strict=True))
+
+    def _normalize_array(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Normalizes the raw `values` of the motors at `indices` in `self.motors`, for all of them at once."""
+        cal = self._check_calibration(indices)
+        min_, max_ = cal.range_min[indices], cal.range_max[indices]
+        inverted = cal.inverted[indices]
+
+        ratio = (np.minimum(max_, np.maximum(min_, values)) - min_) / (max_ - min_)
+        norm_m100_100 = ratio * 200 - 100
+        norm_m100_100 = np.where(inverted, -norm_m100_100, norm_m100_100)
+        norm_0_100 = ratio * 100
+        norm_0_100 = np.where(inverted, 100 - norm_0_100, norm_0_100)
+        mid = (min_ + max_) / 2
+        degrees = (values - mid) * 360 / cal.max_res[indices]
+
+        return np.select(
+            [cal.is_range_m100_100[indices], cal.is_range_0_100[indices]],
+            [norm_m100_100, norm_0_100],
+            default=degrees,
+        )
 
     def _unnormalize(self, ids_values: dict[int, float]) -> dict[int, int]:
-        if not self.calibration:
-            raise RuntimeError(f"{self} has no calibration registered.")
-
-        unnormalized_values = {}
-        for id_, val in ids_values.items():
-            motor = self._id_to_name(id_)
-            min_ = self.calibration[motor].range_min
-            max_ = self.calibration[motor].range_max
-            drive_mode = self.apply_drive_mode and self.calibration[motor].drive_mode
-            if max_ == min_:
-                raise ValueError(f"Invalid calibration for motor '{motor}': min and max are equal.")
-
-            if self.motors[motor].norm_mode is MotorNormMode.RANGE_M100_100:
-                val = -val if drive_mode else val
-                bounded_val = min(100.0, max(-100.0, val))
-                unnormalized_values[id_] = int(((bounded_val + 100) / 200) * (max_ - min_) + min_)
-            elif self.motors[motor].norm_mode is MotorNormMode.RANGE_0_100:
-                val = 100 - val if drive_mode else val
-                bounded_val = min(100.0, max(0.0, val))
-                unnormalized_values[id_] = int((bounded_val / 100) * (max_ - min_) + min_)
-            elif self.motors[motor].norm_mode is MotorNormMode.DEGREES:
-                mid = (min_ + max_) / 2
-                max_res = self.model_resolution_table[self._id_to_model(id_)] - 1
-                unnormalized_values[id_] = int((val * max_res / 360) + mid)
-            else:
-                raise NotImplementedError
-
-        return unnormalized_values
+        indices = self._get_motor_indices(tuple(ids_values))
+        values = np.fromiter(ids_values.values(), dtype=np.float64, count=len(ids_values))
+        return dict(zip(ids_values, self._unnormalize_array(indices, values).tolist(), strict=True))
+
+    def _unnormalize_array(self, indices: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Inverse of `_normalize_array`, returns raw integer values."""
+        cal = self._check_calibration(indices)
+        min_, max_ = cal.range_min[indices], cal.range_max[indices]
+        inverted = cal.inverted[indices]
+
+        val_m100_100 = np.clip(np.where(inverted, -values, values), -100.0, 100.0)
+        raw_m100_100 = ((val_m100_100 + 100) / 200) * (max_ - min_) + min_
+        val_0_100 = np.clip(np.where(inverted, 100 - values, values), 0.0, 100.0)
+        raw_0_100 = (val_0_100 / 100) * (max_ - min_) + min_
+        mid = (min_ + max_) / 2
+        raw_degrees = (values * cal.max_res[indices] / 360) + mid
+
+        raw = np.select(
+            [cal.is_range_m100_100[indices], cal.is_range_0_100[indices]],
+            [raw_m100_100, raw_0_100],
+            default=raw_degrees,
+        )
+        # Truncation towards zero, like `int`
+        return np.trunc(raw).astype(np.int64)
 
     @abc.abstractmethod
     def _encode_sign(self, data_name: str, ids_values: dict[int, int]) -> dict[int, int]:
@@ -879,6 +975,7 @@ class MotorsBus(abc.ABC):
             int | None: Motor model number or `None` on failure.
         """
         id_ = self._get_motor_id(motor)
+        self._receive_pending_sync_read()
         for n_try in range(1 + num_retry):
             model_number, comm, error = self.packet_handler.ping(self.port_handler, id_)
             if self._is_comm_success(comm):
@@ -970,6 +1067,7 @@ class MotorsBus(abc.ABC):
         else:
             raise ValueError(length)
 
+        self._receive_pending_sync_read()
         for n_try in range(1 + num_retry):
             value, comm, error = read_fn(self.port_handler, motor_id, address)
             if self._is_comm_success(comm):
@@ -1033,6 +1131,7 @@ class MotorsBus(abc.ABC):
         err_msg: str = "",
     ) -> tuple[int, int]:
         data = self._serialize_data(value, length)
+        self._receive_pending_sync_read()
         for n_try in range(1 + num_retry):
             comm, error = self.packet_handler.writeTxRx(self.port_handler, motor_id, addr, length, data)
             if self._is_comm_success(comm):
@@ -1056,6 +1155,7 @@ class MotorsBus(abc.ABC):
         *,
         normalize: bool = True,
         num_retry: int = 0,
+        pipelined: bool = False,
     ) -> dict[str, Value]:
         """Read the same register from several motors at once.
 
@@ -1064,6 +1164,11 @@ class MotorsBus(abc.ABC):
             motors (str | list[str] | None, optional): Motors to query. `None` (default) reads every motor.
             normalize (bool, optional): Normalisation flag.  Defaults to `True`.
             num_retry (int, optional): Retry attempts.  Defaults to `0`.
+            pipelined (bool, optional): If `True`, the request of the next read of the same register is sent
+                right after receiving the response, and its response is received by that next read, which then
+                doesn't wait for the serial round trip. The values are thus as old as the time elapsed since the
+                previous read, which should be called at a regular frequency (e.g. in a control loop). Values
+                older than `pipelined_read_max_age_s` are read again instead. Defaults to `False`.
 
         Returns:
             dict[str, Value]: Mapping *motor name → value*.
@@ -1073,6 +1178,45 @@ class MotorsBus(abc.ABC):
                 f"{self.__class__.__name__}('{self.port}') is not connected. You need to run `{self.__class__.__name__}.connect()`."
             )
 
+        ids_values = self._sync_read_decoded(data_name, motors, num_retry, pipelined)
+
+        if normalize and data_name in self.normalized_data:
+            ids_values = self._normalize(ids_values)
+
+        return {self._id_to_name(id_): value for id_, value in ids_values.items()}
+
+    def sync_read_array(
+        self,
+        data_name: str,
+        motors: str | list[str] | None = None,
+        *,
+        normalize: bool = True,
+        num_retry: int = 0,
+        pipelined: bool = False,
+    ) -> np.ndarray:
+        """Same as :pymeth:`sync_read`, but returns the values as an array without building dictionaries keyed
+        by motor names, which is faster in control loops.
+
+        Returns:
+            np.ndarray: Values ordered like `motors` (or like `self.motors` when `motors` is `None`), as
+                float64 when normalized and as int64 otherwise.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(
+                f"{self.__class__.__name__}('{self.port}') is not connected. You need to run `{self.__class__.__name__}.connect()`."
+            )
+
+        ids_values = self._sync_read_decoded(data_name, motors, num_retry, pipelined)
+        values = np.fromiter(ids_values.values(), dtype=np.int64, count=len(ids_values))
+
+        if normalize and data_name in self.normalized_data:
+            return self._normalize_array(self._get_motor_indices(tuple(ids_values)), values)
+
+        return values
+
+    def _sync_read_decoded(
+        self, data_name: str, motors: str | list[str] | None, num_retry: int, pipelined: bool = False
+    ) -> dict[int, int]:
         self._assert_protocol_is_compatible("sync_read")
 
         names = self._get_motors_list(motors)
@@ -1086,16 +1230,12 @@ class MotorsBus(abc.ABC):
         addr, length = get_address(self.model_ctrl_table, model, data_name)
 
         err_msg = f"Failed to sync read '{data_name}' on {ids=} after {num_retry + 1} tries."
-        ids_values, _ = self._sync_read(
+        sync_read_fn = self._pipelined_sync_read if pipelined else self._sync_read
+        ids_values, _ = sync_read_fn(
             addr, length, ids, num_retry=num_retry, raise_on_error=True, err_msg=err_msg
         )
 
-        ids_values = self._decode_sign(data_name, ids_values)
-
-        if normalize and data_name in self.normalized_data:
-            ids_values = self._normalize(ids_values)
-
-        return {self._id_to_name(id_): value for id_, value in ids_values.items()}
+        return self._decode_sign(data_name, ids_values)
 
     def _sync_read(
         self,
@@ -1107,6 +1247,7 @@ class MotorsBus(abc.ABC):
         raise_on_error: bool = True,
         err_msg: str = "",
     ) -> tuple[dict[int, int], int]:
+        self._receive_pending_sync_read()
         self._setup_sync_reader(motor_ids, addr, length)
         for n_try in range(1 + num_retry):
             comm = self.sync_reader.txRxPacket()
@@ -1120,29 +1261,78 @@ class MotorsBus(abc.ABC):
         if not self._is_comm_success(comm) and raise_on_error:
             raise ConnectionError(f"{err_msg} {self.packet_handler.getTxRxResult(comm)}")
 
+        prefetched = self._prefetched_sync_read
+        if prefetched is not None and prefetched[0] == (addr, length, tuple(motor_ids)):
+            # Older than the values which were just read
+            self._prefetched_sync_read = None
+
         values = {id_: self.sync_reader.getData(id_, addr, length) for id_ in motor_ids}
         return values, comm
 
+    def _pipelined_sync_read(
+        self,
+        addr: int,
+        length: int,
+        motor_ids: list[int],
+        *,
+        num_retry: int = 0,
+        raise_on_error: bool = True,
+        err_msg: str = "",
+    ) -> tuple[dict[int, int], int]:
+        """Same as `_sync_read`, but returns the values requested at the end of the previous call (if any) and
+        sends the request of the next call. The values are read again if they were requested more than
+        `pipelined_read_max_age_s` ago."""
+        key = (addr, length, tuple(motor_ids))
+        self._receive_pending_sync_read()
+        prefetched = self._prefetched_sync_read
+        if (
+            prefetched is not None
+            and prefetched[0] == key
+            and time.perf_counter() - prefetched[2] <= self.pipelined_read_max_age_s
+        ):
+            values, comm = prefetched[1], self._comm_success
+            self._prefetched_sync_read = None
+            self._setup_sync_reader(motor_ids, addr, length)
+        else:
+            values, comm = self._sync_read(
+                addr, length, motor_ids, num_retry=num_retry, raise_on_error=raise_on_error, err_msg=err_msg
+            )
+
+        sent_at = time.perf_counter()
+        if self._is_comm_success(self.sync_reader.txPacket()):
+            self._pending_sync_read = key, sent_at
+        return values, comm
+
+    def _receive_pending_sync_read(self) -> None:
+        """Receives the response of the request sent by `_pipelined_sync_read`, if any. This needs to be done
+        before any other communication on the bus, which would otherwise fail as the port is still in use, or
+        discard the response."""
+        if self._pending_sync_read is None:
+            return
+
+        (key, sent_at), self._pending_sync_read = self._pending_sync_read, None
+        addr, length, motor_ids = key
+        reader = self._sync_readers[key]
+        comm = reader.rxPacket()
+        if self._is_comm_success(comm):
+            values = {id_: reader.getData(id_, addr, length) for id_ in motor_ids}
+            self._prefetched_sync_read = key, values, sent_at
+        else:
+            logger.debug(
+                f"Failed to receive pipelined sync read @{addr=} ({length=}) on {motor_ids=}: "
+                + self.packet_handler.getTxRxResult(comm)
+            )
+
     def _setup_sync_reader(self, motor_ids: list[int], addr: int, length: int) -> None:
-        self.sync_reader.clearParam()
-        self.sync_reader.start_address = addr
-        self.sync_reader.data_length = length
-        for id_ in motor_ids:
-            self.sync_reader.addParam(id_)
-
-    # TODO(aliberts, pkooij): Implementing something like this could get even much faster read times if need be.
-    # Would have to handle the logic of checking if a packet has been sent previously though but doable.
-    # This could be at the cost of increase latency between the moment the data is produced by the motors and
-    # the moment it is used by a policy.
-    # def _async_read(self, motor_ids: list[int], address: int, length: int):
-    #     if self.sync_reader.start_address != address or self.sync_reader.data_length != length or ...:
-    #         self._setup_sync_reader(motor_ids, address, length)
-    #     else:
-    #         self.sync_reader.rxPacket()
-    #         self.sync_reader.txPacket()
-
-    #     for id_ in motor_ids:
-    #         value = self.sync_reader.getData(id_, address, length)
+        """Selects the reader of `motor_ids` at `addr`, whose parameters are only set up the first time."""
+        key = (addr, length, tuple(motor_ids))
+        reader = self._sync_readers.get(key)
+        if reader is None:
+            reader = type(self.sync_reader)(self.port_handler, self.packet_handler, addr, length)
+            for id_ in motor_ids:
+                reader.addParam(id_)
+            self._sync_readers[key] = reader
+        self.sync_reader = reader
 
     def sync_write(
         self,
@@ -1195,6 +1385,7 @@ class MotorsBus(abc.ABC):
         raise_on_error: bool = True,
         err_msg: str = "",
     ) -> int:
+        self._receive_pending_sync_read()
         self._setup_sync_writer(ids_values, addr, length)
         for n_try in range(1 + num_retry):
             comm = self.sync_writer.txPacket()
@@ -1211,9 +1402,194 @@ class MotorsBus(abc.ABC):
         return comm
 
     def _setup_sync_writer(self, ids_values: dict[int, int], addr: int, length: int) -> None:
-        self.sync_writer.clearParam()
-        self.sync_writer.start_address = addr
-        self.sync_writer.data_length = length
-        for id_, value in ids_values.items():
-            data = self._serialize_data(value, length)
-            self.sync_writer.addParam(id_, data)
+        """Selects the writer of the motors of `ids_values` at `addr`, whose parameters are set up the first time,
+        and then only updated for the values which changed since the previous write."""
+        key = (addr, length, tuple(ids_values))
+        writer, last_ids_values = self._sync_writers.get(key, (None, None))
+        if writer is None:
+            writer = type(self.sync_writer)(self.port_handler, self.packet_handler, addr, length)
+            for id_, value in ids_values.items():
+                writer.addParam(id_, self._serialize_data(value, length))
+        else:
+            for id_, value in ids_values.items():
+                if value != last_ids_values[id_]:
+                    writer.changeParam(id_, self._serialize_data(value, length))
+        self._sync_writers[key] = writer, dict(ids_values)
+        self.sync_writer = writer
+
+    def start_io_thread(
+        self,
+        data_names: list[str] | None = None,
+        motors: str | list[str] | None = None,
+        fps: float | None = None,
+        max_age_s: float | None = 0.5,
+    ) -> None:
+        """Start a background thread continuously reading the motors and writing their goal positions.
+
+        On each iteration, the thread writes the last goal positions given to :pymeth:`async_write_goal` (if
+        any, and only once), then sync reads `data_names` of `motors` into a double buffer, so that
+        :pymeth:`async_read` returns the latest values without blocking on the serial port.
+
+        While the thread runs, the other methods communicating with the motors must only be called within
+        `with bus.io_lock:`.
+
+        Args:
+            data_names (list[str] | None, optional): Registers read, e.g. `["Present_Position",
+                "Present_Velocity", "Present_Current"]`. Defaults to `["Present_Position"]`.
+            motors (str | list[str] | None, optional): Motors read. `None` (default) reads every motor.
+            fps (float | None, optional): Maximum frequency of the iterations. `None` (default) runs them as
+                fast as the bus allows.
+            max_age_s (float | None, optional): :pymeth:`async_read` raises a `ConnectionError` once the latest
+                values are older than this, e.g. when a motor stopped answering, instead of returning them.
+                `None` never raises. Defaults to 0.5.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(
+                f"{self.__class__.__name__}('{self.port}') is not connected. You need to run `{self.__class__.__name__}.connect()`."
+            )
+        if self.io_thread is not None:
+            raise RuntimeError(
+                f"The I/O thread of {self.__class__.__name__}('{self.port}') is already running."
+            )
+        if fps is not None and max_age_s is not None and max_age_s <= 1 / fps:
+            raise ValueError(f"The values would always be too old with {max_age_s=} and {fps=}.")
+
+        data_names = ["Present_Position"] if data_names is None else list(data_names)
+        self._io_motors = self._get_motors_list(motors)
+        self._io_data_index = {data_name: i for i, data_name in enumerate(data_names)}
+        self._io_values = [np.zeros((len(data_names), len(self._io_motors))) for _ in range(2)]
+        self._io_timestamps = [np.zeros(len(data_names)) for _ in range(2)]
+        self._goal_mailbox = None
+        self._io_error = None
+        self._io_num_failures, self._io_last_failure = 0, None
+        self.io_max_age_s = max_age_s
+        # The first values are read synchronously, which also checks `data_names`
+        self._io_seq = 0
+        self._read_io_state(0)
+
+        self.io_stop_event = Event()
+        self.io_thread = Thread(
+            target=self._io_loop, args=(self.io_stop_event, fps), name=f"{self.__class__.__name__}_io_loop"
+        )
+        self.io_thread.daemon = True
+        self.io_thread.start()
+
+    def stop_io_thread(self, timeout_s: float = 2.0) -> None:
+        """Signal the background I/O thread to stop and wait up to `timeout_s` for it to join."""
+        if self.io_stop_event is not None:
+            self.io_stop_event.set()
+
+        if self.io_thread is not None and self.io_thread.is_alive():
+            self.io_thread.join(timeout=timeout_s)
+            if self.io_thread.is_alive():
+                logger.warning(
+                    f"The I/O thread of {self.__class__.__name__}('{self.port}') didn't stop within {timeout_s}s, "
+                    "it may still be blocked on the serial port."
+                )
+
+        self.io_thread = None
+        self.io_stop_event = None
+
+    def _io_loop(self, stop_event: Event, fps: float | None) -> None:
+        """Loop run by the background I/O thread. Stops on DeviceNotConnectedError, which is then re-raised by
+        :pymeth:`async_read_array` and :pymeth:`async_write_goal`. Logs other errors and retries after a delay
+        which doubles with each consecutive error, up to 1s."""
+        error_backoff_s = 0.0
+        while not stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                with self.io_lock:
+                    with self._goal_lock:
+                        goal_pos, self._goal_mailbox = self._goal_mailbox, None
+                    if goal_pos is not None:
+                        self.sync_write("Goal_Position", goal_pos)
+
+                    self._read_io_state((self._io_seq + 1) % 2)
+                # Swap the buffers, readers now copy the one which was just written
+                self._io_seq += 1
+                error_backoff_s = 0.0
+                self._io_num_failures = 0
+            except DeviceNotConnectedError as e:
+                self._io_error = e
+                break
+            except Exception as e:
+                logger.warning(f"Error in the I/O thread of {self.__class__.__name__}('{self.port}'): {e}")
+                self._io_num_failures += 1
+                self._io_last_failure = e
+                error_backoff_s = min(max(2 * error_backoff_s, 0.01), 1.0)
+                stop_event.wait(error_backoff_s)
+                continue
+
+            if fps is not None:
+                stop_event.wait(max(1 / fps - (time.perf_counter() - start), 0))
+
+    def _read_io_state(self, buffer_idx: int) -> None:
+        values, timestamps = self._io_values[buffer_idx], self._io_timestamps[buffer_idx]
+        for i, data_name in enumerate(self._io_data_index):
+            start = time.perf_counter()
+            values[i] = self.sync_read_array(data_name, self._io_motors)
+            # Middle of the round trip, i.e. approximately when the motors sampled the values
+            timestamps[i] = (start + time.perf_counter()) / 2
+
+    def async_read_array(self) -> tuple[np.ndarray, np.ndarray]:
+        """Latest values read by the I/O thread, see :pymeth:`start_io_thread`. Raises a `ConnectionError` if
+        they are older than its `max_age_s`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The values, of shape `(len(data_names), len(motors))`, and the
+                `time.perf_counter()` timestamps at which each register was read, of shape `(len(data_names),)`.
+        """
+        self._assert_io_thread_running()
+
+        while True:
+            seq = self._io_seq
+            values = self._io_values[seq % 2].copy()
+            timestamps = self._io_timestamps[seq % 2].copy()
+            # The thread only starts writing into this buffer after the next swap
+            if self._io_seq == seq:
+                break
+
+        age = time.perf_counter() - timestamps.min()
+        if self.io_max_age_s is not None and age > self.io_max_age_s:
+            raise ConnectionError(
+                f"The latest values read by the I/O thread of {self.__class__.__name__}('{self.port}') are "
+                f"{age:.3f}s old ({self._io_num_failures} consecutive errors, the last one being: "
+                f"{self._io_last_failure})."
+            ) from self._io_last_failure
+        return values, timestamps
+
+    def async_read(self, data_name: str = "Present_Position") -> tuple[dict[str, Value], float]:
+        """Latest values of `data_name` read by the I/O thread, see :pymeth:`start_io_thread`.
+
+        Returns:
+            tuple[dict[str, Value], float]: Mapping *motor name → value*, and the `time.perf_counter()`
+                timestamp at which they were read.
+        """
+        if data_name not in self._io_data_index:
+            raise ValueError(f"'{data_name}' is not read by the I/O thread ({list(self._io_data_index)}).")
+
+        values, timestamps = self.async_read_array()
+        i = self._io_data_index[data_name]
+        motor_values = values[i] if data_name in self.normalized_data else values[i].astype(np.int64)
+        return dict(zip(self._io_motors, motor_values.tolist(), strict=True)), float(timestamps[i])
+
+    def async_write_goal(self, goal_pos: dict[str, Value]) -> None:
+        """Set the goal positions (normalized like in :pymeth:`sync_write`) written by the I/O thread on its
+        next iteration. They replace the previous ones if those haven't been written yet."""
+        self._assert_io_thread_running()
+
+        with self._goal_lock:
+            self._goal_mailbox = dict(goal_pos)
+
+    def _assert_io_thread_running(self) -> None:
+        if self.io_thread is None:
+            raise RuntimeError(
+                f"The I/O thread of {self.__class__.__name__}('{self.port}') is not running. You need to run "
+                f"`{self.__class__.__name__}.start_io_thread()`."
+            )
+        if self._io_error is not None:
+            raise DeviceNotConnectedError(
+                f"The I/O thread of {self.__class__.__name__}('{self.port}') stopped: {self._io_error}"
+            ) from self._io_error
+        if not self.io_thread.is_alive():
+            raise RuntimeError(f"The I/O thread of {self.__class__.__name__}('{self.port}') stopped.")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Attention backends shared by the VLM-with-expert models of PI0 and SmolVLA.
+
+All backends take a boolean `attention_mask` (batch_size, query_length, key_length), where True means "can
+attend", and queries (batch_size, query_length, num_att_heads, head_dim) and keys/values (batch_size,
+key_length, num_key_value_heads, head_dim) with grouped-query attention (num_att_heads being a multiple of
+num_key_value_heads). They return the attention output (batch_size, query_length, num_att_heads * head_dim)
+in the dtype of the values.
+
+New backends can be added to `ATTENTION_FUNCTIONS` with `register_attention_function`, and are then selectable
+by name with the `attention_implementation` option of the policies.
+"""
+
+from collections.abc import Callable
+
+import torch
+import torch.nn.functional as F  # noqa: N812
+
+AttentionFunction = Callable[
+    [torch.Tensor, int, int, torch.Tensor, torch.Tensor, torch.Tensor],
+    torch.Tensor,
+]
+
+ATTENTION_FUNCTIONS: dict[str, AttentionFunction] = {}
+
+
+def register_attention_function(name: str) -> Callable[[AttentionFunction], AttentionFunction]:
+    def decorator(fn: AttentionFunction) -> AttentionFunction:
+        ATTENTION_FUNCTIONS[name] = fn
+        return fn
+
+    return decorator
+
+
+def get_attention_function(name: str) -> AttentionFunction:
+    if name not in ATTENTION_FUNCTIONS:
+        raise ValueError(
+            f"Unknown attention implementation '{name}'. Available ones are {list(ATTENTION_FUNCTIONS)}."
+        )
+    return ATTENTION_FUNCTIONS[name]
+
+
+@register_attention_function("eager")
+def eager_attention_forward(
+    attention_mask: torch.Tensor,
+    batch_size: int,
+    head_dim: int,
+    query_states: torch.Tensor,
+    key_states: torch.Tensor,
+    value_states: torch.Tensor,
+) -> torch.Tensor:
+    """Reference implementation, which repeats the keys/values for every query head of their group and
+    computes the attention weights in float32."""
+    num_att_heads = query_states.shape[2]
+    num_key_value_heads = key_states.shape[2]
+    num_key_value_groups = num_att_heads // num_key_value_heads
+
+    sequence_length = key_states.shape[1]
+
+    key_states = key_states[:, :, :, None, :].expand(
+        batch_size, sequence_length, num_key_value_heads, num_key_value_groups, head_dim
+    )
+    key_states = key_states.reshape(
+        batch_size, sequence_length, num_key_value_heads * num_key_value_groups, head_dim
+    )
+
+    value_states = value_states[:, :, :, None, :].expand(
+        batch_size, sequence_length, num_key_value_heads, num_key_value_groups, head_dim
+    )
+    value_states = value_states.reshape(
+        batch_size, sequence_length, num_key_value_heads * num_key_value_groups, head_dim
+    )
+
+    # Attention here is upcasted to float32 to match the original eager implementation.
+    query_states = query_states.to(dtype=torch.float32)
+    key_states = key_states.to(dtype=torch.float32)
+
+    query_states = query_states.transpose(1, 2)
+    key_states = key_states.transpose(1, 2)
+
+    att_weights = torch.matmul(query_states, key_states.transpose(2, 3))
+    att_weights *= head_dim**-0.5
+
+    big_neg = torch.finfo(att_weights.dtype).min  # -2.3819763e38  # See gemma/modules.py
+    masked_att_weights = torch.where(attention_mask[:, None, :, :], att_weights, big_neg)
+    probs = F.softmax(masked_att_weights, dim=-1)
+    probs = probs.to(dtype=value_states.dtype)
+
+    att_output = torch.matmul(probs, value_states.permute(0, 2, 1, 3))
+
+    att_output = att_output.permute(0, 2, 1, 3)
+    # we use -1 because sequence length can change
+    att_output = att_output.reshape(batch_size, -1, num_key_value_heads * num_key_value_groups * head_dim)
+
+    return att_output
+
+
+@register_attention_function("sdpa")
+def sdpa_attention_forward(
+    attention_mask: torch.Tensor,
+    batch_size: int,
+    head_dim: int,
+    query_states: torch.Tensor,
+    key_states: torch.Tensor,
+    value_states: torch.Tensor,
+) -> torch.Tensor:
+    """Fused implementation with `torch.nn.functional.scaled_dot_product_attention`, which never materializes
+    the attention weights when a flash or memory efficient kernel is available.
+
+    The keys/values are not repeated for grouped-query attention: instead, the queries of each group are
+    stacked along the sequence dimension so that every key/value head attends to all the queries of its group at
+    once. Queries and keys are computed in the dtype of the values, so the outputs only match the eager ones up
+    to the precision of that dtype.
+    """
+    query_length = query_states.shape[1]
+    key_length = key_states.shape[1]
+    num_att_heads = query_states.shape[2]
+    num_key_value_heads = key_states.shape[2]
+    num_key_value_groups = num_att_heads // num_key_value_heads
+    dtype = value_states.dtype
+
+    # (B, Lq, H_kv * G, D) -> (B, H_kv, G * Lq, D), the query heads of a group being contiguous.
+    query_states = query_states.to(dtype).reshape(
+        batch_size, query_length, num_key_value_heads, num_key_value_groups, head_dim
+    )
+    query_states = query_states.permute(0, 2, 3, 1, 4).reshape(
+        batch_size, num_key_value_heads, num_key_value_groups * query_length, head_dim
+    )
+    key_states = key_states.to(dtype).transpose(1, 2)
+    value_states = value_states.transpose(1, 2)
+
+    # An additive mask rather than a boolean one, so that fully masked rows (e.g. padding tokens) attend
+    # uniformly like with the eager implementation, instead of producing NaNs.
+    big_neg = torch.finfo(dtype).min
+    attn_mask = torch.zeros(attention_mask.shape, dtype=dtype, device=attention_mask.device)
+    attn_mask.masked_fill_(~attention_mask, big_neg)
+    attn_mask = attn_mask[:, None, None].expand(batch_size, 1, num_key_value_groups, query_length, key_length)
+    attn_mask = attn_mask.reshape(batch_size, 1, num_key_value_groups * query_length, key_length)
+
+    att_output = F.scaled_dot_product_attention(
+        query_states, key_states, value_states, attn_mask=attn_mask, scale=head_dim**-0.5
+    )
+
+    # (B, H_kv, G * Lq, D) -> (B, Lq, H_kv * G * D)
+    att_output = att_output.reshape(
+        batch_size, num_key_value_heads, num_key_value_groups, query_length, head_dim
+    )
+    att_output = att_output.permute(0, 3, 1, 2, 4)
+    return att_output.reshape(batch_size, query_length, num_att_heads * head_dim)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Batched inference server, serving the action chunks of one policy to several robots.
+
+Robot clients send their observations to the server over ZeroMQ. The server gathers the requests which arrive
+within `batch_timeout_s` of the first one (up to `max_batch_size`) and computes their action chunks with a
+single call to the policy's `predict_action_chunk`, so that the GPU processes one batch instead of one
+observation per robot.
+
+Messages are multipart: a JSON header followed by the raw buffers of the numpy arrays it describes. Clients
+send their observation with the same raw format as `robot.get_observation()` frames built with
+`build_dataset_frame` (channel last uint8 images, float32 states), along with their task, and receive an array
+of shape (n_action_steps, action_dim). The header of each request holds an id which the server echoes in its
+reply, so that clients can drop the late replies to the requests which timed out.
+"""
+
+import json
+import logging
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+import numpy as np
+import torch
+import zmq
+
+from lerobot.common.policies.pretrained import PreTrainedPolicy
+from lerobot.configs.types import FeatureType, PolicyFeature
+
+
+def encode_message(header: dict, arrays: dict[str, np.ndarray] | None = None) -> list:
+    arrays = {} if arrays is None else {key: np.ascontiguousarray(array) for key, array in arrays.items()}
+    header = {
+        **header,
+        "arrays": {key: [str(array.dtype), list(array.shape)] for key, array in arrays.items()},
+    }
+    return [json.dumps(header).encode("utf-8"), *(array.data for array in arrays.values())]
+
+
+def decode_message(frames: list) -> tuple[dict, dict[str, np.ndarray]]:
+    header = json.loads(bytes(frames[0]))
+    arrays = {}
+    for (key, (dtype, shape)), frame in zip(header.pop("arrays").items(), frames[1:], strict=True):
+        arrays[key] = np.frombuffer(frame, dtype=dtype).reshape(shape)
+    return header, arrays
+
+
+@dataclass
+class InferenceRequest:
+    identity: bytes
+    observation: dict[str, np.ndarray]
+    task: str
+    robot_type: str
+    # Id given by the client, echoed in the reply so that it can drop the late replies to its previous requests
+    request_id: int | None = None
+
+    @property
+    def signature(self) -> tuple:
+        """Requests can only be batched together if their arrays have the same keys, shapes and dtypes."""
+        return tuple((key, array.dtype.str, array.shape) for key, array in sorted(self.observation.items()))
+
+
+class BatchedInferenceServer:
+    """
+    Serves the action chunks of `policy` to the clients connecting to `address`, batching the requests that
+    arrive within `batch_timeout_s` of each other, up to `max_batch_size` of them.
+
+    The policy has to implement `predict_action_chunk`, which takes a batch of observations and returns a
+    (batch_size, n_action_steps, action_dim) tensor.
+    """
+
+    def __init__(
+        self,
+        policy: PreTrainedPolicy,
+        address: str = "tcp://*:5555",
+        max_batch_size: int = 8,
+        batch_timeout_s: float = 0.005,
+        use_amp: bool = False,
+    ):
+        if max_batch_size <= 0:
+            raise ValueError(f"The batches should hold at least one request, got {max_batch_size=}.")
+
+        self.policy = policy
+        self.device = torch.device(policy.config.device)
+        self.max_batch_size = max_batch_size
+        self.batch_timeout_s = batch_timeout_s
+        self.use_amp = use_amp
+        # Sizes of the batches sent to the policy, for monitoring
+        self.batch_sizes = []
+
+        self.zmq_context = zmq.Context()
+        self.zmq_socket = self.zmq_context.socket(zmq.ROUTER)
+        self.zmq_socket.bind(address)
+        self.poller = zmq.Poller()
+        self.poller.register(self.zmq_socket, zmq.POLLIN)
+
+    def _receive(self, timeout_s: float) -> InferenceRequest | None:
+        """Waits up to `timeout_s` for a request. Malformed requests are answered with an error and skipped."""
+        deadline = time.perf_counter() + timeout_s
+        while self.poller.poll(max(deadline - time.perf_counter(), 0) * 1000):
+            identity, *frames = self.zmq_socket.recv_multipart(copy=False)
+            header = {}
+            try:
+                header, observation = decode_message([frame.buffer for frame in frames])
+                return InferenceRequest(
+                    identity.bytes,
+                    observation,
+                    header["task"],
+                    header["robot_type"],
+                    header.get("request_id"),
+                )
+            except Exception:
+                logging.error("Received a malformed request.")
+                error = traceback.format_exc()
+                message = encode_message({"error": error, "request_id": header.get("request_id")})
+                self.zmq_socket.send_multipart([identity.bytes, *message])
+        return None
+
+    def _gather_requests(self, timeout_s: float) -> list[InferenceRequest]:
+        """Waits up to `timeout_s` for a first request, then gathers the ones that arrive within
+        `batch_timeout_s`."""
+        request = self._receive(timeout_s)
+        if request is None:
+            return []
+        requests = [request]
+        deadline = time.perf_counter() + self.batch_timeout_s
+        while len(requests) < self.max_batch_size:
+            request = self._receive(deadline - time.perf_counter())
+            if request is None:
+                break
+            requests.append(request)
+        return requests
+
+    def _make_batch(self, requests: list[InferenceRequest]) -> dict:
+        batch = {}
+        for key in requests[0].observation:
+            value = torch.from_numpy(np.stack([request.observation[key] for request in requests]))
+            value = value.to(self.device)
+            if "image" in key:
+                # Convert to pytorch format: channel first and float32 in [0,1]
+                value = value.type(torch.float32) / 255
+                value = value.permute(0, 3, 1, 2).contiguous()
+            batch[key] = value
+        batch["task"] = [request.task for request in requests]
+        batch["robot_type"] = [request.robot_type for request in requests]
+        return batch
+
+    def _predict(self, requests: list[InferenceRequest]) -> np.ndarray:
+        with (
+            torch.inference_mode(),
+            torch.autocast(device_type=self.device.type)
+            if self.device.type == "cuda" and self.use_amp
+            else nullcontext(),
+        ):
+            actions = self.policy.predict_action_chunk(self._make_batch(requests))
+        self.batch_sizes.append(len(requests))
+        return actions.to("cpu", torch.float32).numpy()
+
+    def process_requests(self, timeout_s: float = 0.1) -> int:
+        """Handles the requests received within `timeout_s`, and returns how many there were."""
+        requests = self._gather_requests(timeout_s)
+        groups: dict[tuple, list[InferenceRequest]] = {}
+        for request in requests:
+            groups.setdefault(request.signature, []).append(request)
+
+        for group in groups.values():
+            try:
+                actions = self._predict(group)
+            except Exception:
+                logging.error(f"Inference failed for a batch of {len(group)} requests.")
+                error = traceback.format_exc()
+                for request in group:
+                    message = encode_message({"error": error, "request_id": request.request_id})
+                    self.zmq_socket.send_multipart([request.identity, *message])
+                continue
+            for request, action in zip(group, actions, strict=True):
+                message = encode_message(
+                    {"error": None, "request_id": request.request_id}, {"action": action}
+                )
+                self.zmq_socket.send_multipart([request.identity, *message])
+        return len(requests)
+
+    def serve_forever(self, stop_event: threading.Event | None = None) -> None:
+        while stop_event is None or not stop_event.is_set():
+            self.process_requests()
+
+    def close(self) -> None:
+        self.zmq_socket.close()
+        self.zmq_context.term()
+
+
+class InferenceClient:
+    """Client of a `BatchedInferenceServer`, used by each robot instead of running its own policy."""
+
+    def __init__(self, address: str = "tcp://127.0.0.1:5555", timeout_s: float = 5.0):
+        self.timeout_s = timeout_s
+        self.zmq_context = zmq.Context()
+        self.zmq_socket = self.zmq_context.socket(zmq.DEALER)
+        self.zmq_socket.setsockopt(zmq.LINGER, 0)
+        self.zmq_socket.connect(address)
+        self._request_id = 0
+
+    def predict_action_chunk(
+        self, observation: dict[str, np.ndarray], task: str = "", robot_type: str = ""
+    ) -> np.ndarray:
+        """Returns the (n_action_steps, action_dim) action chunk predicted from `observation`. The replies to
+        previous requests which timed out are dropped, as their actions were predicted from older
+        observations."""
+        self._request_id += 1
+        header = {"request_id": self._request_id, "task": task, "robot_type": robot_type}
+        self.zmq_socket.send_multipart(encode_message(header, observation))
+        deadline = time.perf_counter() + self.timeout_s
+        while True:
+            if not self.zmq_socket.poll(max(deadline - time.perf_counter(), 0) * 1000):
+                raise TimeoutError(f"No answer from the inference server after {self.timeout_s}s.")
+            header, arrays = decode_message(self.zmq_socket.recv_multipart())
+            if header.get("request_id") == self._request_id:
+                break
+            logging.warning(
+                f"Dropped the late reply of the inference server to request {header.get('request_id')}."
+            )
+        if header["error"] is not None:
+            raise RuntimeError(f"Inference failed on the server:\n{header['error']}")
+        return arrays["action"].copy()
+
+    def close(self) -> None:
+        self.zmq_socket.close()
+        self.zmq_context.term()
+
+
+def make_dummy_observation(
+    input_features: dict[str, PolicyFeature], rng: np.random.Generator | None = None
+) -> dict[str, np.ndarray]:
+    """Random observation with the raw format of a robot's, to stand in for a robot in loopback tests."""
+    rng = np.random.default_rng() if rng is None else rng
+    observation = {}
+    for key, feature in input_features.items():
+        if feature.type is FeatureType.VISUAL:
+            c, h, w = feature.shape
+            observation[key] = rng.integers(0, 256, size=(h, w, c), dtype=np.uint8)
+        else:
+            observation[key] = rng.standard_normal(feature.shape).astype(np.float32)
+    return observation
+
+
+def run_loopback_client(
+    address: str,
+    input_features: dict[str, PolicyFeature],
+    num_requests: int,
+    task: str = "",
+    timeout_s: float = 5.0,
+) -> list[float]:
+    """Sends `num_requests` random observations to the server like a robot would, and returns the latency of
+    each request in seconds."""
+    client = InferenceClient(address, timeout_s)
+    rng = np.random.default_rng()
+    latencies = []
+    try:
+        for _ in range(num_requests):
+            observation = make_dummy_observation(input_features, rng)
+            start = time.perf_counter()
+            client.predict_action_chunk(observation, task)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        client.close()
+    return latencies
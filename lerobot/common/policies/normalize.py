@@ -157,6 +157,11 @@ class Normalize(nn.Module):
                 # FIXME(aliberts, rcadene): This might lead to silent fail!
                 continue
 
+            if ft.type is FeatureType.VISUAL and batch[key].dtype == torch.uint8:
+                # Frames loaded as uint8 (see `LeRobotDataset(return_uint8_frames=True)`) are only converted to
+                # float32 in [0,1] here, after being moved to the device.
+                batch[key] = batch[key].type(torch.float32) / 255
+
             norm_mode = self.norm_map.get(ft.type, NormalizationMode.IDENTITY)
             if norm_mode is NormalizationMode.IDENTITY:
                 continue
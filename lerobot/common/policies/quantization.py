@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Post-training weight-only quantization of linear layers.
+
+The weights of `nn.Linear` layers are stored as int8 with one scale per output channel, which divides their
+memory by 4 compared to float32 (2 compared to bfloat16). Activations are kept in floating point: the matrix
+multiplication runs on the int8 weights converted to the activations' dtype, and the scales are applied to
+its output, so it works on any device, CPU included.
+"""
+
+import torch
+import torch.nn.functional as F  # noqa: N812
+from torch import Tensor, nn
+
+QUANTIZATION_METHODS = ["int8"]
+
+
+def quantize_per_channel_int8(weight: Tensor) -> tuple[Tensor, Tensor]:
+    """Symmetric per output channel quantization of a (out_features, in_features) weight. Returns the int8
+    weight and the scales, in the dtype of `weight`, such that `weight ≈ weight_int8 * scale[:, None]`."""
+    scale = weight.detach().abs().amax(dim=1).float() / 127
+    scale = scale.clamp(min=torch.finfo(torch.float32).tiny)
+    weight_int8 = torch.round(weight.detach().float() / scale[:, None]).clamp(-127, 127).to(torch.int8)
+    return weight_int8, scale.to(weight.dtype)
+
+
+class Int8WeightOnlyLinear(nn.Module):
+    """Drop-in replacement of `nn.Linear` with int8 weights, see `quantize_per_channel_int8`.
+
+    Its state dict holds `weight_int8` and `weight_scale` instead of `weight`. A floating point `weight` found in
+    a state dict is quantized when it is loaded, so that the weights of a non-quantized checkpoint can be loaded
+    directly into a quantized model.
+    """
+
+    def __init__(
+        self,
+        in_features: int,
+        out_features: int,
+        bias: bool = True,
+        device: torch.device | None = None,
+        dtype: torch.dtype | None = None,
+    ):
+        super().__init__()
+        self.in_features = in_features
+        self.out_features = out_features
+        self.register_buffer(
+            "weight_int8", torch.zeros(out_features, in_features, dtype=torch.int8, device=device)
+        )
+        self.register_buffer("weight_scale", torch.ones(out_features, dtype=dtype, device=device))
+        if bias:
+            self.bias = nn.Parameter(
+                torch.zeros(out_features, dtype=dtype, device=device), requires_grad=False
+            )
+        else:
+            self.register_parameter("bias", None)
+
+    @classmethod
+    def from_linear(cls, linear: nn.Linear) -> "Int8WeightOnlyLinear":
+        module = cls(
+            linear.in_features,
+            linear.out_features,
+            bias=linear.bias is not None,
+            device=linear.weight.device,
+            dtype=linear.weight.dtype,
+        )
+        module.weight_int8, module.weight_scale = quantize_per_channel_int8(linear.weight)
+        if linear.bias is not None:
+            module.bias.data.copy_(linear.bias.detach())
+        return module
+
+    @property
+    def dtype(self) -> torch.dtype:
+        """Dtype of the computations, i.e. of the original weights."""
+        return self.weight_scale.dtype
+
+    def dequantize(self) -> Tensor:
+        return self.weight_int8.to(self.dtype) * self.weight_scale[:, None]
+
+    def forward(self, x: Tensor) -> Tensor:
+        output = F.linear(x, self.weight_int8.to(x.dtype)) * self.weight_scale.to(x.dtype)
+        if self.bias is not None:
+            output = output + self.bias.to(x.dtype)
+        return output
+
+    def _load_from_state_dict(
+        self, state_dict, prefix, local_metadata, strict, missing_keys, unexpected_keys, error_msgs
+    ):
+        weight = state_dict.pop(prefix + "weight", None)
+        if weight is not None:
+            state_dict[prefix + "weight_int8"], state_dict[prefix + "weight_scale"] = (
+                quantize_per_channel_int8(weight.to(self.dtype))
+            )
+        super()._load_from_state_dict(
+            state_dict, prefix, local_metadata, strict, missing_keys, unexpected_keys, error_msgs
+        )
+
+    def extra_repr(self) -> str:
+        return (
+            f"in_features={self.in_features}, out_features={self.out_features}, bias={self.bias is not None}"
+        )
+
+
+def quantize_linear_layers(module: nn.Module, method: str = "int8") -> int:
+    """Replaces the `nn.Linear` layers of `module` (recursively, in place) with their quantized version, and
+    returns how many were replaced."""
+    if method not in QUANTIZATION_METHODS:
+        raise ValueError(f"Unknown quantization method '{method}'. Expected one of {QUANTIZATION_METHODS}.")
+
+    num_quantized = 0
+    for name, child in module.named_children():
+        if isinstance(child, nn.Linear):
+            setattr(module, name, Int8WeightOnlyLinear.from_linear(child))
+            num_quantized += 1
+        else:
+            num_quantized += quantize_linear_layers(child, method)
+    return num_quantized
+
+
+def get_weight_dtype(linear: nn.Module) -> torch.dtype:
+    """Dtype of the weights of a linear layer, quantized or not."""
+    if isinstance(linear, Int8WeightOnlyLinear):
+        return linear.dtype
+    return linear.weight.dtype
@@ -18,6 +18,9 @@ from lerobot.common.optim.optimizers import AdamWConfig
 from lerobot.common.optim.schedulers import (
     CosineDecayWithWarmupSchedulerConfig,
 )
+from lerobot.common.policies.attention import ATTENTION_FUNCTIONS
+from lerobot.common.policies.quantization import QUANTIZATION_METHODS
+from lerobot.common.policies.smolvla.ode_solvers import ODE_SOLVERS, TIMESTEP_SCHEDULES
 from lerobot.configs.policies import PreTrainedConfig
 from lerobot.configs.types import FeatureType, NormalizationMode, PolicyFeature
 
@@ -62,10 +65,37 @@ class SmolVLAConfig(PreTrainedConfig):
 
     # Decoding
     num_steps: int = 10
+    # ODE solver ("euler", "midpoint" or "heun") and timestep schedule ("uniform", "cosine" or "quadratic") used
+    # to integrate the actions in `num_steps` steps, see `lerobot.common.policies.smolvla.ode_solvers`.
+    ode_solver: str = "euler"
+    timestep_schedule: str = "uniform"
+    # When > 0, decoding stops as soon as the predicted actions move by less than this from one step to the next.
+    early_exit_tolerance: float = 0.0
+    # Compile the denoising step with `torch.compile(mode=compile_mode)` at inference on CUDA devices, the
+    # "reduce-overhead" mode capturing it in CUDA graphs. It runs eagerly on other devices.
+    compile_denoise_step: bool = False
+    compile_mode: str = "reduce-overhead"
+
+    # Asynchronous inference: when enabled, `select_action` computes the next action chunk in a background
+    # thread, from the latest observation, as soon as at most `async_watermark` actions are left in the queue.
+    # The new chunk then replaces the queued actions, skipping the steps executed while it was computed.
+    async_inference: bool = False
+    async_watermark: int = 10
+
+    # Inference caches of the prefix. `prompt_cache_size` tasks have their tokens and language embeddings kept,
+    # the least recently used one being evicted when a new task comes in (0 disables the cache). With
+    # `reuse_unchanged_image_embeddings`, the vision encoder is skipped for the cameras whose frames are exactly
+    # the same as for the previous chunk (e.g. static or empty cameras).
+    prompt_cache_size: int = 0
+    reuse_unchanged_image_embeddings: bool = False
 
     # Attention utils
     use_cache: bool = True
 
+    # Post-training weight-only quantization of the vision model, the VLM text layers and the expert layers
+    # ("int8" or None), see `lerobot.common.policies.quantization`. Inference only.
+    weight_quantization: str | None = None
+
     # Finetuning settings
     freeze_vision_encoder: bool = True
     train_expert_only: bool = True
@@ -88,6 +118,7 @@ class SmolVLAConfig(PreTrainedConfig):
     add_image_special_tokens: bool = False  # Whether to use special image tokens around image features.
 
     attention_mode: str = "cross_attn"
+    attention_implementation: str = "eager"  # or sdpa, see `lerobot.common.policies.attention`
 
     prefix_length: int = -1
 
@@ -95,6 +126,11 @@ class SmolVLAConfig(PreTrainedConfig):
 
     num_expert_layers: int = -1  # Less or equal to 0 is the default where the action expert has the same number of layers of VLM. Otherwise the expert have less layers.
     num_vlm_layers: int = 16  # Number of layers used in the VLM (first num_vlm_layers layers)
+    # Number of VLM layers (and of the expert layers paired with them) run at inference, which approximates the
+    # model when smaller than num_vlm_layers. Less or equal to 0 runs all of them. In any case, the VLM layers
+    # whose keys and values aren't used by the expert, and the ones without an expert layer while denoising, are
+    # skipped at inference.
+    num_inference_vlm_layers: int = -1
     self_attn_every_n_layers: int = 2  # Interleave SA layers each self_attn_every_n_layers
     expert_width_multiplier: float = 0.75  # The action expert hidden size (wrt to the VLM)
 
@@ -110,6 +146,27 @@ class SmolVLAConfig(PreTrainedConfig):
                 f"The chunk size is the upper bound for the number of action steps per model invocation. Got "
                 f"{self.n_action_steps} for `n_action_steps` and {self.chunk_size} for `chunk_size`."
             )
+        if self.async_inference and not 0 <= self.async_watermark < self.n_action_steps:
+            raise ValueError(
+                f"`async_watermark` should be in [0, n_action_steps), got {self.async_watermark} for "
+                f"`async_watermark` and {self.n_action_steps} for `n_action_steps`."
+            )
+        if self.ode_solver not in ODE_SOLVERS:
+            raise ValueError(f"`ode_solver` should be one of {list(ODE_SOLVERS)}, got '{self.ode_solver}'.")
+        if self.timestep_schedule not in TIMESTEP_SCHEDULES:
+            raise ValueError(
+                f"`timestep_schedule` should be one of {list(TIMESTEP_SCHEDULES)}, got '{self.timestep_schedule}'."
+            )
+        if self.weight_quantization is not None and self.weight_quantization not in QUANTIZATION_METHODS:
+            raise ValueError(
+                f"`weight_quantization` should be None or one of {QUANTIZATION_METHODS}, got "
+                f"'{self.weight_quantization}'."
+            )
+        if self.attention_implementation not in ATTENTION_FUNCTIONS:
+            raise ValueError(
+                f"Wrong value provided for `attention_implementation` ({self.attention_implementation}). "
+                f"Expected one of {list(ATTENTION_FUNCTIONS)}."
+            )
         if self.use_delta_joint_actions_aloha:
             raise NotImplementedError(
                 "`use_delta_joint_actions_aloha` is used by smolvla for aloha real models. It is not ported yet in LeRobot."
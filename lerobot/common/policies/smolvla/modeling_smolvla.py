@@ -52,6 +52,7 @@ policy = SmolVLAPolicy.from_pretrained("lerobot/smolvla_base")
 
 """
 
+import logging
 import math
 from collections import deque
 
@@ -67,8 +68,12 @@ from lerobot.common.policies.normalize import (
 )
 from lerobot.common.policies.pretrained import PreTrainedPolicy
 from lerobot.common.policies.smolvla.configuration_smolvla import SmolVLAConfig
-from lerobot.common.policies.smolvla.smolvlm_with_expert import SmolVLMWithExpertModel
+from lerobot.common.policies.smolvla.ode_solvers import integrate
+from lerobot.common.policies.smolvla.smolvlm_with_expert import SmolVLMWithExpertModel, StaticKVCache
 from lerobot.common.policies.utils import (
+    ActionChunkPrefetcher,
+    LRUCache,
+    merge_action_chunk,
     populate_queues,
 )
 from lerobot.common.utils.utils import get_safe_dtype
@@ -256,6 +261,13 @@ class SmolVLAPolicy(PreTrainedPolicy):
 
         self.language_tokenizer = AutoProcessor.from_pretrained(self.config.vlm_model_name).tokenizer
         self.model = VLAFlowMatching(config)
+        if config.weight_quantization is not None:
+            # Quantized before the weights are loaded by `from_pretrained`, which quantizes the weights of
+            # non-quantized checkpoints on the fly.
+            self.model.vlm_with_expert.quantize_weights(config.weight_quantization)
+        self._prefetcher = ActionChunkPrefetcher()
+        # Tokens and embeddings of the last prompts, see `_prepare_language_prefix`.
+        self._prompt_cache = LRUCache(config.prompt_cache_size) if config.prompt_cache_size > 0 else None
         self.reset()
 
     def reset(self):
@@ -263,10 +275,22 @@ class SmolVLAPolicy(PreTrainedPolicy):
         self._queues = {
             ACTION: deque(maxlen=self.config.n_action_steps),
         }
+        self._prefetcher.close()
+        self._step = 0
+        self.model.image_embedding_cache.clear()
 
     def get_optim_params(self) -> dict:
         return self.parameters()
 
+    def quantize_weights(self, method: str = "int8") -> None:
+        """Quantizes the weights of the VLM and of the expert in place (see `config.weight_quantization`), so that
+        the policy saved by `save_pretrained` is loaded quantized by `from_pretrained`."""
+        if self.config.weight_quantization is not None:
+            raise RuntimeError(f"The policy is already quantized ({self.config.weight_quantization}).")
+        num_quantized = self.model.vlm_with_expert.quantize_weights(method)
+        self.config.weight_quantization = method
+        logging.info(f"Quantized {num_quantized} linear layers to {method}.")
+
     @torch.no_grad
     def select_action(self, batch: dict[str, Tensor], noise: Tensor | None = None) -> Tensor:
         """Select a single action given environment observations.
@@ -274,6 +298,9 @@ class SmolVLAPolicy(PreTrainedPolicy):
         This method wraps `select_actions` in order to return one action at a time for execution in the
         environment. It works by managing the actions in a queue and only calling `select_actions` when the
         queue is empty.
+
+        With `config.async_inference`, the next chunk is instead computed in a background thread as soon as
+        the queue runs low (see `_select_action_async`).
         """
         self.eval()
 
@@ -283,33 +310,75 @@ class SmolVLAPolicy(PreTrainedPolicy):
         batch = self.normalize_inputs(batch)
 
         self._queues = populate_queues(self._queues, batch, exclude_keys=[ACTION])
+        if self.config.async_inference:
+            return self._select_action_async(batch, noise)
+
         # Action queue logic for n_action_steps > 1. When the action_queue is depleted, populate it by
         # querying the policy.
         if len(self._queues[ACTION]) == 0:
-            for k in batch:
-                if k in self._queues:
-                    batch[k] = torch.stack(list(self._queues[k]), dim=1)
-            images, img_masks = self.prepare_images(batch)
-            state = self.prepare_state(batch)
-            lang_tokens, lang_masks = self.prepare_language(batch)
-
-            actions = self.model.sample_actions(
-                images, img_masks, lang_tokens, lang_masks, state, noise=noise
-            )
-            # Unpad actions
-            original_action_dim = self.config.action_feature.shape[0]
-            actions = actions[:, :, :original_action_dim]
-
-            actions = self.unnormalize_outputs({"action": actions})["action"]
-
-            if self.config.adapt_to_pi_aloha:
-                actions = self._pi_aloha_encode_actions(actions)
-
+            actions = self._get_action_chunk(batch, noise)
             # `self.model.forward` returns a (batch_size, n_action_steps, action_dim) tensor, but the queue
             # effectively has shape (n_action_steps, batch_size, *), hence the transpose.
             self._queues[ACTION].extend(actions.transpose(0, 1)[: self.config.n_action_steps])
         return self._queues[ACTION].popleft()
 
+    @torch.no_grad
+    def predict_action_chunk(self, batch: dict[str, Tensor], noise: Tensor | None = None) -> Tensor:
+        """Predict a chunk of `n_action_steps` actions (batch_size, n_action_steps, action_dim) from a batch of
+        observations, without going through the action queue. This is used to serve several robots at once, each
+        sample of the batch being the observation of one of them."""
+        self.eval()
+
+        if self.config.adapt_to_pi_aloha:
+            batch[OBS_STATE] = self._pi_aloha_decode_state(batch[OBS_STATE])
+
+        batch = self.normalize_inputs(batch)
+        return self._get_action_chunk(batch, noise)[:, : self.config.n_action_steps]
+
+    def _select_action_async(self, batch: dict[str, Tensor], noise: Tensor | None = None) -> Tensor:
+        """Starts computing the next chunk from the current observation once at most `config.async_watermark`
+        actions are left in the queue, and keeps executing the queued actions meanwhile. When the chunk is
+        ready, it replaces the queued actions, minus the ones corresponding to the steps executed since the
+        observation was taken. The control loop only waits when the queue runs out before the chunk is ready.
+        """
+        queue = self._queues[ACTION]
+        if not self._prefetcher.pending and len(queue) <= self.config.async_watermark:
+            # The caller may modify the observation tensors in place while the chunk is being computed.
+            batch = {key: val.clone() if isinstance(val, Tensor) else val for key, val in batch.items()}
+            self._prefetcher.submit(self._step, self._get_action_chunk, batch, noise)
+
+        result = self._prefetcher.result(block=len(queue) == 0)
+        if result is not None:
+            actions, observation_step = result
+            merge_action_chunk(queue, actions, self._step - observation_step, self.config.n_action_steps)
+
+        self._step += 1
+        return queue.popleft()
+
+    def _get_action_chunk(self, batch: dict[str, Tensor], noise: Tensor | None = None) -> Tensor:
+        """Predicts a chunk of unnormalized actions (batch_size, chunk_size, action_dim) from normalized
+        observations."""
+        for k in batch:
+            if k in self._queues and k != ACTION:
+                batch[k] = torch.stack(list(self._queues[k]), dim=1)
+        images, img_masks = self.prepare_images(batch)
+        state = self.prepare_state(batch)
+        lang_tokens, lang_masks, lang_emb = self._prepare_language_prefix(batch)
+
+        actions = self.model.sample_actions(
+            images, img_masks, lang_tokens, lang_masks, state, noise=noise, lang_emb=lang_emb
+        )
+        # Unpad actions
+        original_action_dim = self.config.action_feature.shape[0]
+        actions = actions[:, :, :original_action_dim]
+
+        actions = self.unnormalize_outputs({"action": actions})["action"]
+
+        if self.config.adapt_to_pi_aloha:
+            actions = self._pi_aloha_encode_actions(actions)
+
+        return actions
+
     def forward(self, batch: dict[str, Tensor], noise=None, time=None) -> dict[str, Tensor]:
         """Do a full training forward pass to compute the loss"""
         if self.config.adapt_to_pi_aloha:
@@ -403,6 +472,22 @@ class SmolVLAPolicy(PreTrainedPolicy):
 
         return lang_tokens, lang_masks
 
+    def _prepare_language_prefix(self, batch) -> tuple[Tensor, Tensor, Tensor | None]:
+        """Tokenizes the tasks like `prepare_language` and, when `config.prompt_cache_size` is set, also embeds
+        them. The tokens and embeddings are then memoized per tasks, so that a constant instruction is only
+        tokenized and embedded once. The language embedding is None when the cache is disabled."""
+        if self._prompt_cache is None or self.training:
+            return *self.prepare_language(batch), None
+
+        state = batch[OBS_STATE]
+        key = (tuple(batch["task"]), state.shape[0], state.device)
+        prefix = self._prompt_cache.get(key)
+        if prefix is None:
+            lang_tokens, lang_masks = self.prepare_language(batch)
+            prefix = (lang_tokens, lang_masks, self.model.embed_language(lang_tokens))
+            self._prompt_cache.put(key, prefix)
+        return prefix
+
     def _pi_aloha_decode_state(self, state):
         # Flip the joints.
         for motor_idx in [1, 2, 8, 9]:
@@ -505,6 +590,8 @@ class VLAFlowMatching(nn.Module):
             num_vlm_layers=self.config.num_vlm_layers,
             self_attn_every_n_layers=self.config.self_attn_every_n_layers,
             expert_width_multiplier=self.config.expert_width_multiplier,
+            attention_implementation=self.config.attention_implementation,
+            num_inference_vlm_layers=self.config.num_inference_vlm_layers,
         )
         self.state_proj = nn.Linear(
             self.config.max_state_dim, self.vlm_with_expert.config.text_config.hidden_size
@@ -529,6 +616,12 @@ class VLAFlowMatching(nn.Module):
         self.add_image_special_tokens = self.config.add_image_special_tokens
         self.image_end_token = torch.tensor([self.fake_image_token], dtype=torch.long)
         self.prefix_length = self.config.prefix_length
+        # Frame and embedding of the last image of each camera, see `embed_image`.
+        self.image_embedding_cache: dict[int, tuple[Tensor, Tensor]] = {}
+        # Prefix key value cache reused from one chunk to the next, allocated by the first `sample_actions`.
+        self.kv_cache = None
+        # Compiled `denoise_step`, see `get_denoise_step_fn`.
+        self._compiled_denoise_step = None
 
     def set_requires_grad(self):
         for params in self.state_proj.parameters():
@@ -549,16 +642,42 @@ class VLAFlowMatching(nn.Module):
         time = time_beta * 0.999 + 0.001
         return time.to(dtype=torch.float32, device=device)
 
+    def embed_image(self, img_idx: int, img: Tensor) -> Tensor:
+        """Embed the image of the `img_idx`-th camera with SigLIP. With `config.reuse_unchanged_image_embeddings`,
+        the embedding of the previous image of the camera is reused at inference if the image didn't change."""
+        if not self.config.reuse_unchanged_image_embeddings or self.training:
+            return self.vlm_with_expert.embed_image(img)
+
+        cached = self.image_embedding_cache.get(img_idx)
+        if cached is not None and cached[0].shape == img.shape and torch.equal(cached[0], img):
+            return cached[1]
+        img_emb = self.vlm_with_expert.embed_image(img)
+        self.image_embedding_cache[img_idx] = (img.clone(), img_emb)
+        return img_emb
+
+    def embed_language(self, lang_tokens: Tensor) -> Tensor:
+        """Embed language tokens with the embedding layer, normalized."""
+        lang_emb = self.vlm_with_expert.embed_language_tokens(lang_tokens)
+        # Normalize language embeddings
+        lang_emb_dim = lang_emb.shape[-1]
+        return lang_emb * math.sqrt(lang_emb_dim)
+
     def embed_prefix(
-        self, images, img_masks, lang_tokens, lang_masks, state: torch.Tensor = None
+        self,
+        images,
+        img_masks,
+        lang_tokens,
+        lang_masks,
+        state: torch.Tensor = None,
+        lang_emb: torch.Tensor | None = None,
     ) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         """Embed images with SigLIP and language tokens with embedding layer to prepare
-        for SmolVLM transformer processing.
+        for SmolVLM transformer processing. `lang_emb` can be given to skip embedding `lang_tokens`.
         """
         embs = []
         pad_masks = []
         att_masks = []
-        for _img_idx, (
+        for img_idx, (
             img,
             img_mask,
         ) in enumerate(zip(images, img_masks, strict=False)):
@@ -577,8 +696,7 @@ class VLAFlowMatching(nn.Module):
                 embs.append(image_start_token)
                 pad_masks.append(image_start_mask)
 
-            img_emb = self.vlm_with_expert.embed_image(img)
-            img_emb = img_emb
+            img_emb = self.embed_image(img_idx, img)
 
             # Normalize image embeddings
             img_emb_dim = img_emb.shape[-1]
@@ -605,10 +723,8 @@ class VLAFlowMatching(nn.Module):
                 embs.append(image_end_token)
                 pad_masks.append(image_end_mask)
                 att_masks += [0] * (image_end_mask.shape[1])
-        lang_emb = self.vlm_with_expert.embed_language_tokens(lang_tokens)
-        # Normalize language embeddings
-        lang_emb_dim = lang_emb.shape[-1]
-        lang_emb = lang_emb * math.sqrt(lang_emb_dim)
+        if lang_emb is None:
+            lang_emb = self.embed_language(lang_tokens)
 
         embs.append(lang_emb)
         pad_masks.append(lang_masks)
@@ -646,14 +762,19 @@ class VLAFlowMatching(nn.Module):
 
     def embed_suffix(self, noisy_actions, timestep):
         """Embed state, noisy_actions, timestep to prepare for Expert Gemma processing."""
-        embs = []
-        pad_masks = []
-        att_masks = []
+        embs = self.embed_action_time(noisy_actions, timestep)
+
+        bsize, action_time_dim = embs.shape[:2]
+        pad_masks = torch.ones(bsize, action_time_dim, dtype=torch.bool, device=embs.device)
+        # Set attention masks so that image, language and state inputs do not attend to action tokens
+        att_masks = torch.ones(bsize, self.config.chunk_size, dtype=embs.dtype, device=embs.device)
+        return embs, pad_masks, att_masks
 
+    def embed_action_time(self, noisy_actions, timestep):
+        """Fuse the noisy actions and the timestep into the action tokens of the expert."""
         # Fuse timestep + action information using an MLP
         action_emb = self.action_in_proj(noisy_actions)
         device = action_emb.device
-        bsize = action_emb.shape[0]
         dtype = action_emb.dtype
         # Embed timestep using sine-cosine positional encoding with sensitivity in the range [0, 1]
         time_emb = create_sinusoidal_pos_embedding(
@@ -670,22 +791,7 @@ class VLAFlowMatching(nn.Module):
 
         action_time_emb = self.action_time_mlp_in(action_time_emb)
         action_time_emb = F.silu(action_time_emb)  # swish == silu
-        action_time_emb = self.action_time_mlp_out(action_time_emb)
-
-        # Add to input tokens
-        embs.append(action_time_emb)
-
-        bsize, action_time_dim = action_time_emb.shape[:2]
-        action_time_mask = torch.ones(bsize, action_time_dim, dtype=torch.bool, device=device)
-        pad_masks.append(action_time_mask)
-
-        # Set attention masks so that image, language and state inputs do not attend to action tokens
-        att_masks += [1] * self.config.chunk_size
-        embs = torch.cat(embs, dim=1)
-        pad_masks = torch.cat(pad_masks, dim=1)
-        att_masks = torch.tensor(att_masks, dtype=embs.dtype, device=embs.device)
-        att_masks = att_masks[None, :].expand(bsize, len(att_masks))
-        return embs, pad_masks, att_masks
+        return self.action_time_mlp_out(action_time_emb)
 
     def forward(
         self, images, img_masks, lang_tokens, lang_masks, state, actions, noise=None, time=None
@@ -725,7 +831,9 @@ class VLAFlowMatching(nn.Module):
         losses = F.mse_loss(u_t, v_t, reduction="none")
         return losses
 
-    def sample_actions(self, images, img_masks, lang_tokens, lang_masks, state, noise=None) -> Tensor:
+    def sample_actions(
+        self, images, img_masks, lang_tokens, lang_masks, state, noise=None, lang_emb=None
+    ) -> Tensor:
         """Do a full inference forward and compute the action (batch_size x num_steps x num_motors)"""
         bsize = state.shape[0]
         device = state.device
@@ -735,36 +843,64 @@ class VLAFlowMatching(nn.Module):
             noise = self.sample_noise(actions_shape, device)
 
         prefix_embs, prefix_pad_masks, prefix_att_masks = self.embed_prefix(
-            images, img_masks, lang_tokens, lang_masks, state=state
+            images, img_masks, lang_tokens, lang_masks, state=state, lang_emb=lang_emb
         )
         prefix_att_2d_masks = make_att_2d_masks(prefix_pad_masks, prefix_att_masks)
         prefix_position_ids = torch.cumsum(prefix_pad_masks, dim=1) - 1
-        # Compute image and language key value cache
+        # Compute image and language key value cache, in buffers that also fit the keys and values of the
+        # actions so that the denoising steps write them in place.
+        if self.config.use_cache and self.kv_cache is None:
+            self.kv_cache = StaticKVCache(max_suffix_len=self.config.chunk_size)
         _, past_key_values = self.vlm_with_expert.forward(
             attention_mask=prefix_att_2d_masks,
             position_ids=prefix_position_ids,
-            past_key_values=None,
+            past_key_values=self.kv_cache,
             inputs_embeds=[prefix_embs, None],
             use_cache=self.config.use_cache,
             fill_kv_cache=True,
         )
-        dt = -1.0 / self.config.num_steps
-        dt = torch.tensor(dt, dtype=torch.float32, device=device)
-
-        x_t = noise
-        time = torch.tensor(1.0, dtype=torch.float32, device=device)
-        while time >= -dt / 2:
-            expanded_time = time.expand(bsize)
-            v_t = self.denoise_step(
-                prefix_pad_masks,
-                past_key_values,
-                x_t,
-                expanded_time,
-            )
-            # Euler step
-            x_t += dt * v_t
-            time += dt
-        return x_t
+
+        suffix_masks = self.make_suffix_masks(prefix_pad_masks)
+        denoise_step = self.get_denoise_step_fn(device)
+        compiled = denoise_step is self._compiled_denoise_step
+
+        def velocity_fn(x_t: Tensor, time: float) -> Tensor:
+            expanded_time = torch.full((bsize,), time, dtype=torch.float32, device=device)
+            if compiled:
+                # The outputs of a CUDA graph are overwritten by its next replay, and some solvers use the
+                # velocity of a step after evaluating the next one.
+                torch.compiler.cudagraph_mark_step_begin()
+                return denoise_step(
+                    prefix_pad_masks, past_key_values, x_t, expanded_time, suffix_masks
+                ).clone()
+            return denoise_step(prefix_pad_masks, past_key_values, x_t, expanded_time, suffix_masks)
+
+        return integrate(
+            velocity_fn,
+            noise,
+            self.config.num_steps,
+            solver=self.config.ode_solver,
+            schedule=self.config.timestep_schedule,
+            early_exit_tolerance=self.config.early_exit_tolerance,
+        )
+
+    def make_suffix_masks(self, prefix_pad_masks) -> tuple[Tensor, Tensor]:
+        """Attention masks and position ids of the action tokens, which attend to the prefix through the KV
+        cache. They don't depend on the noise nor the timestep, so they are computed once for all the denoising
+        steps of a chunk."""
+        batch_size, prefix_len = prefix_pad_masks.shape
+        suffix_len = self.config.chunk_size
+        device = prefix_pad_masks.device
+        suffix_pad_masks = torch.ones(batch_size, suffix_len, dtype=torch.bool, device=device)
+        suffix_att_masks = torch.ones(batch_size, suffix_len, dtype=torch.int32, device=device)
+
+        prefix_pad_2d_masks = prefix_pad_masks[:, None, :].expand(batch_size, suffix_len, prefix_len)
+        suffix_att_2d_masks = make_att_2d_masks(suffix_pad_masks, suffix_att_masks)
+        full_att_2d_masks = torch.cat([prefix_pad_2d_masks, suffix_att_2d_masks], dim=2)
+
+        prefix_offsets = torch.sum(prefix_pad_masks, dim=-1)[:, None]
+        position_ids = prefix_offsets + torch.cumsum(suffix_pad_masks, dim=1) - 1
+        return full_att_2d_masks, position_ids
 
     def denoise_step(
         self,
@@ -772,20 +908,14 @@ class VLAFlowMatching(nn.Module):
         past_key_values,
         x_t,
         timestep,
+        suffix_masks: tuple[Tensor, Tensor] | None = None,
     ):
-        """Apply one denoising step of the noise `x_t` at a given timestep."""
-        suffix_embs, suffix_pad_masks, suffix_att_masks = self.embed_suffix(x_t, timestep)
-
-        suffix_len = suffix_pad_masks.shape[1]
-        batch_size = prefix_pad_masks.shape[0]
-        prefix_len = prefix_pad_masks.shape[1]
-        prefix_pad_2d_masks = prefix_pad_masks[:, None, :].expand(batch_size, suffix_len, prefix_len)
-
-        suffix_att_2d_masks = make_att_2d_masks(suffix_pad_masks, suffix_att_masks)
-
-        full_att_2d_masks = torch.cat([prefix_pad_2d_masks, suffix_att_2d_masks], dim=2)
-        prefix_offsets = torch.sum(prefix_pad_masks, dim=-1)[:, None]
-        position_ids = prefix_offsets + torch.cumsum(suffix_pad_masks, dim=1) - 1
+        """Apply one denoising step of the noise `x_t` at a given timestep. `suffix_masks` are the attention
+        masks and position ids returned by `make_suffix_masks`, computed here if not given."""
+        suffix_embs = self.embed_action_time(x_t, timestep)
+        if suffix_masks is None:
+            suffix_masks = self.make_suffix_masks(prefix_pad_masks)
+        full_att_2d_masks, position_ids = suffix_masks
 
         outputs_embeds, _ = self.vlm_with_expert.forward(
             attention_mask=full_att_2d_masks,
@@ -800,3 +930,12 @@ class VLAFlowMatching(nn.Module):
         suffix_out = suffix_out.to(dtype=torch.float32)
         v_t = self.action_out_proj(suffix_out)
         return v_t
+
+    def get_denoise_step_fn(self, device: torch.device):
+        """Returns `denoise_step`, compiled if `config.compile_denoise_step` is set and `device` is a CUDA device.
+        The compiled function is created once and reused by the following chunks."""
+        if not self.config.compile_denoise_step or device.type != "cuda":
+            return self.denoise_step
+        if self._compiled_denoise_step is None:
+            self._compiled_denoise_step = torch.compile(self.denoise_step, mode=self.config.compile_mode)
+        return self._compiled_denoise_step
@@ -0,0 +1,112 @@
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""ODE solvers integrating the flow matching velocity field from noise (time 1) to actions (time 0).
+
+The velocity `v_t = velocity_fn(x_t, t)` is integrated over a list of decreasing timesteps, which are Python
+floats computed once: the loop has no tensor comparison and so never waits for the device.
+
+Number of velocity evaluations (i.e. action expert forwards) for `num_steps` steps:
+- euler: `num_steps`
+- midpoint: `2 * num_steps`
+- heun: `2 * num_steps - 1` (the last step, which ends at time 0, is an Euler step)
+"""
+
+import math
+from collections.abc import Callable
+
+import torch
+from torch import Tensor
+
+VelocityFn = Callable[[Tensor, float], Tensor]
+
+
+def uniform_timesteps(num_steps: int) -> list[float]:
+    return [1.0 - i / num_steps for i in range(num_steps + 1)]
+
+
+def cosine_timesteps(num_steps: int) -> list[float]:
+    """Smaller steps close to the noise and to the actions."""
+    return [(1.0 + math.cos(math.pi * i / num_steps)) / 2 for i in range(num_steps + 1)]
+
+
+def quadratic_timesteps(num_steps: int) -> list[float]:
+    """Smaller steps close to the actions."""
+    return [(1.0 - i / num_steps) ** 2 for i in range(num_steps + 1)]
+
+
+TIMESTEP_SCHEDULES: dict[str, Callable[[int], list[float]]] = {
+    "uniform": uniform_timesteps,
+    "cosine": cosine_timesteps,
+    "quadratic": quadratic_timesteps,
+}
+
+
+def euler_step(velocity_fn: VelocityFn, x_t: Tensor, t: float, t_next: float, v_t: Tensor) -> Tensor:
+    return x_t + (t_next - t) * v_t
+
+
+def midpoint_step(velocity_fn: VelocityFn, x_t: Tensor, t: float, t_next: float, v_t: Tensor) -> Tensor:
+    dt = t_next - t
+    v_mid = velocity_fn(x_t + dt / 2 * v_t, t + dt / 2)
+    return x_t + dt * v_mid
+
+
+def heun_step(velocity_fn: VelocityFn, x_t: Tensor, t: float, t_next: float, v_t: Tensor) -> Tensor:
+    dt = t_next - t
+    x_next = x_t + dt * v_t
+    if t_next <= 0:
+        # The velocity isn't evaluated at time 0, which is out of the training range of the timesteps.
+        return x_next
+    v_next = velocity_fn(x_next, t_next)
+    return x_t + dt / 2 * (v_t + v_next)
+
+
+ODE_SOLVERS: dict[str, Callable[[VelocityFn, Tensor, float, float, Tensor], Tensor]] = {
+    "euler": euler_step,
+    "midpoint": midpoint_step,
+    "heun": heun_step,
+}
+
+
+def integrate(
+    velocity_fn: VelocityFn,
+    noise: Tensor,
+    num_steps: int,
+    solver: str = "euler",
+    schedule: str = "uniform",
+    early_exit_tolerance: float = 0.0,
+) -> Tensor:
+    """Integrates `velocity_fn` from `noise` at time 1 to time 0 in `num_steps` steps.
+
+    With `early_exit_tolerance > 0`, the actions predicted at each step (`x_t - t * v_t`, the end point of a
+    straight flow) are compared to the ones of the previous step, and returned as soon as no value moved by more
+    than the tolerance. This check synchronizes with the device at every step.
+    """
+    timesteps = TIMESTEP_SCHEDULES[schedule](num_steps)
+    step_fn = ODE_SOLVERS[solver]
+
+    x_t = noise
+    prev_actions = None
+    for t, t_next in zip(timesteps[:-1], timesteps[1:], strict=True):
+        v_t = velocity_fn(x_t, t)
+        if early_exit_tolerance > 0:
+            actions = x_t - t * v_t
+            if (
+                prev_actions is not None
+                and torch.max(torch.abs(actions - prev_actions)) < early_exit_tolerance
+            ):
+                return actions
+            prev_actions = actions
+        x_t = step_fn(velocity_fn, x_t, t, t_next, v_t)
+    return x_t
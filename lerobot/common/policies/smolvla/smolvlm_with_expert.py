@@ -25,6 +25,9 @@ from transformers import (
     SmolVLMForConditionalGeneration,
 )
 
+from lerobot.common.policies.attention import get_attention_function
+from lerobot.common.policies.quantization import get_weight_dtype, quantize_linear_layers
+
 
 def apply_rope(x, positions, max_wavelength=10_000):
     """
@@ -59,6 +62,83 @@ def get_intermediate_size(hidden_dim, ffn_dim_multiplier=4, multiple_of=256):
     return hidden_dim
 
 
+class StaticKVCache:
+    """
+    Key/value cache of the prefix (images, language and state tokens), preallocated per layer for the prefix
+    and up to `max_suffix_len` suffix (action) tokens.
+
+    The prefix pass fills the first `prefix_len` positions of each layer with `fill`, then every denoising step
+    writes its suffix keys/values in place right after them with `update`, instead of concatenating them to the
+    prefix ones. The buffers keep the same storage from one denoising step to the next, and from one chunk to
+    the next as long as the batch size and prefix length don't change, so that the denoising loop can be
+    compiled or captured in a CUDA graph. They are only reallocated when a larger suffix or a new dtype comes
+    in, following the type promotion of `torch.cat`.
+    """
+
+    def __init__(self, max_suffix_len: int = 0):
+        self.max_suffix_len = max_suffix_len
+        self.prefix_len = 0
+        self.key_states: dict[int, torch.Tensor] = {}
+        self.value_states: dict[int, torch.Tensor] = {}
+
+    def __len__(self) -> int:
+        return len(self.key_states)
+
+    def __contains__(self, layer_idx: int) -> bool:
+        return layer_idx in self.key_states
+
+    @staticmethod
+    def _allocate(
+        buffer: torch.Tensor | None, like: torch.Tensor, length: int, dtype: torch.dtype
+    ) -> torch.Tensor:
+        shape = (like.shape[0], length, *like.shape[2:])
+        if (
+            buffer is not None
+            and buffer.shape == shape
+            and buffer.dtype == dtype
+            and buffer.device == like.device
+        ):
+            return buffer
+        return torch.empty(shape, dtype=dtype, device=like.device)
+
+    def fill(self, layer_idx: int, key_states: torch.Tensor, value_states: torch.Tensor) -> None:
+        """Stores the prefix keys and values (B, L, H, D) of a layer."""
+        self.prefix_len = key_states.shape[1]
+        length = self.prefix_len + self.max_suffix_len
+        for cache, states in [(self.key_states, key_states), (self.value_states, value_states)]:
+            buffer = cache.get(layer_idx)
+            dtype = states.dtype if buffer is None else torch.promote_types(buffer.dtype, states.dtype)
+            cache[layer_idx] = self._allocate(buffer, states, length, dtype)
+            cache[layer_idx][:, : self.prefix_len] = states
+
+    def update(
+        self, layer_idx: int, key_states: torch.Tensor, value_states: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Writes the suffix keys and values (B, L, H, D) of a layer after its prefix ones, and returns the keys
+        and values of the prefix followed by the suffix."""
+        suffix_len = key_states.shape[1]
+        self.max_suffix_len = max(self.max_suffix_len, suffix_len)
+        length = self.prefix_len + suffix_len
+        outputs = []
+        for cache, states in [(self.key_states, key_states), (self.value_states, value_states)]:
+            buffer = cache[layer_idx]
+            dtype = torch.promote_types(buffer.dtype, states.dtype)
+            if buffer.shape[1] < length or buffer.dtype != dtype:
+                buffer = self._allocate(None, buffer, self.prefix_len + self.max_suffix_len, dtype)
+                buffer[:, : self.prefix_len] = cache[layer_idx][:, : self.prefix_len]
+                cache[layer_idx] = buffer
+            buffer[:, self.prefix_len : length] = states
+            outputs.append(buffer[:, :length])
+        return outputs[0], outputs[1]
+
+    def get(self, layer_idx: int) -> tuple[torch.Tensor, torch.Tensor]:
+        """Returns the prefix keys and values of a layer."""
+        return (
+            self.key_states[layer_idx][:, : self.prefix_len],
+            self.value_states[layer_idx][:, : self.prefix_len],
+        )
+
+
 class SmolVLMWithExpertModel(nn.Module):
     def __init__(
         self,
@@ -71,6 +151,8 @@ class SmolVLMWithExpertModel(nn.Module):
         num_vlm_layers: int = -1,
         self_attn_every_n_layers: int = -1,
         expert_width_multiplier: float = 0.5,
+        attention_implementation: str = "eager",
+        num_inference_vlm_layers: int = -1,
     ):
         super().__init__()
         if load_vlm_weights:
@@ -130,12 +212,26 @@ class SmolVLMWithExpertModel(nn.Module):
         self.freeze_vision_encoder = freeze_vision_encoder
         self.train_expert_only = train_expert_only
         self.attention_mode = attention_mode
+        self.attention_implementation = attention_implementation
         self.expert_hidden_size = lm_expert_config.hidden_size
+        # Layers of the VLM and of the expert (None when a VLM layer has no expert layer) used at each depth.
+        self.model_layers = self.get_model_layers([self.get_vlm_model().text_model, self.lm_expert])
+        # Depths at which the expert runs at inference, see `get_layer_indices`.
+        self.expert_layer_indices = self.get_expert_layer_indices(num_inference_vlm_layers)
         self.set_requires_grad()
 
     def get_vlm_model(self):
         return self.vlm.model
 
+    def quantize_weights(self, method: str = "int8") -> int:
+        """Quantizes the linear layers of the vision model, of the VLM text layers and of the expert, see
+        `lerobot.common.policies.quantization`. Returns the number of quantized layers."""
+        vlm = self.get_vlm_model()
+        return sum(
+            quantize_linear_layers(module, method)
+            for module in [vlm.vision_model, vlm.text_model.layers, self.lm_expert.layers]
+        )
+
     def set_requires_grad(self):
         if self.freeze_vision_encoder:
             self.get_vlm_model().vision_model.eval()
@@ -220,7 +316,7 @@ class SmolVLMWithExpertModel(nn.Module):
             input_shape = hidden_states.shape[:-1]
             hidden_shape = (*input_shape, -1, layer.self_attn.head_dim)
 
-            hidden_states = hidden_states.to(dtype=layer.self_attn.q_proj.weight.dtype)
+            hidden_states = hidden_states.to(dtype=get_weight_dtype(layer.self_attn.q_proj))
             query_state = layer.self_attn.q_proj(hidden_states).view(hidden_shape)
             key_state = layer.self_attn.k_proj(hidden_states).view(hidden_shape)
             value_state = layer.self_attn.v_proj(hidden_states).view(hidden_shape)
@@ -249,21 +345,13 @@ class SmolVLMWithExpertModel(nn.Module):
         key_states = apply_rope(key_states, position_ids_)
 
         if use_cache and past_key_values is None:
-            past_key_values = {}
+            past_key_values = StaticKVCache()
 
         if use_cache:
             if fill_kv_cache:
-                past_key_values[layer_idx] = {
-                    "key_states": key_states,
-                    "value_states": value_states,
-                }
+                past_key_values.fill(layer_idx, key_states, value_states)
             else:
-                # TODO here, some optimization can be done - similar to a `StaticCache` we can declare the `max_len` before.
-                # so we create an empty cache, with just one cuda malloc, and if (in autoregressive case) we reach
-                # the max len, then we (for instance) double the cache size. This implementation already exists
-                # in `transformers`. (molbap)
-                key_states = torch.cat([past_key_values[layer_idx]["key_states"], key_states], dim=1)
-                value_states = torch.cat([past_key_values[layer_idx]["value_states"], value_states], dim=1)
+                key_states, value_states = past_key_values.update(layer_idx, key_states, value_states)
 
         attention_interface = self.get_attention_interface()
 
@@ -305,7 +393,7 @@ class SmolVLMWithExpertModel(nn.Module):
             input_shape = hidden_states.shape[:-1]
             hidden_shape = (*input_shape, -1, layer.self_attn.head_dim)
 
-            hidden_states = hidden_states.to(dtype=layer.self_attn.q_proj.weight.dtype)
+            hidden_states = hidden_states.to(dtype=get_weight_dtype(layer.self_attn.q_proj))
             query_state = layer.self_attn.q_proj(hidden_states).view(hidden_shape)
             key_state = layer.self_attn.k_proj(hidden_states).view(hidden_shape)
             value_states = layer.self_attn.v_proj(hidden_states).view(hidden_shape)
@@ -322,21 +410,13 @@ class SmolVLMWithExpertModel(nn.Module):
             expert_position_id = position_ids
 
         if use_cache and past_key_values is None:
-            past_key_values = {}
+            past_key_values = StaticKVCache()
 
         if use_cache:
             if fill_kv_cache:
-                past_key_values[layer_idx] = {
-                    "key_states": key_states,
-                    "value_states": value_states,
-                }
+                past_key_values.fill(layer_idx, key_states, value_states)
             else:
-                # TODO here, some optimization can be done - similar to a `StaticCache` we can declare the `max_len` before.
-                # so we create an empty cache, with just one cuda malloc, and if (in autoregressive case) we reach
-                # the max len, then we (for instance) double the cache size. This implementation already exists
-                # in `transformers`. (molbap)
-                key_states = past_key_values[layer_idx]["key_states"]
-                value_states = past_key_values[layer_idx]["value_states"]
+                key_states, value_states = past_key_values.get(layer_idx)
 
         # Expert
         expert_layer = model_layers[1][layer_idx]
@@ -346,17 +426,19 @@ class SmolVLMWithExpertModel(nn.Module):
             expert_input_shape = expert_hidden_states.shape[:-1]
             expert_hidden_shape = (*expert_input_shape, -1, expert_layer.self_attn.head_dim)
 
-            expert_hidden_states = expert_hidden_states.to(dtype=expert_layer.self_attn.q_proj.weight.dtype)
+            expert_hidden_states = expert_hidden_states.to(
+                dtype=get_weight_dtype(expert_layer.self_attn.q_proj)
+            )
             expert_query_state = expert_layer.self_attn.q_proj(expert_hidden_states).view(expert_hidden_shape)
 
-            _key_states = key_states.to(dtype=expert_layer.self_attn.k_proj.weight.dtype).view(
+            _key_states = key_states.to(dtype=get_weight_dtype(expert_layer.self_attn.k_proj)).view(
                 *key_states.shape[:2], -1
             )
             expert_key_states = expert_layer.self_attn.k_proj(_key_states).view(
                 *_key_states.shape[:-1], -1, expert_layer.self_attn.head_dim
             )  # k_proj should have same dim as kv
 
-            _value_states = value_states.to(dtype=expert_layer.self_attn.v_proj.weight.dtype).view(
+            _value_states = value_states.to(dtype=get_weight_dtype(expert_layer.self_attn.v_proj)).view(
                 *value_states.shape[:2], -1
             )
             expert_value_states = expert_layer.self_attn.v_proj(_value_states).view(
@@ -401,17 +483,43 @@ class SmolVLMWithExpertModel(nn.Module):
             expert_layers.append(expert_layer)
         return [vlm_layers, expert_layers]
 
+    def get_expert_layer_indices(self, num_inference_vlm_layers: int = -1) -> list[int]:
+        """Depths at which the expert has a layer, among the first `num_inference_vlm_layers` ones (all of them
+        if <= 0). Truncating them approximates the model: the expert layers paired with the dropped VLM layers
+        are skipped as well."""
+        num_layers = self.num_vlm_layers
+        if num_inference_vlm_layers > 0:
+            num_layers = min(num_inference_vlm_layers, num_layers)
+        expert_layer_indices = [i for i in range(num_layers) if self.model_layers[1][i] is not None]
+        if len(expert_layer_indices) == 0:
+            raise ValueError(
+                f"No expert layer among the first {num_layers} VLM layers used at inference "
+                f"(num_inference_vlm_layers={num_inference_vlm_layers})."
+            )
+        return expert_layer_indices
+
+    def get_layer_indices(self, inputs_embeds: list[torch.Tensor | None], fill_kv_cache: bool) -> list[int]:
+        """Depths run by `forward`. At inference, when only the actions are denoised, the layers without an
+        expert layer only pass the hidden states through and are skipped. When the keys and values of the prefix
+        are cached, the VLM layers after the last one used by the expert are skipped: their keys and values are
+        never read (the returned prefix embeddings then come from this last layer)."""
+        if inputs_embeds[0] is None:
+            return self.expert_layer_indices
+        if inputs_embeds[1] is None and fill_kv_cache:
+            return list(range(self.expert_layer_indices[-1] + 1))
+        return list(range(self.num_vlm_layers))
+
     def forward(
         self,
         attention_mask: Optional[torch.Tensor] = None,
         position_ids: Optional[torch.LongTensor] = None,
-        past_key_values: Optional[List[torch.FloatTensor]] = None,
+        past_key_values: Optional[StaticKVCache] = None,
         inputs_embeds: List[torch.FloatTensor] = None,
         use_cache: Optional[bool] = None,
         fill_kv_cache: Optional[bool] = None,
     ):
         models = [self.get_vlm_model().text_model, self.lm_expert]
-        model_layers = self.get_model_layers(models)
+        model_layers = self.model_layers
         for hidden_states in inputs_embeds:
             # TODO this is very inefficient
             # dtype is always the same, batch size too (if > 1 len)
@@ -421,9 +529,8 @@ class SmolVLMWithExpertModel(nn.Module):
             batch_size = hidden_states.shape[0]
 
         # RMSNorm
-        num_layers = self.num_vlm_layers
         head_dim = self.vlm.config.text_config.head_dim
-        for layer_idx in range(num_layers):
+        for layer_idx in self.get_layer_indices(inputs_embeds, fill_kv_cache):
             if (
                 fill_kv_cache
                 or "cross" not in self.attention_mode
@@ -467,8 +574,8 @@ class SmolVLMWithExpertModel(nn.Module):
                         continue
                     end = start + hidden_states.shape[1]
 
-                    if att_output.dtype != layer.self_attn.o_proj.weight.dtype:
-                        att_output = att_output.to(layer.self_attn.o_proj.weight.dtype)
+                    if att_output.dtype != get_weight_dtype(layer.self_attn.o_proj):
+                        att_output = att_output.to(get_weight_dtype(layer.self_attn.o_proj))
                     att_out = att_output[:, start:end]
                     out_emb = layer.self_attn.o_proj(att_out)
 
@@ -499,52 +606,4 @@ class SmolVLMWithExpertModel(nn.Module):
         return outputs_embeds, past_key_values
 
     def get_attention_interface(self):
-        attention_interface = self.eager_attention_forward
-        return attention_interface
-
-    def eager_attention_forward(
-        self, attention_mask, batch_size, head_dim, query_states, key_states, value_states
-    ):
-        num_att_heads = self.num_attention_heads
-        num_key_value_heads = self.num_key_value_heads
-        num_key_value_groups = num_att_heads // num_key_value_heads
-
-        sequence_length = key_states.shape[1]
-
-        key_states = key_states[:, :, :, None, :].expand(
-            batch_size, sequence_length, num_key_value_heads, num_key_value_groups, head_dim
-        )
-        key_states = key_states.reshape(
-            batch_size, sequence_length, num_key_value_heads * num_key_value_groups, head_dim
-        )
-
-        value_states = value_states[:, :, :, None, :].expand(
-            batch_size, sequence_length, num_key_value_heads, num_key_value_groups, head_dim
-        )
-        value_states = value_states.reshape(
-            batch_size, sequence_length, num_key_value_heads * num_key_value_groups, head_dim
-        )
-
-        # Attention here is upcasted to float32 to match the original eager implementation.
-        query_states = query_states.to(dtype=torch.float32)
-        key_states = key_states.to(dtype=torch.float32)
-
-        query_states = query_states.transpose(1, 2)
-        key_states = key_states.transpose(1, 2)
-
-        att_weights = torch.matmul(query_states, key_states.transpose(2, 3))
-        att_weights *= head_dim**-0.5
-
-        att_weights = att_weights.to(dtype=torch.float32)
-        big_neg = torch.finfo(att_weights.dtype).min  # -2.3819763e38  # See gemma/modules.py
-        masked_att_weights = torch.where(attention_mask[:, None, :, :], att_weights, big_neg)
-        probs = nn.functional.softmax(masked_att_weights, dim=-1)
-        probs = probs.to(dtype=value_states.dtype)
-
-        att_output = torch.matmul(probs, value_states.permute(0, 2, 1, 3))
-
-        att_output = att_output.permute(0, 2, 1, 3)
-        # we use -1 because sequence length can change
-        att_output = att_output.reshape(batch_size, -1, num_key_value_heads * num_key_value_groups * head_dim)
-
-        return att_output
+        return get_attention_function(self.attention_implementation)
@@ -14,7 +14,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from collections import deque
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 import torch
 from torch import nn
@@ -71,3 +73,105 @@ def get_output_shape(module: nn.Module, input_shape: tuple) -> tuple:
     with torch.inference_mode():
         output = module(dummy_input)
     return tuple(output.shape)
+
+
+class LRUCache:
+    """Mapping holding at most `maxsize` items, which evicts the least recently used one when a new item is
+    added while it is full."""
+
+    def __init__(self, maxsize: int):
+        if maxsize <= 0:
+            raise ValueError(f"The cache should hold at least one item, got {maxsize=}.")
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def get(self, key, default=None):
+        if key not in self._items:
+            return default
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def put(self, key, value) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class ActionChunkPrefetcher:
+    """Computes action chunks in a background thread, so that a policy can start predicting its next chunk
+    while it keeps executing the actions of the current one.
+
+    Each request remembers the step at which its observation was taken, so that the actions that were executed
+    while the chunk was being computed can be skipped when it is merged (see `merge_action_chunk`).
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._future = None
+        self._step = None
+
+    @property
+    def pending(self) -> bool:
+        return self._future is not None
+
+    def submit(self, step: int, compute_chunk: Callable[..., torch.Tensor], *args) -> None:
+        if self.pending:
+            raise RuntimeError("An action chunk is already being computed.")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="action_chunk_prefetcher")
+        self._future = self._executor.submit(self._compute, compute_chunk, *args)
+        self._step = step
+
+    @staticmethod
+    def _compute(compute_chunk: Callable[..., torch.Tensor], *args) -> torch.Tensor:
+        # Gradient mode is thread local, it needs to be disabled in the worker thread as well.
+        with torch.no_grad():
+            return compute_chunk(*args)
+
+    def result(self, block: bool = False) -> tuple[torch.Tensor, int] | None:
+        """Returns the computed chunk along with the step of its observation, or None if no chunk is ready."""
+        if self._future is None or (not block and not self._future.done()):
+            return None
+        future, self._future = self._future, None
+        return future.result(), self._step
+
+    def cancel(self) -> None:
+        """Waits for the chunk being computed, if any, and drops it."""
+        if self._future is not None:
+            self._future.exception()
+            self._future = None
+
+    def close(self) -> None:
+        """Drops the chunk being computed (see `cancel`) and stops the worker thread, which is started again by
+        the next `submit`."""
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __del__(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+def merge_action_chunk(queue: deque, actions: torch.Tensor, delay: int, n_action_steps: int) -> None:
+    """Replaces the actions left in `queue` by a new chunk (batch_size, chunk_size, action_dim) predicted from an
+    observation taken `delay` steps ago. The first `delay` actions of the chunk, which correspond to steps that
+    were already executed, are skipped."""
+    actions = actions.transpose(0, 1)
+    if delay >= len(actions):
+        raise ValueError(
+            f"The action chunk ({len(actions)} actions) is older than its length ({delay} steps)."
+        )
+    queue.clear()
+    queue.extend(actions[delay : max(n_action_steps, delay + 1)])
@@ -32,6 +32,11 @@ class KochFollowerConfig(RobotConfig):
     # the number of motors in your follower arms.
     max_relative_target: int | None = None
 
+    # Maximum age (in seconds) of the present positions read by `get_observation` for them to be used to cap the
+    # goal positions with `max_relative_target` in `send_action`, instead of reading them again from the motors.
+    # Set to `None` to always read them again.
+    max_present_position_age_s: float | None = 0.1
+
     # cameras
     cameras: dict[str, CameraConfig] = field(default_factory=dict)
 
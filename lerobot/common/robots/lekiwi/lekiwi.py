@@ -32,7 +32,7 @@ from lerobot.common.motors.feetech import (
 )
 
 from ..robot import Robot
-from ..utils import ensure_safe_goal_position
+from ..utils import PresentPositionCache, ensure_safe_goal_position
 from .config_lekiwi import LeKiwiConfig
 
 logger = logging.getLogger(__name__)
@@ -73,6 +73,7 @@ class LeKiwi(Robot):
         self.arm_motors = [motor for motor in self.bus.motors if motor.startswith("arm")]
         self.base_motors = [motor for motor in self.bus.motors if motor.startswith("base")]
         self.cameras = make_cameras_from_configs(config.cameras)
+        self.present_pos_cache = PresentPositionCache(config.max_present_position_age_s)
 
     @property
     def _state_ft(self) -> dict[str, type]:
@@ -337,6 +338,7 @@ class LeKiwi(Robot):
         # Read actuators position for arm and vel for base
         start = time.perf_counter()
         arm_pos = self.bus.sync_read("Present_Position", self.arm_motors)
+        self.present_pos_cache.update(arm_pos)
         base_wheel_vel = self.bus.sync_read("Present_Velocity", self.base_motors)
 
         base_vel = self._wheel_raw_to_body(
@@ -350,15 +352,13 @@ class LeKiwi(Robot):
         flat_states = {**arm_state, **base_vel}
 
         obs_dict = {f"{OBS_STATE}": flat_states}
-        dt_ms = (time.perf_counter() - start) * 1e3
-        logger.debug(f"{self} read state: {dt_ms:.1f}ms")
+        self.log_latency("read_state", start)
 
         # Capture images from cameras
         for cam_key, cam in self.cameras.items():
             start = time.perf_counter()
             obs_dict[f"{OBS_IMAGES}.{cam_key}"] = cam.async_read()
-            dt_ms = (time.perf_counter() - start) * 1e3
-            logger.debug(f"{self} read {cam_key}: {dt_ms:.1f}ms")
+            self.log_latency(f"read_{cam_key}", start)
 
         return obs_dict
 
@@ -385,11 +385,15 @@ class LeKiwi(Robot):
             base_goal_vel["x.vel"], base_goal_vel["y.vel"], base_goal_vel["theta.vel"]
         )
 
-        # Cap goal position when too far away from present position.
-        # /!\ Slower fps expected due to reading from the follower.
+        # Cap goal position when too far away from present position (read by `get_observation` if recent).
+        # /!\ Slower fps expected when reading again from the follower.
         if self.config.max_relative_target is not None:
-            present_pos = self.bus.sync_read("Present_Position", self.arm_motors)
-            goal_present_pos = {key: (g_pos, present_pos[key]) for key, g_pos in arm_goal_pos.items()}
+            present_pos = self.present_pos_cache.get(self.arm_motors)
+            if present_pos is None:
+                present_pos = self.bus.sync_read("Present_Position", self.arm_motors)
+            goal_present_pos = {
+                key: (g_pos, present_pos[key.removesuffix(".pos")]) for key, g_pos in arm_goal_pos.items()
+            }
             arm_safe_goal_pos = ensure_safe_goal_position(goal_present_pos, self.config.max_relative_target)
             arm_goal_pos = arm_safe_goal_pos
 
@@ -410,6 +414,7 @@ class LeKiwi(Robot):
 
         self.stop_base()
         self.bus.disconnect(self.config.disable_torque_on_disconnect)
+        self.present_pos_cache.clear()
         for cam in self.cameras.values():
             cam.disconnect()
 
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import abc
+import logging
+import time
 from pathlib import Path
 from typing import Any
 
@@ -20,9 +22,12 @@ import draccus
 
 from lerobot.common.constants import HF_LEROBOT_CALIBRATION, ROBOTS
 from lerobot.common.motors import MotorCalibration
+from lerobot.common.utils.latency_utils import LatencyTracker
 
 from .config import RobotConfig
 
+logger = logging.getLogger(__name__)
+
 
 # TODO(aliberts): action/obs typing such as Generic[ObsType, ActType] similar to gym.Env ?
 # https://github.com/Farama-Foundation/Gymnasium/blob/3287c869f9a48d99454306b0d4b4ec537f0f35e3/gymnasium/core.py#L23
@@ -44,10 +49,20 @@ class Robot(abc.ABC):
         self.calibration: dict[str, MotorCalibration] = {}
         if self.calibration_fpath.is_file():
             self._load_calibration()
+        # Records the durations of the reads of the robot when set, see `log_latency`.
+        self.latency_tracker: LatencyTracker | None = None
 
     def __str__(self) -> str:
         return f"{self.id} {self.__class__.__name__}"
 
+    def log_latency(self, stage: str, start: float) -> None:
+        """Logs the duration of `stage` since `start` (a `time.perf_counter()` value), and records it in
+        `latency_tracker` if set."""
+        dt_s = time.perf_counter() - start
+        if self.latency_tracker is not None:
+            self.latency_tracker.record(stage, dt_s)
+        logger.debug(f"{self} {stage}: {dt_s * 1e3:.1f}ms")
+
     # TODO(aliberts): create a proper Feature class for this that links with datasets
     @property
     @abc.abstractmethod
@@ -28,7 +28,7 @@ from lerobot.common.motors.feetech import (
 )
 
 from ..robot import Robot
-from ..utils import ensure_safe_goal_position
+from ..utils import PresentPositionCache, ensure_safe_goal_position
 from .config_so100_follower import SO100FollowerConfig
 
 logger = logging.getLogger(__name__)
@@ -59,6 +59,7 @@ class SO100Follower(Robot):
             calibration=self.calibration,
         )
         self.cameras = make_cameras_from_configs(config.cameras)
+        self.present_pos_cache = PresentPositionCache(config.max_present_position_age_s)
 
     @property
     def _motors_ft(self) -> dict[str, type]:
@@ -98,6 +99,8 @@ class SO100Follower(Robot):
             cam.connect()
 
         self.configure()
+        if self.config.use_motor_io_thread:
+            self.bus.start_io_thread(fps=self.config.motor_io_fps)
         logger.info(f"{self} connected.")
 
     @property
@@ -154,23 +157,35 @@ class SO100Follower(Robot):
             self.bus.setup_motor(motor)
             print(f"'{motor}' motor id set to {self.bus.motors[motor].id}")
 
+    def _read_present_position(self, max_age_s: float | None = None) -> dict[str, float]:
+        """Reads the arm position (from the motor I/O thread if used, unless its values are older than
+        `max_age_s`) and caches it for `send_action`."""
+        present_pos, timestamp = None, None
+        if self.config.use_motor_io_thread:
+            present_pos, timestamp = self.bus.async_read("Present_Position")
+            if max_age_s is not None and time.perf_counter() - timestamp > max_age_s:
+                present_pos, timestamp = None, None
+        if present_pos is None:
+            with self.bus.io_lock:
+                present_pos = self.bus.sync_read("Present_Position")
+        self.present_pos_cache.update(present_pos, timestamp)
+        return present_pos
+
     def get_observation(self) -> dict[str, Any]:
         if not self.is_connected:
             raise DeviceNotConnectedError(f"{self} is not connected.")
 
         # Read arm position
         start = time.perf_counter()
-        obs_dict = self.bus.sync_read("Present_Position")
+        obs_dict = self._read_present_position()
         obs_dict = {f"{motor}.pos": val for motor, val in obs_dict.items()}
-        dt_ms = (time.perf_counter() - start) * 1e3
-        logger.debug(f"{self} read state: {dt_ms:.1f}ms")
+        self.log_latency("read_state", start)
 
         # Capture images from cameras
         for cam_key, cam in self.cameras.items():
             start = time.perf_counter()
             obs_dict[cam_key] = cam.async_read()
-            dt_ms = (time.perf_counter() - start) * 1e3
-            logger.debug(f"{self} read {cam_key}: {dt_ms:.1f}ms")
+            self.log_latency(f"read_{cam_key}", start)
 
         return obs_dict
 
@@ -192,15 +207,20 @@ class SO100Follower(Robot):
 
         goal_pos = {key.removesuffix(".pos"): val for key, val in action.items() if key.endswith(".pos")}
 
-        # Cap goal position when too far away from present position.
-        # /!\ Slower fps expected due to reading from the follower.
+        # Cap goal position when too far away from present position (read by `get_observation` if recent).
+        # /!\ Slower fps expected when reading again from the follower.
         if self.config.max_relative_target is not None:
-            present_pos = self.bus.sync_read("Present_Position")
+            present_pos = self.present_pos_cache.get(list(goal_pos))
+            if present_pos is None:
+                present_pos = self._read_present_position(self.config.max_present_position_age_s)
             goal_present_pos = {key: (g_pos, present_pos[key]) for key, g_pos in goal_pos.items()}
             goal_pos = ensure_safe_goal_position(goal_present_pos, self.config.max_relative_target)
 
         # Send goal position to the arm
-        self.bus.sync_write("Goal_Position", goal_pos)
+        if self.config.use_motor_io_thread:
+            self.bus.async_write_goal(goal_pos)
+        else:
+            self.bus.sync_write("Goal_Position", goal_pos)
         return {f"{motor}.pos": val for motor, val in goal_pos.items()}
 
     def disconnect(self):
@@ -208,6 +228,7 @@ class SO100Follower(Robot):
             raise DeviceNotConnectedError(f"{self} is not connected.")
 
         self.bus.disconnect(self.config.disable_torque_on_disconnect)
+        self.present_pos_cache.clear()
         for cam in self.cameras.values():
             cam.disconnect()
 
@@ -34,6 +34,17 @@ class SO101FollowerConfig(RobotConfig):
     # the number of motors in your follower arms.
     max_relative_target: int | None = None
 
+    # Maximum age (in seconds) of the present positions read by `get_observation` for them to be used to cap the
+    # goal positions with `max_relative_target` in `send_action`, instead of reading them again from the motors.
+    # Set to `None` to always read them again.
+    max_present_position_age_s: float | None = 0.1
+
+    # Read the motors and write their goal positions in a background thread (see `MotorsBus.start_io_thread`),
+    # so that `get_observation` and `send_action` don't wait on the serial port.
+    use_motor_io_thread: bool = False
+    # Maximum frequency of the reads of the motor I/O thread (as fast as possible if `None`).
+    motor_io_fps: float | None = None
+
     # cameras
     cameras: dict[str, CameraConfig] = field(default_factory=dict)
 
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import logging
+import time
 from pprint import pformat
 
 from lerobot.common.robots import RobotConfig
@@ -89,3 +90,34 @@ def ensure_safe_goal_position(
         )
 
     return safe_goal_positions
+
+
+class PresentPositionCache:
+    """
+    Last present positions read from the motors (e.g. by `get_observation`), so that `send_action` can cap the
+    goal positions with `ensure_safe_goal_position` without reading them again from the bus. They are only
+    used if they are at most `max_age_s` old, `None` disabling the cache.
+    """
+
+    def __init__(self, max_age_s: float | None = None):
+        self.max_age_s = max_age_s
+        self.clear()
+
+    def clear(self) -> None:
+        self.positions: dict[str, float] | None = None
+        self.timestamp: float | None = None
+
+    def update(self, positions: dict[str, float], timestamp: float | None = None) -> None:
+        """Caches `positions`, read at `timestamp` (a `time.perf_counter()` value, now if `None`)."""
+        self.positions = dict(positions)
+        self.timestamp = time.perf_counter() if timestamp is None else timestamp
+
+    def get(self, motors: list[str] | None = None) -> dict[str, float] | None:
+        """Returns the cached positions of `motors` (all if `None`), or `None` if they are missing or too old."""
+        if self.max_age_s is None or self.positions is None:
+            return None
+        if time.perf_counter() - self.timestamp > self.max_age_s:
+            return None
+        if motors is not None and not set(motors).issubset(self.positions):
+            return None
+        return self.positions
@@ -38,6 +38,11 @@ class ViperXConfig(RobotConfig):
     # then to gradually add more motors (by uncommenting), until you can teleoperate both arms fully
     max_relative_target: int | None = 5
 
+    # Maximum age (in seconds) of the present positions read by `get_observation` for them to be used to cap the
+    # goal positions with `max_relative_target` in `send_action`, instead of reading them again from the motors.
+    # Set to `None` to always read them again.
+    max_present_position_age_s: float | None = 0.1
+
     # cameras
     cameras: dict[str, CameraConfig] = field(default_factory=dict)
     # Troubleshooting: If one of your IntelRealSense cameras freeze during
@@ -27,7 +27,7 @@ from lerobot.common.motors.dynamixel import (
 )
 
 from ..robot import Robot
-from ..utils import ensure_safe_goal_position
+from ..utils import PresentPositionCache, ensure_safe_goal_position
 from .config_viperx import ViperXConfig
 
 logger = logging.getLogger(__name__)
@@ -63,6 +63,7 @@ class ViperX(Robot):
             },
         )
         self.cameras = make_cameras_from_configs(config.cameras)
+        self.present_pos_cache = PresentPositionCache(config.max_present_position_age_s)
 
     @property
     def _motors_ft(self) -> dict[str, type]:
@@ -179,17 +180,17 @@ class ViperX(Robot):
 
         # Read arm position
         start = time.perf_counter()
-        obs_dict[OBS_STATE] = self.bus.sync_read("Present_Position")
+        present_pos = self.bus.sync_read("Present_Position")
+        self.present_pos_cache.update(present_pos)
+        obs_dict[OBS_STATE] = present_pos
         obs_dict = {f"{motor}.pos": val for motor, val in obs_dict.items()}
-        dt_ms = (time.perf_counter() - start) * 1e3
-        logger.debug(f"{self} read state: {dt_ms:.1f}ms")
+        self.log_latency("read_state", start)
 
         # Capture images from cameras
         for cam_key, cam in self.cameras.items():
             start = time.perf_counter()
             obs_dict[cam_key] = cam.async_read()
-            dt_ms = (time.perf_counter() - start) * 1e3
-            logger.debug(f"{self} read {cam_key}: {dt_ms:.1f}ms")
+            self.log_latency(f"read_{cam_key}", start)
 
         return obs_dict
 
@@ -211,10 +212,12 @@ class ViperX(Robot):
 
         goal_pos = {key.removesuffix(".pos"): val for key, val in action.items() if key.endswith(".pos")}
 
-        # Cap goal position when too far away from present position.
-        # /!\ Slower fps expected due to reading from the follower.
+        # Cap goal position when too far away from present position (read by `get_observation` if recent).
+        # /!\ Slower fps expected when reading again from the follower.
         if self.config.max_relative_target is not None:
-            present_pos = self.bus.sync_read("Present_Position")
+            present_pos = self.present_pos_cache.get(list(goal_pos))
+            if present_pos is None:
+                present_pos = self.bus.sync_read("Present_Position")
             goal_present_pos = {key: (g_pos, present_pos[key]) for key, g_pos in goal_pos.items()}
             goal_pos = ensure_safe_goal_position(goal_present_pos, self.config.max_relative_target)
 
@@ -227,6 +230,7 @@ class ViperX(Robot):
             raise DeviceNotConnectedError(f"{self} is not connected.")
 
         self.bus.disconnect(self.config.disable_torque_on_disconnect)
+        self.present_pos_cache.clear()
         for cam in self.cameras.values():
             cam.disconnect()
 
@@ -53,26 +53,10 @@ def log_control_info(robot: Robot, dt_s, episode_index=None, frame_index=None, f
     # total step time displayed in milliseconds and its frequency
     log_dt("dt", dt_s)
 
-    # TODO(aliberts): move robot-specific logs logic in robot.print_logs()
-    if not robot.robot_type.startswith("stretch"):
-        for name in robot.leader_arms:
-            key = f"read_leader_{name}_pos_dt_s"
-            if key in robot.logs:
-                log_dt("dtRlead", robot.logs[key])
-
-        for name in robot.follower_arms:
-            key = f"write_follower_{name}_goal_pos_dt_s"
-            if key in robot.logs:
-                log_dt("dtWfoll", robot.logs[key])
-
-            key = f"read_follower_{name}_pos_dt_s"
-            if key in robot.logs:
-                log_dt("dtRfoll", robot.logs[key])
-
-        for name in robot.cameras:
-            key = f"read_camera_{name}_dt_s"
-            if key in robot.logs:
-                log_dt(f"dtR{name}", robot.logs[key])
+    # durations of the last occurrence of each stage recorded by the robot (and the control loop)
+    if robot.latency_tracker is not None:
+        for stage, stage_dt_s in robot.latency_tracker.last.items():
+            log_dt(f"dt_{stage}", stage_dt_s)
 
     info_str = " ".join(log_items)
     logging.info(info_str)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import csv
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+# Upper edges (in milliseconds) of the buckets of the latency histograms. The last bucket holds the durations
+# above the last edge.
+DEFAULT_HISTOGRAM_EDGES_MS = [1, 2, 5, 10, 15, 20, 25, 33, 40, 50, 67, 100, 200, 500]
+
+LOOP_STAGE = "loop"
+
+
+class LatencyTracker:
+    """
+    Collects the durations of the stages of a control loop running at `fps`, to find the ones which prevent
+    it from keeping up. Recording a duration only appends it to a list, so it can be done at every iteration.
+
+    Usage pattern:
+
+    ```python
+    tracker = LatencyTracker(fps=30)
+    while recording:
+        start_loop_t = time.perf_counter()
+        with tracker.measure("observation"):
+            observation = robot.get_observation()
+        ...
+        tracker.end_loop(time.perf_counter() - start_loop_t)
+        busy_wait(1 / fps - (time.perf_counter() - start_loop_t))
+
+    logging.info(tracker)
+    tracker.save(report_dir / "episode_000000")  # episode_000000.json and episode_000000.csv
+    tracker.reset()
+    ```
+
+    A loop misses its deadline when its duration (without the wait) is longer than the period `1 / fps`.
+    """
+
+    def __init__(self, fps: float | None = None, histogram_edges_ms: list[float] | None = None):
+        self.fps = fps
+        self.histogram_edges_ms = (
+            DEFAULT_HISTOGRAM_EDGES_MS if histogram_edges_ms is None else list(histogram_edges_ms)
+        )
+        self.reset()
+
+    @property
+    def period_s(self) -> float | None:
+        return None if self.fps is None else 1 / self.fps
+
+    def reset(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        # Duration of the last occurrence of each stage
+        self.last: dict[str, float] = {}
+        self.num_loops = 0
+        self.deadline_misses = 0
+
+    def record(self, stage: str, dt_s: float) -> None:
+        self.samples[stage].append(dt_s)
+        self.last[stage] = dt_s
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def end_loop(self, dt_s: float) -> None:
+        """Records the duration of a whole iteration of the loop, before waiting for the next one."""
+        self.record(LOOP_STAGE, dt_s)
+        self.num_loops += 1
+        if self.period_s is not None and dt_s > self.period_s:
+            self.deadline_misses += 1
+
+    def stage_summary(self, stage: str) -> dict:
+        samples_ms = np.asarray(self.samples[stage]) * 1e3
+        edges = np.asarray(self.histogram_edges_ms)
+        counts = np.bincount(np.searchsorted(edges, samples_ms), minlength=len(edges) + 1)
+        summary = {
+            "count": len(samples_ms),
+            "mean_ms": float(samples_ms.mean()),
+            "p50_ms": float(np.percentile(samples_ms, 50)),
+            "p90_ms": float(np.percentile(samples_ms, 90)),
+            "p99_ms": float(np.percentile(samples_ms, 99)),
+            "max_ms": float(samples_ms.max()),
+            "total_s": float(samples_ms.sum() / 1e3),
+            # Number of occurrences longer than the period of the loop
+            "over_period": None if self.period_s is None else int((samples_ms > self.period_s * 1e3).sum()),
+            "histogram": {"edges_ms": list(self.histogram_edges_ms), "counts": counts.tolist()},
+        }
+        return summary
+
+    def summary(self) -> dict:
+        return {
+            "fps": self.fps,
+            "num_loops": self.num_loops,
+            "deadline_misses": self.deadline_misses,
+            "deadline_miss_rate": self.deadline_misses / self.num_loops if self.num_loops > 0 else 0.0,
+            "stages": {stage: self.stage_summary(stage) for stage in self.samples if self.samples[stage]},
+        }
+
+    def save(self, path: str | Path) -> None:
+        """Saves the summary as `path` with a .json suffix, and one row per stage as `path` with a .csv
+        suffix."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        summary = self.summary()
+        with open(path.with_suffix(".json"), "w") as f:
+            json.dump(summary, f, indent=4)
+
+        columns = [
+            "stage",
+            "count",
+            "mean_ms",
+            "p50_ms",
+            "p90_ms",
+            "p99_ms",
+            "max_ms",
+            "total_s",
+            "over_period",
+        ]
+        with open(path.with_suffix(".csv"), "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+            writer.writeheader()
+            for stage, stage_summary in summary["stages"].items():
+                writer.writerow({"stage": stage, **stage_summary})
+
+    def __str__(self) -> str:
+        items = [f"loops:{self.num_loops}"]
+        if self.fps is not None:
+            items.append(f"deadline_misses:{self.deadline_misses}")
+        # Median and maximum duration of each stage
+        for stage, samples in self.samples.items():
+            if samples:
+                samples_ms = np.asarray(samples) * 1e3
+                items.append(f"{stage}:{np.percentile(samples_ms, 50):.1f}/{samples_ms.max():.1f}ms")
+        return " ".join(items)
@@ -37,6 +37,15 @@ class DatasetConfig:
     revision: str | None = None
     use_imagenet_stats: bool = True
     video_backend: str = field(default_factory=get_safe_default_codec)
+    # Number of video decoders kept open by each dataloader worker. Set to 0 to reopen the video file of every
+    # sample (previous behavior).
+    video_decoder_pool_size: int = 16
+    # Serve the numeric features (states, actions...) from memory-mapped .npy files cached under the dataset root.
+    use_columnar_cache: bool = False
+    # Read video frames from the cache built with `lerobot/scripts/build_frame_cache.py` when available.
+    use_frame_cache: bool = False
+    # Load video frames as uint8 and convert them to float on device, in the policy's normalization.
+    return_uint8_frames: bool = False
 
 
 @dataclass
@@ -52,6 +52,9 @@ class TrainPipelineConfig(HubMixin):
     # Number of workers for the dataloader.
     num_workers: int = 4
     batch_size: int = 8
+    # Set to true to draw each batch from as few episodes as possible so that video frames can be decoded once
+    # per video file and per batch (see `EpisodeGroupedBatchSampler`). Batches are less diverse.
+    group_batches_by_episode: bool = False
     steps: int = 100_000
     eval_freq: int = 20_000
     log_freq: int = 200
@@ -71,6 +71,7 @@ from lerobot.common.utils.control_utils import (
     sanity_check_dataset_name,
     sanity_check_dataset_robot_compatibility,
 )
+from lerobot.common.utils.latency_utils import LatencyTracker
 from lerobot.common.utils.robot_utils import busy_wait
 from lerobot.common.utils.utils import (
     get_safe_torch_device,
@@ -117,6 +118,12 @@ class DatasetRecordConfig:
     # Too many threads might cause unstable teleoperation fps due to main thread being blocked.
     # Not enough threads might cause low camera fps.
     num_image_writer_threads_per_camera: int = 4
+    # Encode the videos while recording, in one process per camera, instead of writing the frames as png and
+    # encoding them at the end of each episode. Saving an episode then only waits for the encoders to flush.
+    streaming_encoding: bool = False
+    # Number of recorded episodes that can wait to be saved (parquet, stats, videos, metadata) in a background
+    # thread while the next one is recorded. Set to 0 to save each episode before recording the next one.
+    max_pending_episodes: int = 0
 
     def __post_init__(self):
         if self.single_task is None:
@@ -137,6 +144,10 @@ class RecordConfig:
     play_sounds: bool = True
     # Resume recording on an existing dataset.
     resume: bool = False
+    # Directory where a latency report of the control loop (durations of each stage such as the reads of the
+    # motors and cameras or the policy inference, and loops slower than the fps) is saved for each recorded
+    # episode, as `episode_{index:06d}.json` and `.csv`.
+    latency_report_dir: Path | None = None
 
     def __post_init__(self):
 
@@ -149,7 +160,6 @@ class RecordConfig:
         if bool(self.teleop) == bool(self.policy):
             raise ValueError("Choose either a policy or a teleoperator to control the robot")
 
-
     @classmethod
     def __get_path_fields__(cls) -> list[str]:
         """This enables the parser to load config from the policy using `--policy.path=local/dir`"""
@@ -167,6 +177,7 @@ def record_loop(
     control_time_s: int | None = None,
     single_task: str | None = None,
     display_data: bool = False,
+    latency_tracker: LatencyTracker | None = None,
 ):
     if dataset is not None and dataset.fps != fps:
         raise ValueError(f"The dataset fps should be equal to requested fps ({dataset.fps} != {fps}).")
@@ -175,49 +186,62 @@ def record_loop(
     if policy is not None:
         policy.reset()
 
+    # The durations of the stages of the loop are always collected, but only reported when a tracker is given
+    if latency_tracker is None:
+        latency_tracker = LatencyTracker(fps)
+    robot.latency_tracker = latency_tracker
+
     timestamp = 0
     start_episode_t = time.perf_counter()
     while timestamp < control_time_s:
         start_loop_t = time.perf_counter()
 
-        observation = robot.get_observation()
+        with latency_tracker.measure("observation"):
+            observation = robot.get_observation()
 
         if policy is not None or dataset is not None:
-            observation_frame = build_dataset_frame(dataset.features, observation, prefix="observation")
+            with latency_tracker.measure("build_frame"):
+                observation_frame = build_dataset_frame(dataset.features, observation, prefix="observation")
 
         if policy is not None:
-            action_values = predict_action(
-                observation_frame,
-                policy,
-                get_safe_torch_device(policy.config.device),
-                policy.config.use_amp,
-                task=single_task,
-                robot_type=robot.robot_type,
-            )
+            with latency_tracker.measure("policy"):
+                action_values = predict_action(
+                    observation_frame,
+                    policy,
+                    get_safe_torch_device(policy.config.device),
+                    policy.config.use_amp,
+                    task=single_task,
+                    robot_type=robot.robot_type,
+                )
             action = {key: action_values[i].item() for i, key in enumerate(robot.action_features)}
         else:
-            action = teleop.get_action()
+            with latency_tracker.measure("teleop"):
+                action = teleop.get_action()
 
         # Action can eventually be clipped using `max_relative_target`,
         # so action actually sent is saved in the dataset.
-        sent_action = robot.send_action(action)
+        with latency_tracker.measure("send_action"):
+            sent_action = robot.send_action(action)
 
         if dataset is not None:
-            action_frame = build_dataset_frame(dataset.features, sent_action, prefix="action")
-            frame = {**observation_frame, **action_frame}
-            dataset.add_frame(frame, task=single_task)
+            with latency_tracker.measure("add_frame"):
+                action_frame = build_dataset_frame(dataset.features, sent_action, prefix="action")
+                frame = {**observation_frame, **action_frame}
+                dataset.add_frame(frame, task=single_task)
 
         if display_data:
-            for obs, val in observation.items():
-                if isinstance(val, float):
-                    rr.log(f"observation.{obs}", rr.Scalar(val))
-                elif isinstance(val, np.ndarray):
-                    rr.log(f"observation.{obs}", rr.Image(val), static=True)
-            for act, val in action.items():
-                if isinstance(val, float):
-                    rr.log(f"action.{act}", rr.Scalar(val))
+            with latency_tracker.measure("display"):
+                for obs, val in observation.items():
+                    if isinstance(val, float):
+                        rr.log(f"observation.{obs}", rr.Scalar(val))
+                    elif isinstance(val, np.ndarray):
+                        rr.log(f"observation.{obs}", rr.Image(val), static=True)
+                for act, val in action.items():
+                    if isinstance(val, float):
+                        rr.log(f"action.{act}", rr.Scalar(val))
 
         dt_s = time.perf_counter() - start_loop_t
+        latency_tracker.end_loop(dt_s)
         busy_wait(1 / fps - dt_s)
 
         timestamp = time.perf_counter() - start_episode_t
@@ -251,6 +275,8 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
                 num_processes=cfg.dataset.num_image_writer_processes,
                 num_threads=cfg.dataset.num_image_writer_threads_per_camera * len(robot.cameras),
             )
+        if cfg.dataset.streaming_encoding:
+            dataset.start_video_encoders()
         sanity_check_dataset_robot_compatibility(dataset, robot, cfg.dataset.fps, dataset_features)
     else:
         # Create empty dataset or load existing saved episodes
@@ -264,8 +290,12 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
             use_videos=cfg.dataset.video,
             image_writer_processes=cfg.dataset.num_image_writer_processes,
             image_writer_threads=cfg.dataset.num_image_writer_threads_per_camera * len(robot.cameras),
+            streaming_encoding=cfg.dataset.streaming_encoding,
         )
 
+    if cfg.dataset.max_pending_episodes > 0:
+        dataset.start_episode_finalizer(cfg.dataset.max_pending_episodes)
+
     # Load pretrained policy
     policy = None if cfg.policy is None else make_policy(cfg.policy, ds_meta=dataset.meta)
 
@@ -274,9 +304,13 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
         teleop.connect()
 
     listener, events = init_keyboard_listener()
+    latency_tracker = LatencyTracker(cfg.dataset.fps) if cfg.latency_report_dir is not None else None
 
     for recorded_episodes in range(cfg.dataset.num_episodes):
-        log_say(f"Recording episode {dataset.num_episodes}", cfg.play_sounds)
+        # Unlike `dataset.num_episodes`, the index of the episode buffer counts the episodes being finalized
+        episode_buffer = dataset.episode_buffer
+        episode_index = dataset.num_episodes if episode_buffer is None else episode_buffer["episode_index"]
+        log_say(f"Recording episode {episode_index}", cfg.play_sounds)
         record_loop(
             robot=robot,
             events=events,
@@ -287,6 +321,7 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
             control_time_s=cfg.dataset.episode_time_s,
             single_task=cfg.dataset.single_task,
             display_data=cfg.display_data,
+            latency_tracker=latency_tracker,
         )
 
         # Execute a few seconds without recording to give time to manually reset the environment
@@ -310,14 +345,24 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
             events["rerecord_episode"] = False
             events["exit_early"] = False
             dataset.clear_episode_buffer()
+            if latency_tracker is not None:
+                latency_tracker.reset()
             continue
 
+        if latency_tracker is not None:
+            episode_index = dataset.episode_buffer["episode_index"]
+            logging.info(f"Latency of episode {episode_index}: {latency_tracker}")
+            latency_tracker.save(cfg.latency_report_dir / f"episode_{episode_index:06d}")
+            latency_tracker.reset()
+
         dataset.save_episode()
 
         if events["stop_recording"]:
             break
 
     log_say("Stop recording", cfg.play_sounds, blocking=True)
+    dataset.stop_video_encoders()
+    dataset.stop_episode_finalizer()
 
     robot.disconnect()
     teleop.disconnect()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Decodes the videos of a dataset once and stores the frames as uint8 memory-mapped arrays under
+'{root}/cache/frames', so that training can read them instead of decoding them again at every epoch (see
+`lerobot/common/datasets/frame_cache.py`). Train with `--dataset.use_frame_cache=true` to use the cache.
+
+Episodes are cached in order until the size budget is reached. Episodes cached by a previous run are evicted,
+oldest first, to make room for the ones requested by the current run.
+
+Example:
+
+```bash
+python lerobot/scripts/build_frame_cache.py \
+    --repo_id=lerobot/svla_so100_stacking \
+    --resize="[512, 512]" \
+    --max_size_gb=20
+```
+"""
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import draccus
+import torch
+import tqdm
+
+from lerobot.common.datasets.frame_cache import FrameCache, get_info_signature, resize_to_fit
+from lerobot.common.datasets.lerobot_dataset import LeRobotDataset
+from lerobot.common.datasets.utils import INFO_PATH
+from lerobot.common.datasets.video_utils import decode_video_frames
+from lerobot.common.utils.utils import init_logging
+
+
+@dataclass
+class BuildFrameCacheConfig:
+    # Dataset identifier. By convention it should match '{hf_username}/{dataset_name}' (e.g. `lerobot/test`).
+    repo_id: str
+    # Root directory where the dataset is stored (e.g. 'dataset/path').
+    root: str | Path | None = None
+    # Episodes to cache. All of them by default.
+    episodes: list[int] | None = None
+    # Downscale the cached frames (keeping their aspect ratio) so that they fit in (height, width), e.g. the
+    # `resize_imgs_with_padding` of the policy you train. Frames are cached at full resolution by default.
+    resize: tuple[int, int] | None = None
+    # Size budget of the cache, in GB.
+    max_size_gb: float = 50.0
+    # Number of frames decoded at once.
+    batch_size: int = 64
+    video_backend: str | None = None
+
+
+def build_frame_cache(
+    dataset: LeRobotDataset,
+    resize: tuple[int, int] | None = None,
+    max_bytes: int | None = None,
+    batch_size: int = 64,
+) -> FrameCache:
+    cache = FrameCache(dataset.frame_cache_dir, get_info_signature(dataset.root / INFO_PATH), max_bytes)
+    cache.set_resize(resize)
+
+    timestamps = torch.stack(dataset.hf_dataset["timestamp"]).numpy()
+    episode_indices = torch.stack(dataset.hf_dataset["episode_index"]).numpy()
+    episodes = dataset.episodes if dataset.episodes is not None else range(dataset.meta.total_episodes)
+    cached_episodes = set()
+    for ep_idx in tqdm.tqdm(episodes, desc="Caching episodes"):
+        ep_timestamps = timestamps[episode_indices == ep_idx].tolist()
+        for vid_key in dataset.meta.video_keys:
+            video_path = dataset.root / dataset.meta.get_video_file_path(ep_idx, vid_key)
+            if cache.contains(ep_idx, vid_key, video_path):
+                continue
+
+            chunks = []
+            for start in range(0, len(ep_timestamps), batch_size):
+                frames = decode_video_frames(
+                    video_path,
+                    ep_timestamps[start : start + batch_size],
+                    dataset.tolerance_s,
+                    dataset.video_backend,
+                    dataset.video_decoder_pool,
+                    return_uint8=True,
+                )
+                chunks.append(resize_to_fit(frames, resize) if resize is not None else frames)
+
+            frames = torch.cat(chunks).numpy()
+            if not cache.put(ep_idx, vid_key, video_path, ep_timestamps, frames, cached_episodes):
+                logging.info(f"Size budget reached, episodes from {ep_idx} onwards are not cached.")
+                return cache
+
+        cached_episodes.add(ep_idx)
+
+    return cache
+
+
+@draccus.wrap()
+def main(cfg: BuildFrameCacheConfig):
+    init_logging()
+    dataset = LeRobotDataset(
+        cfg.repo_id, root=cfg.root, episodes=cfg.episodes, video_backend=cfg.video_backend
+    )
+    cache = build_frame_cache(dataset, cfg.resize, int(cfg.max_size_gb * 1e9), cfg.batch_size)
+    logging.info(f"{len(cache.entries)} videos cached in {cache.cache_dir} ({cache.nbytes / 1e9:.2f} GB).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Quantizes the weights of a pretrained policy (see `lerobot.common.policies.quantization`) and compares the
+action chunks it predicts to the ones of the original policy on a held-out episode of a dataset. Both policies
+get the same observations and the same noise, so that the differences only come from the quantization. The
+errors of both policies with respect to the actions of the dataset are reported as well.
+
+The quantized policy can be saved with `--output_dir`, and then loaded with `from_pretrained` like any policy.
+
+Example:
+
+```shell
+python lerobot/scripts/check_quantized_policy.py \
+    --policy.path=lerobot/smolvla_base \
+    --repo_id=lerobot/svla_so100_stacking \
+    --episode=55 \
+    --output_dir=outputs/smolvla_int8
+```
+"""
+
+import copy
+import logging
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from pprint import pformat
+
+import torch
+from torch import nn
+
+from lerobot.common.datasets.lerobot_dataset import LeRobotDataset
+from lerobot.common.policies.factory import make_policy
+from lerobot.common.policies.pretrained import PreTrainedPolicy
+from lerobot.common.utils.utils import get_safe_torch_device, init_logging
+from lerobot.configs import parser
+from lerobot.configs.policies import PreTrainedConfig
+
+
+@dataclass
+class CheckQuantizedPolicyConfig:
+    # Dataset identifier. By convention it should match '{hf_username}/{dataset_name}' (e.g. `lerobot/test`).
+    repo_id: str
+    # Root directory where the dataset is stored (e.g. 'dataset/path').
+    root: str | Path | None = None
+    # Index of the held-out episode on which the actions are compared.
+    episode: int = 0
+    # Maximum number of frames of the episode compared (all of them if None).
+    max_frames: int | None = None
+    # Quantization method, see `lerobot.common.policies.quantization.QUANTIZATION_METHODS`.
+    method: str = "int8"
+    # Directory where the quantized policy is saved, if any.
+    output_dir: Path | None = None
+    seed: int = 1000
+    # Pretrained policy, loaded with `--policy.path=local/dir` or `--policy.path=user/repo_id`.
+    policy: PreTrainedConfig | None = None
+
+    def __post_init__(self):
+        # HACK: We parse again the cli args here to get the pretrained path if there was one.
+        policy_path = parser.get_path_arg("policy")
+        if policy_path:
+            cli_overrides = parser.get_cli_overrides("policy")
+            self.policy = PreTrainedConfig.from_pretrained(policy_path, cli_overrides=cli_overrides)
+            self.policy.pretrained_path = policy_path
+        if self.policy is None:
+            raise ValueError("A pretrained policy needs to be provided with `--policy.path`.")
+
+    @classmethod
+    def __get_path_fields__(cls) -> list[str]:
+        """This enables the parser to load config from the policy using `--policy.path=local/dir`"""
+        return ["policy"]
+
+
+def get_model_size(module: nn.Module) -> int:
+    """Size in bytes of the parameters and buffers of `module`."""
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+@torch.no_grad()
+def compare_action_chunks(
+    reference_policy: PreTrainedPolicy,
+    policy: PreTrainedPolicy,
+    dataset: LeRobotDataset,
+    device: torch.device,
+    max_frames: int | None = None,
+    seed: int = 1000,
+) -> dict[str, float]:
+    """Compares the action chunks predicted by `policy` and `reference_policy` (which must both implement
+    `predict_action_chunk`) on the frames of `dataset`, with the same noise."""
+    generator = torch.Generator().manual_seed(seed)
+    config = reference_policy.config
+    num_frames = len(dataset) if max_frames is None else min(max_frames, len(dataset))
+
+    abs_errors, max_abs_error = [], 0.0
+    reference_errors, policy_errors = [], []
+    for idx in range(num_frames):
+        item = dataset[idx]
+        noise = torch.randn(1, config.chunk_size, config.max_action_dim, generator=generator).to(device)
+        chunks = []
+        for p in [reference_policy, policy]:
+            batch = {
+                key: value[None].to(device) if isinstance(value, torch.Tensor) else [value]
+                for key, value in item.items()
+            }
+            chunks.append(p.predict_action_chunk(batch, noise=noise.clone()).float().cpu())
+        reference_chunk, chunk = chunks
+
+        abs_error = (chunk - reference_chunk).abs()
+        abs_errors.append(abs_error.mean().item())
+        max_abs_error = max(max_abs_error, abs_error.max().item())
+        # The first action of each chunk is the one predicted for the current frame
+        action = item["action"].float()
+        reference_errors.append((reference_chunk[0, 0] - action).abs().mean().item())
+        policy_errors.append((chunk[0, 0] - action).abs().mean().item())
+
+    return {
+        "num_frames": num_frames,
+        "action_chunk_mae": sum(abs_errors) / num_frames,
+        "action_chunk_max_abs_error": max_abs_error,
+        "reference_dataset_action_mae": sum(reference_errors) / num_frames,
+        "dataset_action_mae": sum(policy_errors) / num_frames,
+    }
+
+
+@parser.wrap()
+def check_quantized_policy(cfg: CheckQuantizedPolicyConfig):
+    logging.info(pformat(asdict(cfg)))
+    device = get_safe_torch_device(cfg.policy.device, log=True)
+
+    dataset = LeRobotDataset(cfg.repo_id, root=cfg.root, episodes=[cfg.episode])
+    reference_policy = make_policy(cfg.policy, ds_meta=dataset.meta)
+
+    quantized_cfg = copy.deepcopy(cfg.policy)
+    quantized_cfg.weight_quantization = cfg.method
+    # The weights of the original checkpoint are quantized as they are loaded
+    policy = make_policy(quantized_cfg, ds_meta=dataset.meta)
+
+    metrics = compare_action_chunks(reference_policy, policy, dataset, device, cfg.max_frames, cfg.seed)
+    metrics["reference_size_mb"] = get_model_size(reference_policy) / 2**20
+    metrics["size_mb"] = get_model_size(policy) / 2**20
+    logging.info(pformat(metrics))
+
+    if cfg.output_dir is not None:
+        policy.save_pretrained(cfg.output_dir)
+        logging.info(f"Quantized policy saved to {cfg.output_dir}")
+
+
+if __name__ == "__main__":
+    init_logging()
+    check_quantized_policy()
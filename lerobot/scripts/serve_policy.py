@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Loads a policy once and serves its action chunks to several robots, batching the observations they send
+within a small time window (see `lerobot.common.policies.inference_server`).
+
+Example:
+
+```shell
+python lerobot/scripts/serve_policy.py \
+    --policy.path=lerobot/smolvla_base \
+    --address=tcp://*:5555 \
+    --max_batch_size=8
+```
+
+Robots then get their action chunks with an `InferenceClient("tcp://<server_ip>:5555")`. To check the server
+without robots, `--num_loopback_clients=4` runs as many stand-in clients on the same machine, which send random
+observations and report their latency before the server exits.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pprint import pformat
+
+import numpy as np
+
+from lerobot.common.policies.factory import get_policy_class
+from lerobot.common.policies.inference_server import BatchedInferenceServer, run_loopback_client
+from lerobot.common.utils.utils import init_logging
+from lerobot.configs import parser
+from lerobot.configs.policies import PreTrainedConfig
+
+
+@dataclass
+class ServePolicyConfig:
+    # Pretrained policy to serve, loaded with `--policy.path=local/dir` or `--policy.path=user/repo_id`.
+    policy: PreTrainedConfig | None = None
+    # Address the server listens to.
+    address: str = "tcp://*:5555"
+    # Maximum number of observations in a batch.
+    max_batch_size: int = 8
+    # Time to wait for other requests after the first one of a batch.
+    batch_timeout_s: float = 0.005
+    # Number of stand-in clients sending random observations through the loopback interface (0 to serve real
+    # robots until interrupted).
+    num_loopback_clients: int = 0
+    # Number of requests sent by each stand-in client.
+    num_loopback_requests: int = 50
+    # Task sent by the stand-in clients.
+    loopback_task: str = "Pick up the cube."
+
+    def __post_init__(self):
+        # HACK: We parse again the cli args here to get the pretrained path if there was one.
+        policy_path = parser.get_path_arg("policy")
+        if policy_path:
+            cli_overrides = parser.get_cli_overrides("policy")
+            self.policy = PreTrainedConfig.from_pretrained(policy_path, cli_overrides=cli_overrides)
+            self.policy.pretrained_path = policy_path
+        if self.policy is None:
+            raise ValueError("A pretrained policy needs to be provided with `--policy.path`.")
+
+    @classmethod
+    def __get_path_fields__(cls) -> list[str]:
+        """This enables the parser to load config from the policy using `--policy.path=local/dir`"""
+        return ["policy"]
+
+
+@parser.wrap()
+def serve_policy(cfg: ServePolicyConfig):
+    logging.info(pformat(asdict(cfg)))
+
+    policy_cls = get_policy_class(cfg.policy.type)
+    policy = policy_cls.from_pretrained(cfg.policy.pretrained_path, config=cfg.policy)
+    policy.to(cfg.policy.device)
+    policy.eval()
+
+    server = BatchedInferenceServer(
+        policy, cfg.address, cfg.max_batch_size, cfg.batch_timeout_s, use_amp=cfg.policy.use_amp
+    )
+    logging.info(f"Serving {cfg.policy.type} on {cfg.address}")
+    try:
+        if cfg.num_loopback_clients == 0:
+            server.serve_forever()
+            return
+
+        stop_event = threading.Event()
+        server_thread = threading.Thread(target=server.serve_forever, args=(stop_event,), daemon=True)
+        server_thread.start()
+        client_address = cfg.address.replace("*", "127.0.0.1")
+        with ThreadPoolExecutor(max_workers=cfg.num_loopback_clients) as executor:
+            futures = [
+                executor.submit(
+                    run_loopback_client,
+                    client_address,
+                    cfg.policy.input_features,
+                    cfg.num_loopback_requests,
+                    cfg.loopback_task,
+                )
+                for _ in range(cfg.num_loopback_clients)
+            ]
+            latencies = np.concatenate([future.result() for future in futures])
+        stop_event.set()
+        server_thread.join()
+
+        logging.info(
+            f"{len(latencies)} requests, latency p50={np.percentile(latencies, 50) * 1e3:.1f}ms "
+            f"p95={np.percentile(latencies, 95) * 1e3:.1f}ms, "
+            f"mean batch size {np.mean(server.batch_sizes):.2f}"
+        )
+    except KeyboardInterrupt:
+        logging.info("Keyboard interrupt received, stopping the server.")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    init_logging()
+    serve_policy()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Checks that the data and video files of every episode of a local dataset are present and match the sizes and
+checksums recorded in 'meta/manifest.jsonl' when the episode was saved. For datasets without a manifest (e.g.
+recorded before it was introduced), only the presence of the files is checked.
+
+Manifest entries of episodes that are not in 'meta/episodes.jsonl' (e.g. when recording was interrupted before
+the episode was added to the metadata) are ignored.
+
+Example:
+
+```bash
+python lerobot/scripts/verify_dataset.py \
+    --repo_id=lerobot/svla_so100_stacking \
+    --num_workers=16
+```
+"""
+
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import draccus
+
+from lerobot.common.datasets.lerobot_dataset import LeRobotDatasetMetadata
+from lerobot.common.datasets.utils import get_file_checksum, load_manifest
+from lerobot.common.utils.utils import init_logging
+
+
+@dataclass
+class VerifyDatasetConfig:
+    # Dataset identifier. By convention it should match '{hf_username}/{dataset_name}' (e.g. `lerobot/test`).
+    repo_id: str
+    # Root directory where the dataset is stored (e.g. 'dataset/path').
+    root: str | Path | None = None
+    # Number of files checked in parallel.
+    num_workers: int = 8
+    # Compare the checksums of the files, and not only their sizes.
+    checksum: bool = True
+
+
+def verify_file(root: Path, fpath: Path, entry: dict | None, checksum: bool) -> str | None:
+    """Returns a description of the problem with `fpath`, or None if it matches its manifest `entry`."""
+    full_path = root / fpath
+    if not full_path.is_file():
+        return f"{fpath}: missing"
+    if entry is None:
+        return None
+    if full_path.stat().st_size != entry["size"]:
+        return f"{fpath}: size is {full_path.stat().st_size} instead of {entry['size']}"
+    if checksum and get_file_checksum(full_path) != entry["sha256"]:
+        return f"{fpath}: checksum mismatch"
+    return None
+
+
+def verify_dataset(meta: LeRobotDatasetMetadata, num_workers: int = 8, checksum: bool = True) -> list[str]:
+    """Returns the problems found in the dataset, an empty list if there are none."""
+    errors = []
+    if meta.total_episodes != len(meta.episodes):
+        errors.append(
+            f"info.json has {meta.total_episodes} episodes but episodes.jsonl has {len(meta.episodes)}"
+        )
+    num_frames = sum(ep["length"] for ep in meta.episodes.values())
+    if meta.total_frames != num_frames:
+        errors.append(f"info.json has {meta.total_frames} frames but the episodes have {num_frames}")
+
+    manifest = load_manifest(meta.root)
+    files = []
+    for ep_idx in meta.episodes:
+        ep_files = manifest.get(ep_idx, {})
+        for fpath in meta.get_episode_file_paths(ep_idx):
+            entry = ep_files.get(str(fpath))
+            if manifest and entry is None:
+                errors.append(f"{fpath}: not in the manifest")
+            files.append((fpath, entry))
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        results = executor.map(lambda file: verify_file(meta.root, *file, checksum), files)
+        errors += [error for error in results if error is not None]
+
+    return errors
+
+
+@draccus.wrap()
+def main(cfg: VerifyDatasetConfig):
+    init_logging()
+    meta = LeRobotDatasetMetadata(cfg.repo_id, root=cfg.root)
+    errors = verify_dataset(meta, cfg.num_workers, cfg.checksum)
+    for error in errors:
+        logging.error(error)
+    if errors:
+        sys.exit(1)
+    logging.info(f"{meta.total_episodes} episodes checked, no problem found.")
+
+
+if __name__ == "__main__":
+    main()
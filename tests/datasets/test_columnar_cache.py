@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pickle
+
+import torch
+from datasets import Dataset
+
+from lerobot.common.datasets.columnar_cache import ColumnarCache
+from lerobot.common.datasets.utils import hf_transform_to_torch
+from tests.fixtures.constants import DUMMY_CHW
+
+
+def make_hf_dataset(num_frames: int = 5) -> Dataset:
+    hf_dataset = Dataset.from_dict(
+        {
+            "state": [[float(i), float(-i)] for i in range(num_frames)],
+            "index": list(range(num_frames)),
+        }
+    )
+    hf_dataset.set_transform(hf_transform_to_torch)
+    return hf_dataset
+
+
+def test_build_and_get(tmp_path):
+    hf_dataset = make_hf_dataset()
+    cache = ColumnarCache.load_or_build(hf_dataset, ["state", "index"], tmp_path, signature="v1")
+    assert len(cache) == 5
+    assert "state" in cache
+    assert torch.equal(cache.get("state", [3, 1]), torch.stack(hf_dataset[[3, 1]]["state"]))
+    assert cache.get("index", 2).item() == 2
+
+
+def test_reused_or_rebuilt(tmp_path):
+    ColumnarCache.load_or_build(make_hf_dataset(), ["state"], tmp_path, signature="v1")
+    mtime = (tmp_path / "state.npy").stat().st_mtime_ns
+
+    ColumnarCache.load_or_build(make_hf_dataset(), ["state"], tmp_path, signature="v1")
+    assert (tmp_path / "state.npy").stat().st_mtime_ns == mtime
+
+    cache = ColumnarCache.load_or_build(make_hf_dataset(7), ["state"], tmp_path, signature="v2")
+    assert len(cache) == 7
+
+
+def test_pickle_reopens_files(tmp_path):
+    cache = ColumnarCache.load_or_build(make_hf_dataset(), ["state"], tmp_path, signature="v1")
+    unpickled = pickle.loads(pickle.dumps(cache))
+    assert torch.equal(unpickled.get("state", [0, 4]), cache.get("state", [0, 4]))
+
+
+def test_dataset_with_columnar_cache(tmp_path, lerobot_dataset_factory, monkeypatch):
+    monkeypatch.setattr(
+        "lerobot.common.datasets.lerobot_dataset.decode_video_frames",
+        lambda video_path, timestamps, *args, **kwargs: torch.zeros(len(timestamps), *DUMMY_CHW),
+    )
+    delta_timestamps = {"action": [0, 1 / 30, 2 / 30], "laptop": [-1 / 30, 0]}
+    dataset = lerobot_dataset_factory(
+        root=tmp_path / "test", delta_timestamps=delta_timestamps, use_columnar_cache=True
+    )
+    assert dataset.columnar_cache is not None
+    assert "action" in dataset.columnar_cache
+
+    indices = [0, 49, 50, 149]
+    items = dataset.__getitems__(indices)
+    dataset.columnar_cache = None
+    expected_items = dataset.__getitems__(indices)
+    for item, expected_item in zip(items, expected_items, strict=True):
+        assert item.keys() == expected_item.keys()
+        for key, val in expected_item.items():
+            if isinstance(val, torch.Tensor):
+                assert item[key].dtype == val.dtype, key
+                assert torch.equal(item[key], val), key
+            else:
+                assert item[key] == val, key
+
+
+def test_columnar_cache_rebuilt_lazily_after_save(tmp_path, empty_lerobot_dataset_factory, monkeypatch):
+    features = {"state": {"dtype": "float32", "shape": (2,), "names": None}}
+    dataset = empty_lerobot_dataset_factory(root=tmp_path / "test", features=features)
+    dataset.use_columnar_cache = True
+
+    num_builds = 0
+    load_or_build = ColumnarCache.load_or_build
+
+    def count_builds(*args, **kwargs):
+        nonlocal num_builds
+        num_builds += 1
+        return load_or_build(*args, **kwargs)
+
+    monkeypatch.setattr(ColumnarCache, "load_or_build", count_builds)
+    for _ in range(3):
+        for _ in range(4):
+            dataset.add_frame({"state": torch.randn(2)}, task="Dummy task")
+        dataset.save_episode()
+
+    assert num_builds == 0
+    assert len(dataset.columnar_cache) == 12
+    assert torch.equal(
+        dataset.columnar_cache.get("state", [0, 11]), torch.stack(dataset.hf_dataset[[0, 11]]["state"])
+    )
+    assert num_builds == 1
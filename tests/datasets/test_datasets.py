@@ -16,6 +16,7 @@
 import json
 import logging
 import re
+import threading
 from copy import deepcopy
 from itertools import chain
 from pathlib import Path
@@ -37,12 +38,14 @@ from lerobot.common.datasets.lerobot_dataset import (
 from lerobot.common.datasets.utils import (
     create_branch,
     flatten_dict,
+    load_manifest,
     unflatten_dict,
 )
 from lerobot.common.envs.factory import make_env_config
 from lerobot.common.policies.factory import make_policy_config
 from lerobot.configs.default import DatasetConfig
 from lerobot.configs.train import TrainPipelineConfig
+from lerobot.scripts.verify_dataset import verify_dataset
 from tests.fixtures.constants import DUMMY_CHW, DUMMY_HWC, DUMMY_REPO_ID
 from tests.utils import require_x86_64_kernel
 
@@ -99,6 +102,55 @@ def test_dataset_initialization(tmp_path, lerobot_dataset_factory):
     assert dataset.num_frames == len(dataset)
 
 
+def test_getitems_decodes_each_video_once(tmp_path, lerobot_dataset_factory, monkeypatch):
+    calls = []
+
+    def decode_video_frames(video_path, timestamps, tolerance_s, backend=None, decoder_pool=None, **kwargs):
+        calls.append((video_path, list(timestamps)))
+        return torch.tensor(timestamps).view(-1, 1, 1, 1).expand(-1, *DUMMY_CHW)
+
+    monkeypatch.setattr("lerobot.common.datasets.lerobot_dataset.decode_video_frames", decode_video_frames)
+    dataset = lerobot_dataset_factory(
+        root=tmp_path / "test", video_backend="torchcodec", delta_timestamps={"laptop": [-1 / 30, 0]}
+    )
+    indices = [3, 1, 2, 1]
+    expected = [dataset[idx] for idx in indices]
+
+    calls.clear()
+    items = dataset.__getitems__(indices)
+    assert len(calls) == len(dataset.meta.video_keys)
+    for _, timestamps in calls:
+        assert timestamps == sorted(set(timestamps))
+
+    assert len(items) == len(expected)
+    for item, expected_item in zip(items, expected, strict=True):
+        assert item.keys() == expected_item.keys()
+        for key, val in expected_item.items():
+            if isinstance(val, torch.Tensor):
+                assert torch.equal(item[key], val), key
+            else:
+                assert item[key] == val, key
+
+
+def test_delta_indices_padding(tmp_path, lerobot_dataset_factory, monkeypatch):
+    monkeypatch.setattr(
+        "lerobot.common.datasets.lerobot_dataset.decode_video_frames",
+        lambda video_path, timestamps, *args, **kwargs: torch.zeros(len(timestamps), *DUMMY_CHW),
+    )
+    dataset = lerobot_dataset_factory(
+        root=tmp_path / "test", delta_timestamps={"state": [-2 / 30, 0, 2 / 30]}
+    )
+    ep_start = dataset.episode_data_index["from"][1].item()
+    ep_end = dataset.episode_data_index["to"][1].item()
+    states = torch.stack(dataset.hf_dataset["state"])
+
+    first, last = dataset.__getitems__([ep_start, ep_end - 1])
+    assert first["state_is_pad"].tolist() == [True, False, False]
+    assert torch.equal(first["state"], states[[ep_start, ep_start, ep_start + 2]])
+    assert last["state_is_pad"].tolist() == [False, False, True]
+    assert torch.equal(last["state"], states[[ep_end - 3, ep_end - 1, ep_end - 1]])
+
+
 def test_add_frame_missing_feature(tmp_path, empty_lerobot_dataset_factory):
     features = {"state": {"dtype": "float32", "shape": (1,), "names": None}}
     dataset = empty_lerobot_dataset_factory(root=tmp_path / "test", features=features)
@@ -306,6 +358,118 @@ def test_add_frame_image_pil(image_dataset):
     assert dataset[0]["image"].shape == torch.Size(DUMMY_CHW)
 
 
+def test_save_episode_table(tmp_path, empty_lerobot_dataset_factory):
+    features = {
+        "state": {"dtype": "float32", "shape": (3,), "names": None},
+        "matrix": {"dtype": "float32", "shape": (2, 4), "names": None},
+        "count": {"dtype": "int64", "shape": (1,), "names": None},
+        "image": {"dtype": "image", "shape": DUMMY_CHW, "names": ["channels", "height", "width"]},
+    }
+    dataset = empty_lerobot_dataset_factory(root=tmp_path / "test", features=features)
+    for num_frames in [3, 2]:
+        for i in range(num_frames):
+            frame = {
+                "state": np.random.rand(3).astype(np.float32),
+                "matrix": np.random.rand(2, 4).astype(np.float32),
+                "count": np.array([i]),
+                "image": np.random.rand(*DUMMY_CHW),
+            }
+            dataset.add_frame(frame, task="Dummy task")
+        dataset.save_episode()
+    assert dataset.num_frames == 5
+
+    # Episodes read back from the parquet files match the ones appended in memory.
+    loaded = LeRobotDataset(DUMMY_REPO_ID, root=tmp_path / "test")
+    assert loaded.hf_dataset.features == dataset.hf_dataset.features
+    for idx in range(5):
+        item, loaded_item = dataset[idx], loaded[idx]
+        for key in features:
+            assert torch.equal(item[key], loaded_item[key]), key
+    assert loaded[4]["count"].item() == 1
+
+
+def test_save_episode_in_background(image_dataset):
+    dataset = image_dataset
+    dataset.start_episode_finalizer(max_pending_episodes=1)
+    for num_frames in [3, 2, 4]:
+        for _ in range(num_frames):
+            dataset.add_frame({"image": np.random.rand(*DUMMY_CHW)}, task="Dummy task")
+        dataset.save_episode()
+    dataset.stop_episode_finalizer()
+
+    assert dataset.meta.total_episodes == 3
+    assert dataset.meta.total_frames == 9
+    assert [ep["length"] for ep in dataset.meta.episodes.values()] == [3, 2, 4]
+    assert dataset.hf_dataset["index"] == list(range(9))
+    assert not list((dataset.root / "images").rglob("*.png"))
+
+
+def test_save_episode_in_background_waits_images_on_caller(image_dataset, monkeypatch):
+    dataset = image_dataset
+    dataset.start_image_writer(num_processes=0, num_threads=1)
+    wait_threads = []
+    wait_until_done = dataset.image_writer.wait_until_done
+
+    def record_wait_thread():
+        wait_threads.append(threading.current_thread())
+        wait_until_done()
+
+    monkeypatch.setattr(dataset.image_writer, "wait_until_done", record_wait_thread)
+    dataset.start_episode_finalizer(max_pending_episodes=1)
+    for _ in range(2):
+        for _ in range(3):
+            dataset.add_frame({"image": np.random.rand(*DUMMY_CHW)}, task="Dummy task")
+        dataset.save_episode()
+    dataset.stop_episode_finalizer()
+    dataset.stop_image_writer()
+
+    # The finalizer doesn't wait for the images of the episodes being recorded
+    assert wait_threads and all(thread is threading.main_thread() for thread in wait_threads)
+    assert dataset.meta.total_episodes == 2
+
+
+def test_save_episode_in_background_error(image_dataset, monkeypatch):
+    dataset = image_dataset
+    dataset.start_episode_finalizer(max_pending_episodes=2)
+    save_episode_table = dataset._save_episode_table
+
+    def failing_save_episode_table(episode_buffer, episode_index):
+        if episode_index == 1:
+            raise OSError("Disk full")
+        save_episode_table(episode_buffer, episode_index)
+
+    monkeypatch.setattr(dataset, "_save_episode_table", failing_save_episode_table)
+    # The error is raised by the first call following the failure.
+    with pytest.raises(RuntimeError):
+        for _ in range(3):
+            dataset.add_frame({"image": np.random.rand(*DUMMY_CHW)}, task="Dummy task")
+            dataset.save_episode()
+        dataset.stop_episode_finalizer()
+
+    # The episode following the failed one is not saved either.
+    assert dataset.meta.total_episodes == 1
+
+
+def test_verify_dataset(image_dataset):
+    dataset = image_dataset
+    for _ in range(2):
+        dataset.add_frame({"image": np.random.rand(*DUMMY_CHW)}, task="Dummy task")
+        dataset.save_episode()
+
+    manifest = load_manifest(dataset.root)
+    assert list(manifest) == [0, 1]
+    assert list(manifest[1]) == [str(dataset.meta.get_data_file_path(1))]
+    assert verify_dataset(dataset.meta) == []
+
+    ep_0_path = dataset.root / dataset.meta.get_data_file_path(0)
+    ep_0_path.write_bytes(ep_0_path.read_bytes() + b"0")
+    (dataset.root / dataset.meta.get_data_file_path(1)).unlink()
+    errors = verify_dataset(dataset.meta, num_workers=2)
+    assert len(errors) == 2
+    assert "size" in errors[0]
+    assert "missing" in errors[1]
+
+
 def test_image_array_to_pil_image_wrong_range_float_0_255():
     image = np.random.rand(*DUMMY_HWC) * 255
     with pytest.raises(ValueError):
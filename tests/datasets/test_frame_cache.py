@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+import numpy as np
+import pytest
+import torch
+
+from lerobot.common.datasets.frame_cache import FrameCache, resize_to_fit
+from lerobot.scripts.build_frame_cache import build_frame_cache
+
+FPS = 30
+
+
+def make_frames(num_frames: int, value: int = 0) -> np.ndarray:
+    return np.full((num_frames, 3, 4, 6), value, dtype=np.uint8)
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = tmp_path / "episode_000000.mp4"
+    path.write_bytes(b"video")
+    return path
+
+
+def touch_videos(dataset):
+    for ep_idx in range(dataset.meta.total_episodes):
+        for vid_key in dataset.meta.video_keys:
+            path = dataset.root / dataset.meta.get_video_file_path(ep_idx, vid_key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"video")
+
+
+def fake_decode_video_frames(
+    video_path, timestamps, tolerance_s, backend=None, decoder_pool=None, return_uint8=False
+):
+    # Frame i of every video is filled with the value i
+    frame_indices = (torch.tensor(timestamps) * FPS).round().to(torch.uint8)
+    frames = frame_indices.view(-1, 1, 1, 1).expand(-1, 3, 8, 12).clone()
+    return frames if return_uint8 else frames.type(torch.float32) / 255
+
+
+def test_put_get(tmp_path, video_path):
+    cache = FrameCache(tmp_path / "cache", "info")
+    frames = np.arange(5, dtype=np.uint8)[:, None, None, None] * make_frames(5, 1)
+    timestamps = [i / FPS for i in range(5)]
+    assert cache.put(0, "laptop", video_path, timestamps, frames)
+
+    cache = FrameCache(tmp_path / "cache", "info")
+    assert cache.contains(0, "laptop", video_path)
+    assert not cache.contains(1, "laptop", video_path)
+    out = cache.get(0, "laptop", [3 / FPS, 0.0], tolerance_s=1e-4)
+    assert out.dtype == torch.uint8
+    assert out[:, 0, 0, 0].tolist() == [3, 0]
+    with pytest.raises(AssertionError):
+        cache.get(0, "laptop", [0.5 / FPS], tolerance_s=1e-4)
+
+
+def test_invalidation(tmp_path, video_path):
+    cache = FrameCache(tmp_path / "cache", "info")
+    cache.put(0, "laptop", video_path, [0.0], make_frames(1))
+
+    stat = video_path.stat()
+    os.utime(video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert not FrameCache(tmp_path / "cache", "info").contains(0, "laptop", video_path)
+
+    cache = FrameCache(tmp_path / "cache", "new_info")
+    assert len(cache.entries) == 0
+    assert not list((tmp_path / "cache").glob("episode_*.npy"))
+
+
+def test_budget_evicts_oldest_episode(tmp_path, video_path):
+    ep_nbytes = make_frames(2).nbytes
+    cache = FrameCache(tmp_path / "cache", "info", max_bytes=2 * ep_nbytes)
+    for ep_idx in range(3):
+        assert cache.put(ep_idx, "laptop", video_path, [0.0, 1 / FPS], make_frames(2))
+    assert sorted(cache.entries) == ["1/laptop", "2/laptop"]
+    assert cache.nbytes == 2 * ep_nbytes
+
+    assert not cache.put(3, "laptop", video_path, [0.0, 1 / FPS], make_frames(2), protected_episodes={1, 2})
+    assert sorted(cache.entries) == ["1/laptop", "2/laptop"]
+
+
+def test_rejected_put_keeps_entry(tmp_path, video_path):
+    ep_nbytes = make_frames(2).nbytes
+    cache = FrameCache(tmp_path / "cache", "info", max_bytes=2 * ep_nbytes)
+    assert cache.put(0, "laptop", video_path, [0.0, 1 / FPS], make_frames(2, 1))
+    assert cache.put(0, "phone", video_path, [0.0, 1 / FPS], make_frames(2, 2))
+
+    # Replacing an entry by frames of the same size fits, larger ones don't
+    assert cache.put(0, "laptop", video_path, [0.0, 1 / FPS], make_frames(2, 3))
+    assert not cache.put(0, "laptop", video_path, [0.0, 1 / FPS, 2 / FPS], make_frames(3, 4))
+
+    cache = FrameCache(tmp_path / "cache", "info", max_bytes=2 * ep_nbytes)
+    assert cache.contains(0, "laptop", video_path)
+    assert cache.get(0, "laptop", [1 / FPS], tolerance_s=1e-4)[0, 0, 0, 0].item() == 3
+
+
+def test_resize_to_fit():
+    frames = torch.zeros(2, 3, 480, 640, dtype=torch.uint8)
+    assert resize_to_fit(frames, (240, 240)).shape == (2, 3, 180, 240)
+    assert resize_to_fit(frames, (512, 1024)) is frames
+
+
+def test_dataset_reads_cache(tmp_path, lerobot_dataset_factory, monkeypatch):
+    monkeypatch.setattr("lerobot.scripts.build_frame_cache.decode_video_frames", fake_decode_video_frames)
+    dataset = lerobot_dataset_factory(root=tmp_path / "test")
+    touch_videos(dataset)
+    cache = build_frame_cache(dataset, resize=(4, 6))
+    assert len(cache.entries) == dataset.meta.total_episodes * len(dataset.meta.video_keys)
+
+    def decode_video_frames(*args, **kwargs):
+        raise AssertionError("Frames should be read from the cache.")
+
+    monkeypatch.setattr("lerobot.common.datasets.lerobot_dataset.decode_video_frames", decode_video_frames)
+    dataset = lerobot_dataset_factory(root=tmp_path / "test", use_frame_cache=True)
+    item = dataset[5]
+    for vid_key in dataset.meta.video_keys:
+        assert item[vid_key].shape == (3, 4, 6)
+        assert torch.allclose(item[vid_key], torch.full((3, 4, 6), item["frame_index"].item() / 255))
+
+
+def test_build_stops_at_budget(tmp_path, lerobot_dataset_factory, monkeypatch):
+    monkeypatch.setattr("lerobot.scripts.build_frame_cache.decode_video_frames", fake_decode_video_frames)
+    dataset = lerobot_dataset_factory(root=tmp_path / "test", total_episodes=3, total_frames=150)
+    touch_videos(dataset)
+    ep_0_length = (dataset.episode_data_index["to"][0] - dataset.episode_data_index["from"][0]).item()
+    max_bytes = ep_0_length * 3 * 4 * 6 * len(dataset.meta.video_keys)
+    cache = build_frame_cache(dataset, resize=(4, 6), max_bytes=max_bytes)
+    assert cache.nbytes <= max_bytes
+    assert {key.split("/")[0] for key in cache.entries} == {"0"}
+
+
+def test_dataset_reads_cache_uint8(tmp_path, lerobot_dataset_factory, monkeypatch):
+    monkeypatch.setattr("lerobot.scripts.build_frame_cache.decode_video_frames", fake_decode_video_frames)
+    dataset = lerobot_dataset_factory(root=tmp_path / "test")
+    touch_videos(dataset)
+    build_frame_cache(dataset)
+
+    dataset = lerobot_dataset_factory(root=tmp_path / "test", use_frame_cache=True, return_uint8_frames=True)
+    item = dataset[5]
+    for vid_key in dataset.meta.video_keys:
+        assert item[vid_key].dtype == torch.uint8
+        assert item[vid_key].shape == (3, 8, 12)
+        assert (item[vid_key] == item["frame_index"].item()).all()
@@ -13,7 +13,7 @@
 # limitations under the License.
 import queue
 import time
-from multiprocessing import queues
+from multiprocessing import queues, shared_memory
 from unittest.mock import MagicMock, patch
 
 import numpy as np
@@ -384,3 +384,33 @@ def test_main_process_time(tmp_path, img_tensor_factory):
         assert fpath.exists()
     finally:
         writer.stop()
+
+
+def test_shared_memory_slabs(tmp_path, img_array_factory):
+    writer = AsyncImageWriter(num_processes=1, num_threads=1, num_slots=2)
+    try:
+        image_arrays = [img_array_factory(height=64, width=48) for _ in range(10)]
+        image_arrays += [img_array_factory(height=32, width=32)]
+        fpaths = [tmp_path / f"frame_{i:06d}.png" for i in range(len(image_arrays))]
+        for image_array, fpath in zip(image_arrays, fpaths, strict=True):
+            writer.save_image(image_array, fpath)
+        writer.wait_until_done()
+        for image_array, fpath in zip(image_arrays, fpaths, strict=True):
+            assert np.array_equal(np.array(Image.open(fpath)), image_array)
+
+        # One slab per image shape, whose slots are all released once the images are written
+        assert sorted(slab.shape for slab in writer.slabs.values()) == [(32, 32, 3), (64, 48, 3)]
+        # The released slots may still be in flight in the queue after the images are written
+        deadline = time.perf_counter() + 5.0
+        while not all(len(slab.free_slots) == 2 for slab in writer.slabs.values()):
+            assert time.perf_counter() < deadline
+            writer._recycle_slots(timeout=0.1)
+        assert writer.num_full_slab_waits > 0
+    finally:
+        slab_names = list(writer.slabs)
+        writer.stop()
+
+    assert writer.slabs == {}
+    for name in slab_names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
@@ -13,10 +13,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from itertools import chain
+
 from datasets import Dataset
 
 from lerobot.common.datasets.push_dataset_to_hub.utils import calculate_episode_data_index
-from lerobot.common.datasets.sampler import EpisodeAwareSampler
+from lerobot.common.datasets.sampler import EpisodeAwareSampler, EpisodeGroupedBatchSampler
 from lerobot.common.datasets.utils import (
     hf_transform_to_torch,
 )
@@ -88,3 +90,46 @@ def test_shuffle():
     assert sampler.indices == [0, 1, 2, 3, 4, 5]
     assert len(sampler) == 6
     assert set(sampler) == {0, 1, 2, 3, 4, 5}
+
+
+def test_grouped_batches():
+    dataset = Dataset.from_dict(
+        {
+            "timestamp": [0.1, 0.2, 0.3, 0.4, 0.5, 0.6],
+            "index": [0, 1, 2, 3, 4, 5],
+            "episode_index": [0, 0, 1, 2, 2, 2],
+        },
+    )
+    dataset.set_transform(hf_transform_to_torch)
+    episode_data_index = calculate_episode_data_index(dataset)
+    sampler = EpisodeGroupedBatchSampler(episode_data_index, batch_size=4)
+    assert len(sampler) == 2
+    assert list(sampler) == [[0, 1, 2, 3], [4, 5]]
+    sampler = EpisodeGroupedBatchSampler(episode_data_index, batch_size=4, drop_last=True)
+    assert len(sampler) == 1
+    assert list(sampler) == [[0, 1, 2, 3]]
+    sampler = EpisodeGroupedBatchSampler(
+        episode_data_index, batch_size=2, episode_indices_to_use=[0, 2], drop_n_first_frames=1
+    )
+    assert len(sampler) == 2
+    assert list(sampler) == [[1, 4], [5]]
+
+
+def test_grouped_batches_shuffle():
+    dataset = Dataset.from_dict(
+        {
+            "timestamp": [0.1, 0.2, 0.3, 0.4, 0.5, 0.6],
+            "index": [0, 1, 2, 3, 4, 5],
+            "episode_index": [0, 0, 1, 2, 2, 2],
+        },
+    )
+    dataset.set_transform(hf_transform_to_torch)
+    episode_data_index = calculate_episode_data_index(dataset)
+    sampler = EpisodeGroupedBatchSampler(episode_data_index, batch_size=3, shuffle=True)
+    batches = list(sampler)
+    assert len(batches) == len(sampler) == 2
+    assert sorted(chain.from_iterable(batches)) == [0, 1, 2, 3, 4, 5]
+    # With batches as large as the largest episode, each batch spans at most 2 episodes.
+    episode_index = dataset["episode_index"]
+    for batch in batches:
+        assert len({episode_index[i].item() for i in batch}) <= 2
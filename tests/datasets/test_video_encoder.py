@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import av
+import numpy as np
+import pytest
+
+from lerobot.common.datasets.compute_stats import get_feature_stats
+from lerobot.common.datasets.video_encoder import RunningImageStats, StreamingVideoEncoder
+
+HEIGHT, WIDTH = 64, 96
+
+
+def count_frames(video_path) -> int:
+    with av.open(str(video_path)) as container:
+        return sum(1 for _ in container.decode(video=0))
+
+
+@pytest.fixture
+def encoder():
+    encoder = StreamingVideoEncoder(fps=30, height=HEIGHT, width=WIDTH, vcodec="h264", num_slots=2)
+    yield encoder
+    encoder.stop()
+
+
+def test_running_image_stats():
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, size=(5, HEIGHT, WIDTH, 3), dtype=np.uint8)
+    stats = RunningImageStats()
+    for frame in frames:
+        stats.update(frame)
+
+    expected = get_feature_stats(frames.transpose(0, 3, 1, 2), axis=(0, 2, 3), keepdims=True)
+    for key, value in stats.get().items():
+        if key == "count":
+            assert value.tolist() == [5]
+        else:
+            assert value.shape == (3, 1, 1)
+            np.testing.assert_allclose(value, np.squeeze(expected[key] / 255.0, axis=0))
+
+
+def test_encode_episodes(tmp_path, encoder):
+    for ep_idx in range(2):
+        video_path = tmp_path / f"episode_{ep_idx:06d}.mp4"
+        encoder.start_episode(video_path)
+        for i in range(10):
+            # channel first float frames are converted like in the image writer
+            encoder.add_frame(np.full((3, HEIGHT, WIDTH), i / 10, dtype=np.float32))
+        stats = encoder.finish_episode()
+
+        assert count_frames(video_path) == 10
+        assert stats["count"].tolist() == [10]
+        assert stats["mean"].shape == (3, 1, 1)
+
+
+def test_cancel_episode(tmp_path, encoder):
+    encoder.start_episode(tmp_path / "episode_000000.mp4")
+    encoder.add_frame(np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8))
+    encoder.cancel_episode()
+    assert not (tmp_path / "episode_000000.mp4").exists()
+
+    encoder.start_episode(tmp_path / "episode_000000.mp4")
+    encoder.add_frame(np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8))
+    encoder.finish_episode()
+    assert count_frames(tmp_path / "episode_000000.mp4") == 1
+
+
+def test_wrong_frame_shape(tmp_path, encoder):
+    encoder.start_episode(tmp_path / "episode_000000.mp4")
+    with pytest.raises(ValueError):
+        encoder.add_frame(np.zeros((HEIGHT, WIDTH + 2, 3), dtype=np.uint8))
+
+
+def test_dataset_streaming_encoding(tmp_path, empty_lerobot_dataset_factory):
+    features = {
+        "observation.images.cam": {
+            "dtype": "video",
+            "shape": (HEIGHT, WIDTH, 3),
+            "names": ["height", "width", "channels"],
+        },
+        "state": {"dtype": "float32", "shape": (2,), "names": None},
+    }
+    dataset = empty_lerobot_dataset_factory(
+        root=tmp_path / "test", features=features, streaming_encoding=True
+    )
+    try:
+        for num_frames in [4, 6]:
+            for i in range(num_frames):
+                frame = {
+                    "observation.images.cam": np.full((HEIGHT, WIDTH, 3), 10 * i, dtype=np.uint8),
+                    "state": np.array([i, -i], dtype=np.float32),
+                }
+                dataset.add_frame(frame, task="Dummy task")
+            dataset.save_episode()
+    finally:
+        dataset.stop_video_encoders()
+
+    assert not (dataset.root / "images").exists()
+    for ep_idx, num_frames in enumerate([4, 6]):
+        video_path = dataset.root / dataset.meta.get_video_file_path(ep_idx, "observation.images.cam")
+        assert count_frames(video_path) == num_frames
+        assert dataset.meta.episodes_stats[ep_idx]["observation.images.cam"]["count"].tolist() == [num_frames]
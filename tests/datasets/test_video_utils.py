@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import pickle
+
+import pytest
+
+from lerobot.common.datasets import video_utils
+from lerobot.common.datasets.video_utils import VideoDecoderPool
+
+
+class DummyContainer:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class DummyDecoder:
+    def __init__(self, video_path, backend):
+        self.video_path = str(video_path)
+        self.backend = backend
+        self.container = DummyContainer()
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    opened = []
+
+    def open_video_decoder(video_path, backend):
+        decoder = DummyDecoder(video_path, backend)
+        opened.append(decoder)
+        return decoder
+
+    monkeypatch.setattr(video_utils, "open_video_decoder", open_video_decoder)
+    return opened
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        VideoDecoderPool(0)
+
+
+def test_reuses_open_decoder(opened):
+    pool = VideoDecoderPool(capacity=2)
+    first = pool.get("episode_000000.mp4", "pyav")
+    second = pool.get("episode_000000.mp4", "pyav")
+    assert first is second
+    assert len(opened) == 1
+    assert ("episode_000000.mp4", "pyav") in pool
+
+
+def test_evicts_least_recently_used(opened):
+    pool = VideoDecoderPool(capacity=2)
+    ep_0 = pool.get("episode_000000.mp4", "pyav")
+    ep_1 = pool.get("episode_000001.mp4", "pyav")
+    pool.get("episode_000000.mp4", "pyav")
+    pool.get("episode_000002.mp4", "pyav")
+
+    assert len(pool) == 2
+    assert ("episode_000000.mp4", "pyav") in pool
+    assert ("episode_000001.mp4", "pyav") not in pool
+    assert ep_1.container.closed
+    assert not ep_0.container.closed
+
+
+def test_clear(opened):
+    pool = VideoDecoderPool(capacity=2)
+    decoder = pool.get("episode_000000.mp4", "pyav")
+    pool.clear()
+    assert len(pool) == 0
+    assert decoder.container.closed
+
+
+def test_pickle_drops_decoders(opened):
+    pool = VideoDecoderPool(capacity=3)
+    pool.get("episode_000000.mp4", "pyav")
+    unpickled = pickle.loads(pickle.dumps(pool))
+    assert unpickled.capacity == 3
+    assert len(unpickled) == 0
+
+
+def test_resets_in_forked_process(opened, monkeypatch):
+    pool = VideoDecoderPool(capacity=2)
+    parent_decoder = pool.get("episode_000000.mp4", "pyav")
+
+    child_pid = os.getpid() + 1
+    monkeypatch.setattr(video_utils.os, "getpid", lambda: child_pid)
+    assert len(pool) == 0
+
+    child_decoder = pool.get("episode_000000.mp4", "pyav")
+    assert child_decoder is not parent_decoder
+    # The parent's decoder is forgotten, not closed.
+    assert not parent_decoder.container.closed
+    assert len(opened) == 2
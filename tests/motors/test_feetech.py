@@ -1,10 +1,14 @@
+import logging
 import re
 import sys
+import threading
+import time
 from typing import Generator
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from lerobot.common.errors import DeviceNotConnectedError
 from lerobot.common.motors import Motor, MotorCalibration, MotorNormMode
 from lerobot.common.motors.feetech import MODEL_NUMBER, MODEL_NUMBER_TABLE, FeetechMotorsBus
 from lerobot.common.motors.feetech.tables import STS_SMS_SERIES_CONTROL_TABLE
@@ -315,6 +319,192 @@ def test__sync_write(addr, length, ids_values, mock_motors, dummy_motors):
     assert comm == scs.COMM_SUCCESS
 
 
+def test__sync_read_cached_reader(mock_motors, dummy_motors):
+    addr, length, ids_values = (10, 2, {1: 1337, 2: 42})
+    stub = mock_motors.build_sync_read_stub(addr, length, ids_values)
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors)
+    bus.connect(handshake=False)
+
+    for _ in range(3):
+        read_values, _ = bus._sync_read(addr, length, list(ids_values))
+        assert read_values == ids_values
+
+    assert mock_motors.stubs[stub].calls == 3
+    assert list(bus._sync_readers) == [(addr, length, (1, 2))]
+
+
+def test__pipelined_sync_read(mock_motors, dummy_motors):
+    addr, length = (56, 2)
+    ids_values = {1: [100, 200, 300, 400], 2: [10, 20, 30, 40]}
+    stub = mock_motors.build_sequential_sync_read_stub(addr, length, ids_values)
+    write_stub = mock_motors.build_sync_write_stub(42, 2, {1: 500, 2: 50})
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors)
+    bus.connect(handshake=False)
+
+    read_values = []
+    for n_read in range(3):
+        values, comm = bus._pipelined_sync_read(addr, length, [1, 2])
+        assert comm == scs.COMM_SUCCESS
+        read_values.append(values)
+        if n_read == 1:
+            # The pending response is received before any other communication
+            assert bus._sync_write(42, 2, {1: 500, 2: 50}) == scs.COMM_SUCCESS
+
+    assert read_values == [{1: 100, 2: 10}, {1: 200, 2: 20}, {1: 300, 2: 30}]
+    # The request of the next read has already been sent
+    assert mock_motors.stubs[stub].wait_calls(4) and bus._pending_sync_read[0] == (addr, length, (1, 2))
+    assert mock_motors.stubs[write_stub].wait_called()
+
+    bus.disconnect(disable_torque=False)
+    assert bus._pending_sync_read is None and bus._prefetched_sync_read is None
+
+
+def test__pipelined_sync_read_stale(mock_motors, dummy_motors):
+    addr, length = (56, 2)
+    ids_values = {1: [100, 200, 300, 400, 500], 2: [10, 20, 30, 40, 50]}
+    stub = mock_motors.build_sequential_sync_read_stub(addr, length, ids_values)
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors)
+    bus.connect(handshake=False)
+    bus.pipelined_read_max_age_s = 0.05
+
+    assert bus._pipelined_sync_read(addr, length, [1, 2])[0] == {1: 100, 2: 10}
+    time.sleep(0.1)
+    # The prefetched values are too old, they are read again
+    assert bus._pipelined_sync_read(addr, length, [1, 2])[0] == {1: 300, 2: 30}
+    assert bus._pipelined_sync_read(addr, length, [1, 2])[0] == {1: 400, 2: 40}
+    assert mock_motors.stubs[stub].wait_calls(5)
+
+    bus.disconnect(disable_torque=False)
+
+
+def test__sync_write_cached_writer(mock_motors, dummy_motors):
+    addr, length = (42, 2)
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors)
+    bus.connect(handshake=False)
+
+    for ids_values in [{1: 1337, 2: 42}, {1: 1337, 2: 43}]:
+        # Stubs of the same motors share the same name, the previous one is replaced
+        stub = mock_motors.build_sync_write_stub(addr, length, ids_values)
+        assert bus._sync_write(addr, length, ids_values) == scs.COMM_SUCCESS
+        assert mock_motors.stubs[stub].wait_called()
+
+    assert len(bus._sync_writers) == 1
+    assert bus._sync_writers[(addr, length, (1, 2))][1] == {1: 1337, 2: 43}
+
+
+def test_io_thread(mock_motors, dummy_motors, dummy_calibration):
+    pos_stub = mock_motors.build_sync_read_stub(56, 2, {1: 1337, 2: 2048, 3: 3000})
+    vel_stub = mock_motors.build_sync_read_stub(58, 2, {1: 10, 2: 20, 3: 30})
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors, calibration=dummy_calibration)
+    bus.connect(handshake=False)
+    expected_pos = bus._normalize({1: 1337, 2: 2048, 3: 3000})
+    goal_pos = {"dummy_1": 10.0, "dummy_2": -20.0, "dummy_3": 30.0}
+    raw_goal_pos = bus._unnormalize({bus.motors[motor].id: val for motor, val in goal_pos.items()})
+    write_stub = mock_motors.build_sync_write_stub(42, 2, raw_goal_pos)
+
+    bus.start_io_thread(["Present_Position", "Present_Velocity"], fps=200)
+    bus.async_write_goal(goal_pos)
+    assert mock_motors.stubs[pos_stub].wait_calls(3) and mock_motors.stubs[vel_stub].wait_calls(3)
+    assert mock_motors.stubs[write_stub].wait_called()
+
+    present_pos, pos_timestamp = bus.async_read("Present_Position")
+    present_vel, vel_timestamp = bus.async_read("Present_Velocity")
+    assert present_pos == {bus._id_to_name(id_): val for id_, val in expected_pos.items()}
+    assert present_vel == {"dummy_1": 10, "dummy_2": 20, "dummy_3": 30}
+    assert pos_timestamp < vel_timestamp <= time.perf_counter()
+
+    values, timestamps = bus.async_read_array()
+    assert values.shape == (2, 3) and timestamps.shape == (2,)
+    with pytest.raises(ValueError):
+        bus.async_read("Present_Current")
+
+    bus.disconnect(disable_torque=False)
+    assert bus.io_thread is None
+    # The goal positions were only written once
+    assert mock_motors.stubs[write_stub].calls == 1
+
+
+def test_io_thread_disconnected(mock_motors, dummy_motors, dummy_calibration, monkeypatch):
+    mock_motors.build_sync_read_stub(56, 2, {1: 1337, 2: 2048, 3: 3000})
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors, calibration=dummy_calibration)
+    bus.connect(handshake=False)
+    bus.start_io_thread(fps=200)
+
+    def disconnected(buffer_idx):
+        raise DeviceNotConnectedError("Port closed")
+
+    monkeypatch.setattr(bus, "_read_io_state", disconnected)
+    bus.io_thread.join(timeout=1.0)
+    assert not bus.io_thread.is_alive()
+    # The values aren't updated anymore
+    with pytest.raises(DeviceNotConnectedError, match="Port closed"):
+        bus.async_read("Present_Position")
+    with pytest.raises(DeviceNotConnectedError):
+        bus.async_write_goal({"dummy_1": 0.0})
+
+    bus.disconnect(disable_torque=False)
+    assert bus.io_thread is None
+
+
+def test_io_thread_errors(mock_motors, dummy_motors, dummy_calibration, monkeypatch):
+    mock_motors.build_sync_read_stub(56, 2, {1: 1337, 2: 2048, 3: 3000})
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors, calibration=dummy_calibration)
+    bus.connect(handshake=False)
+    with pytest.raises(ValueError):
+        bus.start_io_thread(fps=5, max_age_s=0.1)
+    bus.start_io_thread(max_age_s=0.1)
+    num_errors = 0
+
+    def failing_read(buffer_idx):
+        nonlocal num_errors
+        num_errors += 1
+        raise ConnectionError("No status packet")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(bus, "_read_io_state", failing_read)
+        time.sleep(0.2)
+        # The retries are delayed by 10ms, 20ms, 40ms, 80ms...
+        assert 1 <= num_errors <= 6
+        assert bus.io_thread.is_alive()
+        # The last values are too old to be returned
+        with pytest.raises(ConnectionError, match="consecutive errors.*No status packet"):
+            bus.async_read("Present_Position")
+
+    # The values are returned again once the motors answer
+    deadline = time.perf_counter() + 2.0
+    while bus._io_num_failures > 0 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    present_pos, timestamp = bus.async_read("Present_Position")
+    assert time.perf_counter() - timestamp <= 0.1
+
+    bus.disconnect(disable_torque=False)
+
+
+def test_stop_io_thread_timeout(mock_motors, dummy_motors, dummy_calibration, monkeypatch, caplog):
+    mock_motors.build_sync_read_stub(56, 2, {1: 1337, 2: 2048, 3: 3000})
+    bus = FeetechMotorsBus(port=mock_motors.port, motors=dummy_motors, calibration=dummy_calibration)
+    bus.connect(handshake=False)
+    bus.start_io_thread()
+    blocked, unblock = threading.Event(), threading.Event()
+
+    def blocking_read(buffer_idx):
+        blocked.set()
+        unblock.wait()
+
+    monkeypatch.setattr(bus, "_read_io_state", blocking_read)
+    assert blocked.wait(timeout=1.0)
+    io_thread = bus.io_thread
+    with caplog.at_level(logging.WARNING):
+        bus.stop_io_thread(timeout_s=0.05)
+    assert "didn't stop" in caplog.text
+    assert bus.io_thread is None
+
+    unblock.set()
+    io_thread.join(timeout=1.0)
+    assert not io_thread.is_alive()
+    bus.disconnect(disable_torque=False)
+
+
 def test_is_calibrated(mock_motors, dummy_motors, dummy_calibration):
     mins_stubs, maxes_stubs, homings_stubs = [], [], []
     for cal in dummy_calibration.values():
@@ -1,10 +1,12 @@
 import re
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 
 from lerobot.common.motors.motors_bus import (
     Motor,
+    MotorCalibration,
     MotorNormMode,
     assert_same_address,
     get_address,
@@ -340,3 +342,59 @@ def test_sync_write_by_value_dict(data_name, ids_values, dummy_motors):
     mock__encode_sign.assert_called_once_with(data_name, ids_values)
     if data_name in bus.normalized_data:
         mock__unnormalize.assert_called_once_with(ids_values)
+
+
+@pytest.fixture
+def calibrated_bus() -> MockMotorsBus:
+    motors = {
+        "dummy_1": Motor(1, "model_2", MotorNormMode.RANGE_M100_100),
+        "dummy_2": Motor(2, "model_3", MotorNormMode.RANGE_0_100),
+        "dummy_3": Motor(3, "model_1", MotorNormMode.DEGREES),
+    }
+    bus = MockMotorsBus("/dev/dummy-port", motors)
+    bus.apply_drive_mode = True
+    bus.calibration = {
+        "dummy_1": MotorCalibration(1, drive_mode=1, homing_offset=0, range_min=1000, range_max=3000),
+        "dummy_2": MotorCalibration(2, drive_mode=0, homing_offset=0, range_min=0, range_max=4000),
+        "dummy_3": MotorCalibration(3, drive_mode=0, homing_offset=0, range_min=1000, range_max=3000),
+    }
+    return bus
+
+
+def test__normalize(calibrated_bus):
+    normalized = calibrated_bus._normalize({1: 1500, 2: 5000, 3: 3047})
+    assert normalized == {1: 50.0, 2: 100.0, 3: pytest.approx(1047 * 360 / 4095)}
+    assert calibrated_bus._unnormalize(normalized) == {1: 1500, 2: 4000, 3: 3047}
+
+    # Motors can be given in any order
+    assert calibrated_bus._normalize({3: 2000, 1: 3000}) == {3: 0.0, 1: -100.0}
+
+
+def test__normalize_invalid_calibration(calibrated_bus):
+    calibrated_bus.calibration = {
+        **calibrated_bus.calibration,
+        "dummy_2": MotorCalibration(2, drive_mode=0, homing_offset=0, range_min=10, range_max=10),
+    }
+    assert calibrated_bus._normalize({1: 1500}) == {1: 50.0}
+    with pytest.raises(ValueError, match="Invalid calibration for motor 'dummy_2'"):
+        calibrated_bus._normalize({1: 1500, 2: 10})
+
+    calibrated_bus.calibration = {}
+    with pytest.raises(RuntimeError):
+        calibrated_bus._unnormalize({1: 0.0})
+
+
+def test_sync_read_array(calibrated_bus):
+    calibrated_bus.connect(handshake=False)
+    ids_values = {1: 1500, 2: 1000, 3: 2000}
+
+    with (
+        patch.object(MockMotorsBus, "_sync_read", return_value=(ids_values, 0)),
+        patch.object(MockMotorsBus, "_decode_sign", return_value=ids_values),
+    ):
+        values = calibrated_bus.sync_read_array("Present_Position")
+        raw_values = calibrated_bus.sync_read_array("Present_Position", normalize=False)
+
+    np.testing.assert_array_equal(values, [50.0, 25.0, 0.0])
+    assert raw_values.dtype == np.int64
+    np.testing.assert_array_equal(raw_values, [1500, 1000, 2000])
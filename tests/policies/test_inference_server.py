@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+import zmq
+
+from lerobot.common.policies.inference_server import (
+    BatchedInferenceServer,
+    InferenceClient,
+    decode_message,
+    make_dummy_observation,
+    run_loopback_client,
+)
+from lerobot.configs.types import FeatureType, PolicyFeature
+
+N_ACTION_STEPS = 3
+INPUT_FEATURES = {
+    "observation.images.top": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 8, 12)),
+    "observation.state": PolicyFeature(type=FeatureType.STATE, shape=(2,)),
+}
+
+
+class MockPolicy:
+    """Returns the state of each observation repeated over the chunk, to check the routing of the actions."""
+
+    def __init__(self):
+        self.config = SimpleNamespace(device="cpu")
+
+    def predict_action_chunk(self, batch):
+        images = batch["observation.images.top"]
+        assert images.shape[1:] == (3, 8, 12) and images.dtype == torch.float32
+        if any(task == "fail" for task in batch["task"]):
+            raise ValueError("Inference failed")
+        if any(task == "slow" for task in batch["task"]):
+            time.sleep(0.5)
+        state = batch["observation.state"]
+        return state[:, None].expand(-1, N_ACTION_STEPS, -1)
+
+
+@pytest.fixture
+def server():
+    server = BatchedInferenceServer(MockPolicy(), "tcp://127.0.0.1:*", max_batch_size=4, batch_timeout_s=0.2)
+    stop_event = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, args=(stop_event,))
+    thread.start()
+    yield server
+    stop_event.set()
+    thread.join()
+    server.close()
+
+
+def get_address(server):
+    return server.zmq_socket.getsockopt_string(zmq.LAST_ENDPOINT)
+
+
+def request_action_chunk(address, observation, task="Dummy task"):
+    client = InferenceClient(address)
+    try:
+        return client.predict_action_chunk(observation, task)
+    finally:
+        client.close()
+
+
+def test_batched_inference():
+    # The server gathers requests until the batch is full, so that the requests sent before it processes them
+    # are batched together whatever their timing.
+    server = BatchedInferenceServer(MockPolicy(), "tcp://127.0.0.1:*", max_batch_size=3, batch_timeout_s=5.0)
+    observations = [make_dummy_observation(INPUT_FEATURES) for _ in range(3)]
+    try:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(request_action_chunk, get_address(server), obs) for obs in observations
+            ]
+            assert server.process_requests(timeout_s=5.0) == 3
+            chunks = [future.result() for future in futures]
+    finally:
+        server.close()
+
+    for observation, chunk in zip(observations, chunks, strict=True):
+        assert chunk.shape == (N_ACTION_STEPS, 2)
+        np.testing.assert_allclose(chunk, np.tile(observation["observation.state"], (N_ACTION_STEPS, 1)))
+    assert server.batch_sizes == [3]
+
+
+def test_inference_error(server):
+    with pytest.raises(RuntimeError, match="Inference failed"):
+        request_action_chunk(get_address(server), make_dummy_observation(INPUT_FEATURES), task="fail")
+
+    # The server keeps serving the other requests
+    chunk = request_action_chunk(get_address(server), make_dummy_observation(INPUT_FEATURES))
+    assert chunk.shape == (N_ACTION_STEPS, 2)
+
+
+def test_late_reply_dropped(server):
+    observation = make_dummy_observation(INPUT_FEATURES)
+    client = InferenceClient(get_address(server), timeout_s=0.2)
+    try:
+        observation["observation.state"] = np.full(2, 1.0, dtype=np.float32)
+        with pytest.raises(TimeoutError):
+            client.predict_action_chunk(observation, task="slow")
+
+        # The reply to the request which timed out arrives while waiting for the next one, and is dropped
+        client.timeout_s = 5.0
+        observation["observation.state"] = np.full(2, 2.0, dtype=np.float32)
+        chunk = client.predict_action_chunk(observation, task="Dummy task")
+    finally:
+        client.close()
+    np.testing.assert_array_equal(chunk, np.full((N_ACTION_STEPS, 2), 2.0))
+
+
+@pytest.mark.parametrize(
+    "frames",
+    [[b"not json"], [b'{"task": "Dummy task"}'], [b'{"arrays": {"state": ["float32", [2]]}}']],
+    ids=["invalid_header", "missing_arrays", "missing_buffer"],
+)
+def test_malformed_request(server, frames):
+    socket = zmq.Context.instance().socket(zmq.DEALER)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(get_address(server))
+    try:
+        socket.send_multipart(frames)
+        assert socket.poll(5000)
+        header, arrays = decode_message(socket.recv_multipart())
+    finally:
+        socket.close()
+    assert header["error"] is not None and arrays == {}
+
+    # The server keeps serving the other requests
+    chunk = request_action_chunk(get_address(server), make_dummy_observation(INPUT_FEATURES))
+    assert chunk.shape == (N_ACTION_STEPS, 2)
+
+
+def test_loopback_client(server):
+    latencies = run_loopback_client(get_address(server), INPUT_FEATURES, num_requests=2)
+    assert len(latencies) == 2
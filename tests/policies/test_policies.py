@@ -14,6 +14,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import inspect
+import threading
+from collections import deque
 from copy import deepcopy
 from pathlib import Path
 
@@ -30,6 +32,7 @@ from lerobot.common.envs.factory import make_env, make_env_config
 from lerobot.common.envs.utils import preprocess_observation
 from lerobot.common.optim.factory import make_optimizer_and_scheduler
 from lerobot.common.policies.act.modeling_act import ACTTemporalEnsembler
+from lerobot.common.policies.attention import get_attention_function
 from lerobot.common.policies.factory import (
     get_policy_class,
     make_policy,
@@ -37,12 +40,14 @@ from lerobot.common.policies.factory import (
 )
 from lerobot.common.policies.normalize import Normalize, Unnormalize
 from lerobot.common.policies.pretrained import PreTrainedPolicy
+from lerobot.common.policies.smolvla.ode_solvers import TIMESTEP_SCHEDULES, integrate
+from lerobot.common.policies.utils import ActionChunkPrefetcher, LRUCache, merge_action_chunk
 from lerobot.common.utils.random_utils import seeded_context
 from lerobot.configs.default import DatasetConfig
 from lerobot.configs.train import TrainPipelineConfig
 from lerobot.configs.types import FeatureType, NormalizationMode, PolicyFeature
 from tests.artifacts.policies.save_policy_to_safetensors import get_policy_stats
-from tests.utils import DEVICE, require_cpu, require_env, require_x86_64_kernel
+from tests.utils import DEVICE, require_cpu, require_env, require_package, require_x86_64_kernel
 
 
 @pytest.fixture
@@ -362,6 +367,20 @@ def test_normalize(insert_temporal_dim):
     unnormalize(output_batch)
 
 
+@pytest.mark.parametrize("norm_mode", [NormalizationMode.IDENTITY, NormalizationMode.MEAN_STD])
+def test_normalize_uint8_images(norm_mode):
+    input_features = {"observation.image": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 8, 8))}
+    stats = {"observation.image": {"mean": torch.rand(3, 1, 1), "std": torch.rand(3, 1, 1) + 0.5}}
+    normalize = Normalize(input_features, {"VISUAL": norm_mode}, stats=stats)
+
+    uint8_images = torch.randint(0, 256, (2, 3, 8, 8), dtype=torch.uint8)
+    float_images = uint8_images.type(torch.float32) / 255
+    out = normalize({"observation.image": uint8_images})["observation.image"]
+    expected = normalize({"observation.image": float_images})["observation.image"]
+    assert out.dtype == torch.float32
+    assert torch.equal(out, expected)
+
+
 @pytest.mark.parametrize(
     "ds_repo_id, policy_name, policy_kwargs, file_name_extra",
     [
@@ -492,3 +511,382 @@ def test_act_temporal_ensembler():
         assert torch.all(offline_avg <= einops.reduce(seq_slice, "b s 1 -> b 1", "max"))
         # Selected atol=1e-4 keeping in mind actions in [-1, 1] and excepting 0.01% error.
         torch.testing.assert_close(online_avg, offline_avg, rtol=1e-4, atol=1e-4)
+
+
+def test_action_chunk_prefetcher():
+    prefetcher = ActionChunkPrefetcher()
+    assert prefetcher.result(block=True) is None
+
+    release = threading.Event()
+
+    def compute_chunk(start):
+        release.wait()
+        assert not torch.is_grad_enabled()
+        return torch.arange(start, start + 5, dtype=torch.float32).reshape(1, 5, 1)
+
+    prefetcher.submit(3, compute_chunk, 10)
+    assert prefetcher.pending
+    with pytest.raises(RuntimeError):
+        prefetcher.submit(4, compute_chunk, 20)
+    assert prefetcher.result() is None
+
+    release.set()
+    chunk, step = prefetcher.result(block=True)
+    assert step == 3
+    assert chunk.flatten().tolist() == [10, 11, 12, 13, 14]
+    assert not prefetcher.pending
+
+    prefetcher.submit(5, compute_chunk, 20)
+    prefetcher.cancel()
+    assert not prefetcher.pending
+    assert prefetcher.result(block=True) is None
+
+    worker_threads = list(prefetcher._executor._threads)
+    prefetcher.close()
+    assert worker_threads and not any(thread.is_alive() for thread in worker_threads)
+
+    # The worker thread is started again when needed
+    prefetcher.submit(6, compute_chunk, 30)
+    assert prefetcher.result(block=True)[1] == 6
+    prefetcher.close()
+
+
+def test_merge_action_chunk():
+    n_action_steps = 3
+    queue = deque([torch.full((1, 1), -1.0)] * 2, maxlen=n_action_steps)
+    chunk = torch.arange(5, dtype=torch.float32).reshape(1, 5, 1)
+
+    # The actions of the steps executed since the observation are skipped, and the remaining ones are replaced.
+    merge_action_chunk(queue, chunk, delay=1, n_action_steps=n_action_steps)
+    assert [action.item() for action in queue] == [1, 2]
+
+    merge_action_chunk(queue, chunk, delay=0, n_action_steps=n_action_steps)
+    assert [action.item() for action in queue] == [0, 1, 2]
+
+    # At least one action is queued even when the chunk arrives after `n_action_steps` steps.
+    merge_action_chunk(queue, chunk, delay=4, n_action_steps=n_action_steps)
+    assert [action.item() for action in queue] == [4]
+
+    with pytest.raises(ValueError):
+        merge_action_chunk(queue, chunk, delay=5, n_action_steps=n_action_steps)
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    # "a" becomes the most recently used, so "b" is evicted
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert len(cache) == 2
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+
+@require_package("transformers")
+def test_static_kv_cache():
+    from lerobot.common.policies.smolvla.smolvlm_with_expert import StaticKVCache
+
+    cache = StaticKVCache(max_suffix_len=4)
+    prefix_keys, prefix_values = torch.randn(2, 2, 6, 3, 8, dtype=torch.bfloat16)
+    cache.fill(0, prefix_keys, prefix_values)
+    assert torch.equal(cache.get(0)[0], prefix_keys)
+
+    # The suffix is written in place after the prefix, like `torch.cat` would (including type promotion).
+    suffix_keys, suffix_values = torch.randn(2, 2, 4, 3, 8)
+    keys, values = cache.update(0, suffix_keys, suffix_values)
+    torch.testing.assert_close(keys, torch.cat([prefix_keys, suffix_keys], dim=1), rtol=0, atol=0)
+    torch.testing.assert_close(values, torch.cat([prefix_values, suffix_values], dim=1), rtol=0, atol=0)
+
+    # The following denoising steps and chunks reuse the same storage.
+    data_ptr = keys.data_ptr()
+    keys, _ = cache.update(0, 2 * suffix_keys, suffix_values)
+    torch.testing.assert_close(keys, torch.cat([prefix_keys, 2 * suffix_keys], dim=1), rtol=0, atol=0)
+    cache.fill(0, prefix_keys, prefix_values)
+    keys, _ = cache.update(0, suffix_keys, suffix_values)
+    assert keys.data_ptr() == data_ptr
+
+
+@pytest.mark.parametrize("dtype, atol", [(torch.float32, 1e-5), (torch.bfloat16, 2e-2)])
+def test_sdpa_attention_matches_eager(dtype, atol):
+    batch_size, query_length, key_length, num_heads, num_kv_heads, head_dim = 2, 5, 9, 8, 2, 16
+    generator = torch.Generator().manual_seed(0)
+    query = torch.randn(batch_size, query_length, num_heads, head_dim, generator=generator).to(dtype)
+    key = torch.randn(batch_size, key_length, num_kv_heads, head_dim, generator=generator).to(dtype)
+    value = torch.randn(batch_size, key_length, num_kv_heads, head_dim, generator=generator).to(dtype)
+    attention_mask = torch.rand(batch_size, query_length, key_length, generator=generator) > 0.3
+    # Fully masked row, like the ones of padding tokens
+    attention_mask[0, 1] = False
+
+    args = (attention_mask, batch_size, head_dim, query, key, value)
+    eager_output = get_attention_function("eager")(*args)
+    sdpa_output = get_attention_function("sdpa")(*args)
+    assert sdpa_output.shape == (batch_size, query_length, num_heads * head_dim)
+    assert sdpa_output.dtype == eager_output.dtype
+    torch.testing.assert_close(sdpa_output, eager_output, rtol=0, atol=atol)
+
+    with pytest.raises(ValueError):
+        get_attention_function("unknown")
+
+
+@pytest.mark.parametrize("schedule", list(TIMESTEP_SCHEDULES))
+@pytest.mark.parametrize(
+    "solver, num_evaluations, num_early_exit_evaluations",
+    [("euler", 4, 2), ("midpoint", 8, 3), ("heun", 7, 3)],
+)
+def test_ode_solvers(solver, num_evaluations, num_early_exit_evaluations, schedule):
+    target = torch.tensor([[0.5, -1.0, 2.0]])
+    times = []
+
+    def velocity_fn(x_t, t):
+        # Velocity of the straight flow from the noise to `target`
+        times.append(t)
+        return (x_t - target) / t
+
+    actions = integrate(velocity_fn, torch.randn(1, 3), num_steps=4, solver=solver, schedule=schedule)
+    torch.testing.assert_close(actions, target)
+    assert len(times) == num_evaluations
+    assert times[0] == 1.0 and all(0 < t <= 1 for t in times)
+
+    # The predicted actions don't change from the first step, so decoding stops at the second one.
+    times.clear()
+    actions = integrate(velocity_fn, torch.randn(1, 3), num_steps=4, solver=solver, early_exit_tolerance=1e-4)
+    torch.testing.assert_close(actions, target)
+    assert len(times) == num_early_exit_evaluations
+
+
+class _CharTokenizer:
+    """Character-level stand-in for the SmolVLM tokenizer, so that SmolVLA can be built without downloading it."""
+
+    fake_image_token_id = 1
+    global_image_token_id = 2
+
+    def __call__(self, texts, max_length, return_tensors, **kwargs):
+        input_ids = [[3 + ord(char) % 61 for char in text][:max_length] for text in texts]
+        length = max(len(ids) for ids in input_ids)
+        return {
+            "input_ids": torch.tensor([ids + [0] * (length - len(ids)) for ids in input_ids]),
+            "attention_mask": torch.tensor([[1] * len(ids) + [0] * (length - len(ids)) for ids in input_ids]),
+        }
+
+
+def make_tiny_smolvla(monkeypatch, **config_kwargs):
+    """SmolVLA policy with a tiny randomly initialized 4 layers VLM, built on CPU without downloading anything."""
+    from types import SimpleNamespace
+
+    from transformers import SmolVLMConfig
+
+    from lerobot.common.policies.smolvla import modeling_smolvla, smolvlm_with_expert
+    from lerobot.common.policies.smolvla.configuration_smolvla import SmolVLAConfig
+
+    vlm_config = SmolVLMConfig(
+        text_config={
+            "model_type": "llama",
+            "vocab_size": 64,
+            "hidden_size": 32,
+            "intermediate_size": 64,
+            "num_hidden_layers": 4,
+            "num_attention_heads": 4,
+            "num_key_value_heads": 2,
+            "head_dim": 8,
+        },
+        vision_config={
+            "hidden_size": 32,
+            "intermediate_size": 64,
+            "num_hidden_layers": 1,
+            "num_attention_heads": 4,
+            "image_size": 32,
+            "patch_size": 8,
+        },
+        scale_factor=2,
+    )
+    processor = SimpleNamespace(tokenizer=_CharTokenizer())
+    monkeypatch.setattr(smolvlm_with_expert.AutoConfig, "from_pretrained", lambda *args, **kwargs: vlm_config)
+    monkeypatch.setattr(
+        smolvlm_with_expert.AutoProcessor, "from_pretrained", lambda *args, **kwargs: processor
+    )
+    monkeypatch.setattr(modeling_smolvla.AutoProcessor, "from_pretrained", lambda *args, **kwargs: processor)
+
+    config_kwargs = {
+        "chunk_size": 5,
+        "n_action_steps": 5,
+        "num_steps": 3,
+        "max_state_dim": 8,
+        "max_action_dim": 8,
+        "resize_imgs_with_padding": (32, 32),
+        "num_vlm_layers": 4,
+        **config_kwargs,
+    }
+    config = SmolVLAConfig(
+        input_features={
+            "observation.image": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 32, 32)),
+            "observation.state": PolicyFeature(type=FeatureType.STATE, shape=(4,)),
+        },
+        output_features={"action": PolicyFeature(type=FeatureType.ACTION, shape=(4,))},
+        **config_kwargs,
+    )
+    stats = {key: {"mean": torch.zeros(4), "std": torch.ones(4)} for key in ["observation.state", "action"]}
+    with seeded_context(0):
+        policy = modeling_smolvla.SmolVLAPolicy(config, dataset_stats=stats)
+    return policy.eval()
+
+
+def make_smolvla_batch(batch_size=2):
+    with seeded_context(1):
+        return {
+            "observation.image": torch.rand(batch_size, 3, 32, 32),
+            "observation.state": torch.randn(batch_size, 4),
+            "task": [f"pick the cube number {i}" for i in range(batch_size)],
+        }
+
+
+@require_package("transformers")
+@torch.no_grad()
+def test_smolvla_pruned_layer_plan(monkeypatch):
+    policy = make_tiny_smolvla(monkeypatch, num_expert_layers=2, self_attn_every_n_layers=-1)
+    vlm_with_expert = policy.model.vlm_with_expert
+    # The expert has a layer at every other depth.
+    assert vlm_with_expert.expert_layer_indices == [0, 2]
+    prefix, suffix = torch.zeros(1, 3, 32), torch.zeros(1, 2, 24)
+    assert vlm_with_expert.get_layer_indices([None, suffix], fill_kv_cache=False) == [0, 2]
+    # The prefix is cached up to the last depth read by the expert.
+    assert vlm_with_expert.get_layer_indices([prefix, None], fill_kv_cache=True) == [0, 1, 2]
+    assert vlm_with_expert.get_layer_indices([prefix, suffix], fill_kv_cache=False) == [0, 1, 2, 3]
+
+    batch = make_smolvla_batch()
+    noise = torch.randn(2, policy.config.chunk_size, policy.config.max_action_dim)
+    actions = policy.predict_action_chunk(dict(batch), noise=noise)
+
+    # Running every layer, like before the layers were pruned, doesn't change the actions.
+    policy.model.kv_cache = None
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            vlm_with_expert,
+            "get_layer_indices",
+            lambda inputs_embeds, fill_kv_cache: list(range(vlm_with_expert.num_vlm_layers)),
+        )
+        full_actions = policy.predict_action_chunk(dict(batch), noise=noise)
+    torch.testing.assert_close(actions, full_actions)
+
+    assert vlm_with_expert.get_expert_layer_indices(num_inference_vlm_layers=2) == [0]
+    assert vlm_with_expert.get_expert_layer_indices(num_inference_vlm_layers=10) == [0, 2]
+    vlm_with_expert.model_layers[1][0] = None
+    with pytest.raises(ValueError):
+        vlm_with_expert.get_expert_layer_indices(num_inference_vlm_layers=2)
+
+
+@require_package("transformers")
+@torch.no_grad()
+def test_smolvla_precomputed_suffix_masks(monkeypatch):
+    from lerobot.common.policies.smolvla.modeling_smolvla import make_att_2d_masks
+
+    policy = make_tiny_smolvla(monkeypatch, compile_denoise_step=True)
+    model = policy.model
+    # The denoising step is only compiled on CUDA.
+    assert model.get_denoise_step_fn(torch.device("cpu")) == model.denoise_step
+    assert model._compiled_denoise_step is None
+
+    batch = make_smolvla_batch()
+    noise = torch.randn(2, policy.config.chunk_size, policy.config.max_action_dim)
+    with monkeypatch.context() as patch:
+        # The eager denoising step isn't run like a CUDA graph.
+        patch.setattr(torch.compiler, "cudagraph_mark_step_begin", lambda: pytest.fail("Not compiled"))
+        eager_actions = policy.predict_action_chunk(dict(batch), noise=noise)
+
+    def denoise_step_with_suffix_embedding(prefix_pad_masks, past_key_values, x_t, timestep, suffix_masks):
+        # Denoising step computing the masks of the suffix at each step, from `embed_suffix`.
+        suffix_embs, suffix_pad_masks, suffix_att_masks = model.embed_suffix(x_t, timestep)
+        batch_size, suffix_len = suffix_pad_masks.shape
+        prefix_len = prefix_pad_masks.shape[1]
+        prefix_pad_2d_masks = prefix_pad_masks[:, None, :].expand(batch_size, suffix_len, prefix_len)
+        suffix_att_2d_masks = make_att_2d_masks(suffix_pad_masks, suffix_att_masks)
+        full_att_2d_masks = torch.cat([prefix_pad_2d_masks, suffix_att_2d_masks], dim=2)
+        prefix_offsets = torch.sum(prefix_pad_masks, dim=-1)[:, None]
+        position_ids = prefix_offsets + torch.cumsum(suffix_pad_masks, dim=1) - 1
+        outputs_embeds, _ = model.vlm_with_expert.forward(
+            attention_mask=full_att_2d_masks,
+            position_ids=position_ids,
+            past_key_values=past_key_values,
+            inputs_embeds=[None, suffix_embs],
+            use_cache=model.config.use_cache,
+            fill_kv_cache=False,
+        )
+        velocities.append(model.action_out_proj(outputs_embeds[1].to(dtype=torch.float32)))
+        return velocities[-1]
+
+    velocities = []
+    with monkeypatch.context() as patch:
+        patch.setattr(model, "denoise_step", denoise_step_with_suffix_embedding)
+        expected_actions = policy.predict_action_chunk(dict(batch), noise=noise)
+    expected_velocities = velocities
+
+    velocities = []
+    denoise_step = model.denoise_step
+
+    def record_velocity(*args):
+        velocities.append(denoise_step(*args))
+        return velocities[-1]
+
+    with monkeypatch.context() as patch:
+        patch.setattr(model, "denoise_step", record_velocity)
+        actions = policy.predict_action_chunk(dict(batch), noise=noise)
+    assert len(velocities) == len(expected_velocities) == policy.config.num_steps
+    for v_t, expected_v_t in zip(velocities, expected_velocities, strict=True):
+        torch.testing.assert_close(v_t, expected_v_t)
+    torch.testing.assert_close(actions, expected_actions)
+    torch.testing.assert_close(eager_actions, expected_actions)
+
+
+@require_package("transformers")
+@torch.no_grad()
+@pytest.mark.parametrize("use_caches", [True, False])
+def test_smolvla_prompt_and_image_embedding_caches(monkeypatch, use_caches):
+    reference_policy = make_tiny_smolvla(monkeypatch)
+    cache_kwargs = {"prompt_cache_size": 4, "reuse_unchanged_image_embeddings": True} if use_caches else {}
+    policy = make_tiny_smolvla(monkeypatch, **cache_kwargs)
+    num_calls = {"embed_image": 0, "embed_language": 0}
+
+    def count_calls(name, fn):
+        def wrapper(*args, **kwargs):
+            num_calls[name] += 1
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(
+        policy.model.vlm_with_expert,
+        "embed_image",
+        count_calls("embed_image", policy.model.vlm_with_expert.embed_image),
+    )
+    monkeypatch.setattr(
+        policy.model, "embed_language", count_calls("embed_language", policy.model.embed_language)
+    )
+
+    batch = make_smolvla_batch()
+    noise = torch.randn(2, policy.config.chunk_size, policy.config.max_action_dim)
+    for _ in range(2):
+        torch.testing.assert_close(
+            policy.predict_action_chunk(dict(batch), noise=noise),
+            reference_policy.predict_action_chunk(dict(batch), noise=noise),
+        )
+    # The prompt and the image are only embedded once when cached.
+    assert num_calls == (
+        {"embed_image": 1, "embed_language": 1} if use_caches else {"embed_image": 2, "embed_language": 2}
+    )
+
+    # A new image or task is embedded again.
+    batch["observation.image"] = batch["observation.image"].flip(-1)
+    batch["task"] = ["place the cube", "place the cube"]
+    torch.testing.assert_close(
+        policy.predict_action_chunk(dict(batch), noise=noise),
+        reference_policy.predict_action_chunk(dict(batch), noise=noise),
+    )
+    assert num_calls == (
+        {"embed_image": 2, "embed_language": 2} if use_caches else {"embed_image": 3, "embed_language": 3}
+    )
+    assert (policy._prompt_cache is not None) == use_caches
+    assert (len(policy.model.image_embedding_cache) > 0) == use_caches
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+import torch
+from safetensors.torch import load_model, save_model
+from torch import nn
+
+from lerobot.common.policies.quantization import (
+    Int8WeightOnlyLinear,
+    get_weight_dtype,
+    quantize_linear_layers,
+    quantize_per_channel_int8,
+)
+
+
+def make_mlp() -> nn.Module:
+    torch.manual_seed(0)
+    return nn.Sequential(nn.Linear(16, 32), nn.GELU(), nn.Sequential(nn.Linear(32, 8, bias=False)))
+
+
+def test_quantize_per_channel_int8():
+    weight = torch.randn(4, 64)
+    weight[2] *= 100
+    weight_int8, scale = quantize_per_channel_int8(weight)
+    assert weight_int8.dtype == torch.int8 and scale.shape == (4,)
+    assert weight_int8.abs().max(dim=1).values.tolist() == [127] * 4
+    # Error of at most half a quantization step per channel
+    assert torch.all((weight_int8 * scale[:, None] - weight).abs() <= scale[:, None] / 2 + 1e-6)
+
+
+def test_quantize_linear_layers():
+    model = make_mlp()
+    x = torch.randn(5, 16)
+    expected = model(x)
+
+    assert quantize_linear_layers(model) == 2
+    assert isinstance(model[0], Int8WeightOnlyLinear) and isinstance(model[2][0], Int8WeightOnlyLinear)
+    assert get_weight_dtype(model[0]) == torch.float32
+    assert set(model.state_dict()) == {
+        "0.weight_int8",
+        "0.weight_scale",
+        "0.bias",
+        "2.0.weight_int8",
+        "2.0.weight_scale",
+    }
+    torch.testing.assert_close(model(x), expected, rtol=0.05, atol=0.02)
+
+    with pytest.raises(ValueError):
+        quantize_linear_layers(make_mlp(), method="int3")
+
+
+def test_save_and_load_quantized(tmp_path):
+    model = make_mlp()
+    quantize_linear_layers(model)
+    save_model(model, str(tmp_path / "model.safetensors"))
+
+    loaded = make_mlp()
+    for linear in [loaded[0], loaded[2][0]]:
+        linear.weight.data.zero_()
+    quantize_linear_layers(loaded)
+    load_model(loaded, str(tmp_path / "model.safetensors"))
+    x = torch.randn(5, 16)
+    torch.testing.assert_close(loaded(x), model(x))
+
+
+def test_load_non_quantized_weights():
+    """The floating point weights of a checkpoint are quantized when loaded into a quantized model."""
+    reference = make_mlp()
+    model = nn.Sequential(nn.Linear(16, 32), nn.GELU(), nn.Sequential(nn.Linear(32, 8, bias=False)))
+    quantize_linear_layers(model)
+    missing_keys, unexpected_keys = model.load_state_dict(reference.state_dict())
+    assert missing_keys == [] and unexpected_keys == []
+
+    quantize_linear_layers(reference)
+    x = torch.randn(5, 16)
+    torch.testing.assert_close(model(x), reference(x))
@@ -1,3 +1,4 @@
+import time
 from contextlib import contextmanager
 from unittest.mock import MagicMock, patch
 
@@ -93,3 +94,55 @@ def test_send_action(follower):
 
     goal_pos = {m: (i + 1) * 10 for i, m in enumerate(follower.bus.motors)}
     follower.bus.sync_write.assert_called_once_with("Goal_Position", goal_pos)
+
+
+def test_send_action_max_relative_target(follower):
+    follower.config.max_relative_target = 5.0
+    follower.connect()
+    follower.get_observation()
+    follower.bus.sync_read.reset_mock()
+
+    action = {f"{m}.pos": i * 10 for i, m in enumerate(follower.bus.motors, 1)}
+    returned = follower.send_action(action)
+
+    # The present positions read by `get_observation` are used to cap the action
+    follower.bus.sync_read.assert_not_called()
+    assert returned == {f"{m}.pos": i + 5.0 for i, m in enumerate(follower.bus.motors, 1)}
+
+    follower.present_pos_cache.max_age_s = 0.0
+    follower.send_action(action)
+    follower.bus.sync_read.assert_called_once_with("Present_Position")
+
+
+def test_motor_io_thread(follower):
+    follower.config.use_motor_io_thread = True
+    follower.config.max_relative_target = 5.0
+    follower.connect()
+    follower.bus.start_io_thread.assert_called_once_with(fps=None)
+
+    present_pos = {m: float(i) for i, m in enumerate(follower.bus.motors, 1)}
+    follower.bus.async_read.return_value = (present_pos, time.perf_counter())
+    obs = follower.get_observation()
+    assert obs == {f"{m}.pos": val for m, val in present_pos.items()}
+
+    action = {f"{m}.pos": i * 10 for i, m in enumerate(follower.bus.motors, 1)}
+    follower.send_action(action)
+
+    follower.bus.sync_read.assert_not_called()
+    follower.bus.sync_write.assert_not_called()
+    follower.bus.async_write_goal.assert_called_once_with({m: val + 5.0 for m, val in present_pos.items()})
+
+
+def test_motor_io_thread_stale_values(follower):
+    follower.config.use_motor_io_thread = True
+    follower.config.max_relative_target = 5.0
+    follower.connect()
+
+    # The values of the I/O thread are too old to cap the action, they are read again from the motors
+    stale_pos = dict.fromkeys(follower.bus.motors, 100.0)
+    follower.bus.async_read.return_value = (stale_pos, time.perf_counter() - 1.0)
+    action = {f"{m}.pos": i * 10 for i, m in enumerate(follower.bus.motors, 1)}
+    returned = follower.send_action(action)
+
+    follower.bus.sync_read.assert_called_once_with("Present_Position")
+    assert returned == {f"{m}.pos": i + 5.0 for i, m in enumerate(follower.bus.motors, 1)}
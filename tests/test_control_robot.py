@@ -1,4 +1,7 @@
+import time
+
 from lerobot.calibrate import CalibrateConfig, calibrate
+from lerobot.common.datasets.lerobot_dataset import LeRobotDataset
 from lerobot.record import DatasetRecordConfig, RecordConfig, record
 from lerobot.replay import DatasetReplayConfig, ReplayConfig, replay
 from lerobot.teleoperate import TeleoperateConfig, teleoperate
@@ -58,6 +61,38 @@ def test_record_and_resume(tmp_path):
     assert dataset.meta.total_tasks == 1
 
 
+def test_record_announces_pending_episodes(tmp_path, monkeypatch):
+    messages = []
+    monkeypatch.setattr("lerobot.record.log_say", lambda text, *args, **kwargs: messages.append(text))
+    finalize_episode = LeRobotDataset._finalize_episode
+
+    def slow_finalize_episode(self, *args, **kwargs):
+        time.sleep(0.3)
+        return finalize_episode(self, *args, **kwargs)
+
+    # The next episodes are recorded while the previous ones are still being finalized
+    monkeypatch.setattr(LeRobotDataset, "_finalize_episode", slow_finalize_episode)
+    dataset_cfg = DatasetRecordConfig(
+        repo_id=DUMMY_REPO_ID,
+        single_task="Dummy task",
+        root=tmp_path / "record",
+        num_episodes=3,
+        episode_time_s=0.1,
+        reset_time_s=0,
+        push_to_hub=False,
+        max_pending_episodes=2,
+    )
+    cfg = RecordConfig(
+        robot=MockRobotConfig(), dataset=dataset_cfg, teleop=MockTeleopConfig(), play_sounds=False
+    )
+
+    dataset = record(cfg)
+
+    assert dataset.meta.total_episodes == 3
+    recording_messages = [message for message in messages if message.startswith("Recording episode")]
+    assert recording_messages == ["Recording episode 0", "Recording episode 1", "Recording episode 2"]
+
+
 def test_record_and_replay(tmp_path):
     robot_cfg = MockRobotConfig()
     teleop_cfg = MockTeleopConfig()
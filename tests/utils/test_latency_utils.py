@@ -0,0 +1,70 @@
+# Copyright 2024 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import csv
+import json
+
+import pytest
+
+from lerobot.common.utils.latency_utils import LatencyTracker
+
+
+@pytest.fixture
+def tracker():
+    tracker = LatencyTracker(fps=10, histogram_edges_ms=[10, 50])
+    for read_dt_s, loop_dt_s in [(0.005, 0.05), (0.02, 0.08), (0.06, 0.15)]:
+        tracker.record("read_state", read_dt_s)
+        tracker.end_loop(loop_dt_s)
+    return tracker
+
+
+def test_deadline_misses(tracker):
+    assert tracker.num_loops == 3
+    assert tracker.deadline_misses == 1
+    assert tracker.last == {"read_state": 0.06, "loop": 0.15}
+
+
+def test_stage_summary(tracker):
+    summary = tracker.stage_summary("read_state")
+    assert summary["count"] == 3
+    assert summary["max_ms"] == pytest.approx(60)
+    assert summary["p50_ms"] == pytest.approx(20)
+    assert summary["over_period"] == 0
+    assert summary["histogram"] == {"edges_ms": [10, 50], "counts": [1, 1, 1]}
+    assert tracker.stage_summary("loop")["over_period"] == 1
+
+
+def test_measure():
+    tracker = LatencyTracker()
+    with pytest.raises(ValueError), tracker.measure("policy"):
+        raise ValueError
+    assert len(tracker.samples["policy"]) == 1
+    assert tracker.summary()["stages"]["policy"]["over_period"] is None
+
+
+def test_save_and_reset(tracker, tmp_path):
+    tracker.save(tmp_path / "latency" / "episode_000000")
+
+    with open(tmp_path / "latency" / "episode_000000.json") as f:
+        summary = json.load(f)
+    assert summary["deadline_misses"] == 1
+    assert summary["deadline_miss_rate"] == pytest.approx(1 / 3)
+    assert set(summary["stages"]) == {"read_state", "loop"}
+
+    with open(tmp_path / "latency" / "episode_000000.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["stage"] for row in rows] == ["read_state", "loop"]
+    assert float(rows[1]["max_ms"]) == pytest.approx(150)
+
+    tracker.reset()
+    assert tracker.num_loops == 0 and tracker.summary()["stages"] == {}